@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark the JSON codecs of myjsonrpc in messages per second.
+
+Encodes and decodes an `update_data` notification with data sampled on this
+machine, like the collector sends every update, and a small request. Only
+the codecs that are installed are measured, install orjson and/or msgspec to
+compare them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from myjsonrpc import JsonRpcNotification  # noqa: E402
+from myjsonrpc.codecs import available_codecs  # noqa: E402
+from myjsonrpc.jsonrpc import JsonRpcRequest  # noqa: E402
+from rsm_collector import async_setup_entry  # noqa: E402
+from rsm_collector.hass_stubs import ConfigEntry, HomeAssistant  # noqa: E402
+from rsm_collector.sampler import subscribe_all  # noqa: E402
+
+
+async def sample_update_data() -> dict:
+    """Return the data of an update, sampled like the collector does."""
+    hass = HomeAssistant()
+    entry = ConfigEntry()
+    await async_setup_entry(hass, entry)
+    assert entry.runtime_data is not None
+    coordinator = entry.runtime_data.coordinator
+    subscribe_all(coordinator)
+    data = await coordinator._async_update_data()
+    return data.as_dict()
+
+
+def main(args) -> None:
+    notification = JsonRpcNotification(
+        "update_data", {"data": asyncio.run(sample_update_data())}
+    )
+    request = JsonRpcRequest("watch_processes", {"processes": ["python", "sshd"]})
+
+    codecs = available_codecs()
+    print(f"Codecs: {', '.join(codec.name for codec in codecs)}")
+    for message_name, message in (
+        ("update_data", notification),
+        ("request", request),
+    ):
+        size = len(message.to_bytes(codecs[-1]))
+        print(f"\n{message_name}, {size} bytes")
+        for codec in codecs:
+            encoded = message.to_bytes(codec)
+            for operation, func in (
+                ("encode", lambda: message.to_bytes(codec)),
+                ("decode", lambda: codec.decode(encoded)),
+            ):
+                seconds = min(
+                    timeit.repeat(func, number=args.number, repeat=args.repeat)
+                )
+                print(
+                    f"{codec.name:8} {operation}  {args.number / seconds:12,.0f} messages/s"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=10_000,
+        help="Number of messages per run. Default is 10000.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of runs, the fastest is reported. Default is 5.",
+    )
+    main(parser.parse_args())
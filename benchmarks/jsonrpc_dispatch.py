@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark dispatching received JSON-RPC messages to their handlers.
+
+Messages are fed to `JsonRpc` through a transport that sends nothing, so
+this measures decoding, dispatching and encoding the responses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from myjsonrpc import JsonRpc  # noqa: E402
+from myjsonrpc.transports.transport_base import JsonRpcBaseTransport  # noqa: E402
+
+
+class NullTransport(JsonRpcBaseTransport):
+    def __init__(self) -> None:
+        self.on_receive = None
+
+    def register_on_receive_handler(self, handler):
+        self.on_receive = handler
+
+    async def send(self, message: str):
+        pass
+
+    async def send_encoded_text(self, message: bytes):
+        pass
+
+
+async def subtract(minuend: int, subtrahend: int) -> int:
+    return minuend - subtrahend
+
+
+async def update(data: dict) -> None:
+    pass
+
+
+MESSAGES = {
+    "request": b'{"jsonrpc":"2.0","method":"subtract","params":[42,23],"id":1}',
+    "named request": b'{"jsonrpc":"2.0","method":"subtract","params":{"minuend":42,"subtrahend":23},"id":1}',
+    "notification": b'{"jsonrpc":"2.0","method":"update","params":{"data":{"cpu":1}}}',
+}
+
+
+async def run(message: bytes, number: int) -> float:
+    transport = NullTransport()
+    jsonrpc = JsonRpc(transport)
+    jsonrpc.register_request_handler("subtract", subtract)
+    jsonrpc.register_notification_handler("update", update, concurrent=True)
+    assert transport.on_receive is not None
+
+    start = time.perf_counter()
+    for _ in range(number):
+        await transport.on_receive(message)
+    await jsonrpc.drain()
+    return time.perf_counter() - start
+
+
+def main(args) -> None:
+    for name, message in MESSAGES.items():
+        seconds = min(
+            asyncio.run(run(message, args.number)) for _ in range(args.repeat)
+        )
+        print(f"{name:14} {args.number / seconds:10,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=50_000,
+        help="Number of messages per run. Default is 50000.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of runs, the fastest is reported. Default is 5.",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark counting socket states against psutil.net_connections.
+
+Builds a fake procfs with synthetic /proc/net/{tcp,tcp6,udp,udp6} files and
+points both implementations at it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+import timeit
+
+import psutil
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rsm_collector.sockets import (  # noqa: E402
+    count_socket_states,
+    count_socket_states_psutil,
+)
+
+TCP_STATES = ["01"] * 6 + ["06"] * 3 + ["0A"]
+UDP_STATES = ["07", "01"]
+
+HEADER = (
+    "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt"
+    "   uid  timeout inode\n"
+)
+HEADER6 = (
+    "  sl  local_address                         remote_address                        st"
+    " tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+)
+
+
+def _line(index: int, address_length: int, state: str) -> str:
+    local = f"{random.getrandbits(address_length * 4):0{address_length}X}"
+    remote = f"{random.getrandbits(address_length * 4):0{address_length}X}"
+    return (
+        f"{index:4d}: {local}:{random.randrange(65536):04X} {remote}:{random.randrange(65536):04X}"
+        f" {state} 00000000:00000000 00:00000000 00000000  1000        0 {100000 + index}"
+        " 1 0000000000000000 20 4 30 10 -1\n"
+    )
+
+
+def build_procfs(path: str, sockets: int) -> None:
+    """Write the socket files, spread over the protocols like a busy server."""
+    net = os.path.join(path, "net")
+    os.makedirs(net)
+    files = {
+        "tcp": (HEADER, 8, TCP_STATES, sockets * 4 // 10),
+        "tcp6": (HEADER6, 32, TCP_STATES, sockets * 4 // 10),
+        "udp": (HEADER, 8, UDP_STATES, sockets // 10),
+        "udp6": (HEADER6, 32, UDP_STATES, sockets - sockets * 9 // 10),
+    }
+    for filename, (header, address_length, states, count) in files.items():
+        with open(os.path.join(net, filename), "w", encoding="ascii") as file:
+            file.write(header)
+            for index in range(count):
+                file.write(_line(index, address_length, random.choice(states)))
+
+
+def main(args) -> None:
+    with tempfile.TemporaryDirectory() as procfs:
+        build_procfs(procfs, args.sockets)
+        psutil.PROCFS_PATH = procfs
+
+        streaming = count_socket_states(procfs)
+        print(f"{args.sockets} sockets: {streaming}")
+
+        for name, func in (
+            ("count_socket_states", lambda: count_socket_states(procfs)),
+            ("net_connections", lambda: count_socket_states_psutil(psutil)),
+        ):
+            seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+            print(f"{name:20} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sockets",
+        type=int,
+        default=100_000,
+        help="Number of synthetic sockets. Default is 100000.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of runs, the fastest is reported. Default is 5.",
+    )
+    main(parser.parse_args())
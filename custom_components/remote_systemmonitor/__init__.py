@@ -4,9 +4,10 @@
 from dataclasses import dataclass
 import logging
 
+from awesomeversion import AwesomeVersion
 import psutil_home_assistant as ha_psutil
 
-# from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
+from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
 # from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
@@ -16,9 +17,15 @@ from homeassistant.const import (
     CONF_HOST,
 )
 
+from .const import (
+    COLLECTOR_STATS_API_VERSION,
+    CONF_PROCESS,
+    PROCESS_WATCH_API_VERSION,
+    UPDATE_SUBSCRIBE_API_VERSION,
+)
 from .rsm_collector_api import RemoteSystemMonitorCollectorApi
 
-from .coordinator import SystemMonitorCoordinator
+from .coordinator import CollectorStatsCoordinator, SystemMonitorCoordinator
 # from .util import get_all_disk_mounts
 
 _LOGGER = logging.getLogger(__name__)
@@ -33,6 +40,8 @@ class SystemMonitorData:
     coordinator: SystemMonitorCoordinator
     psutil_wrapper: ha_psutil.PsutilWrapper
     collector_api: RemoteSystemMonitorCollectorApi
+    # Only for collectors that report statistics of themselves
+    stats_coordinator: CollectorStatsCoordinator | None = None
 
 
 type SystemMonitorConfigEntry = ConfigEntry[SystemMonitorData]
@@ -66,11 +75,21 @@ async def async_setup_entry(
             await hass.config_entries.async_reload(entry.entry_id)
 
         await collector_api.connect(on_disconnect=on_disconnect)
-        api_info = await collector_api.get_api_info()
+        # Initial data is requested right away to make sure the data is there
+        api_info, _, _ = await collector_api.get_setup_info()
         _LOGGER.debug("api_info: %s", api_info)
 
-        # Just make sure the data is there
-        await collector_api.get_initial_data()
+        if AwesomeVersion(api_info.version) >= UPDATE_SUBSCRIBE_API_VERSION:
+            await collector_api.subscribe_updates()
+
+        processes = entry.options.get(BINARY_SENSOR_DOMAIN, {}).get(CONF_PROCESS, [])
+        if AwesomeVersion(api_info.version) >= PROCESS_WATCH_API_VERSION:
+            await collector_api.watch_processes(processes)
+        elif processes:
+            _LOGGER.warning(
+                "Collector API version %s does not support watching processes",
+                api_info.version,
+            )
     except Exception as err:
         await collector_api.disconnect()
         raise ConfigEntryNotReady(err) from err
@@ -89,8 +108,16 @@ async def async_setup_entry(
 
     collector_api.set_on_new_data_handler(on_new_data)
 
+    stats_coordinator: CollectorStatsCoordinator | None = None
+    if AwesomeVersion(api_info.version) >= COLLECTOR_STATS_API_VERSION:
+        stats_coordinator = CollectorStatsCoordinator(hass, collector_api)
+        # Statistics are only diagnostics, no reason to fail the setup
+        await stats_coordinator.async_refresh()
+
     # await coordinator.async_config_entry_first_refresh()
-    entry.runtime_data = SystemMonitorData(coordinator, psutil_wrapper, collector_api)
+    entry.runtime_data = SystemMonitorData(
+        coordinator, psutil_wrapper, collector_api, stats_coordinator
+    )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(update_listener))
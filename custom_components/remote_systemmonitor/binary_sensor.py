@@ -9,8 +9,6 @@ import logging
 import sys
 from typing import Literal
 
-from psutil import NoSuchProcess
-
 from homeassistant.components.binary_sensor import (
     DOMAIN as BINARY_SENSOR_DOMAIN,
     BinarySensorDeviceClass,
@@ -52,20 +50,8 @@ def get_cpu_icon() -> Literal["mdi:cpu-64-bit", "mdi:cpu-32-bit"]:
 
 def get_process(entity: SystemMonitorSensor) -> bool:
     """Return process."""
-    state = False
-    for proc in entity.coordinator.data.processes:
-        try:
-            _LOGGER.debug("process %s for argument %s", proc.name(), entity.argument)
-            if entity.argument == proc.name():
-                state = True
-                break
-        except NoSuchProcess as err:
-            _LOGGER.warning(
-                "Failed to load process with ID: %s, old name: %s",
-                err.pid,
-                err.name,
-            )
-    return state
+    # The collector only reports the processes that are watched
+    return entity.coordinator.data.processes.get(entity.argument, False)
 
 
 @dataclass(frozen=True, kw_only=True)
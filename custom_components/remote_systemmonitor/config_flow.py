@@ -56,11 +56,14 @@ async def validate_sensor_setup(
     processes.clear()
     processes.extend(user_input[CONF_PROCESS])
 
+    machine_id = handler.parent_handler.config_entry.unique_id
     entity_registry = er.async_get(handler.parent_handler.hass)
     for process in previous_processes:
         if process not in processes and (
             entity_id := entity_registry.async_get_entity_id(
-                BINARY_SENSOR_DOMAIN, DOMAIN, slugify(f"binary_process_{process}")
+                BINARY_SENSOR_DOMAIN,
+                DOMAIN,
+                slugify(f"{machine_id}_binary_process_{process}"),
             )
         ):
             entity_registry.async_remove(entity_id)
@@ -118,11 +121,10 @@ async def validate_input(data: dict[str, Any]) -> dict[str, Any]:
     try:
         await collector_api.connect()
 
-        api_info = await collector_api.get_api_info()
+        api_info, machine_info, _ = await collector_api.get_setup_info()
         if AwesomeVersion(api_info.version) < MIN_API_VERSION:
             raise Exception(f"Unsupported API version: {api_info.version}")
 
-        machine_info = await collector_api.get_machine_info()
         machine_name = machine_info.hostname
         machine_id = machine_info.id
     finally:
@@ -138,14 +140,13 @@ class SystemMonitorConfigFlowHandler(ConfigFlow, domain=DOMAIN):
     VERSION = 1
     MINOR_VERSION = 1
 
-    # Disable OptionsFlow for now until we need it again
-    # @staticmethod
-    # @callback
-    # def async_get_options_flow(
-    #     config_entry: ConfigEntry,
-    # ) -> SchemaOptionsFlowHandler:
-    #     """Get the options flow for this handler."""
-    #     return SchemaOptionsFlowHandler(config_entry, OPTIONS_FLOW)
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: ConfigEntry,
+    ) -> SchemaOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return SchemaOptionsFlowHandler(config_entry, OPTIONS_FLOW)
 
     def async_config_entry_title(self, options: Mapping[str, Any]) -> str:
         """Return config entry title."""
@@ -5,6 +5,18 @@ DOMAIN = "remote_systemmonitor"
 CONF_INDEX = "index"
 CONF_PROCESS = "process"
 
+# First collector API version that supports watching processes
+PROCESS_WATCH_API_VERSION = "0.0.3"
+# First collector API version that reports statistics of itself
+COLLECTOR_STATS_API_VERSION = "0.0.5"
+# First collector API version where updates are a topic to subscribe on
+UPDATE_SUBSCRIBE_API_VERSION = "0.0.7"
+# Seconds between polls of the collector statistics
+COLLECTOR_STATS_INTERVAL = 60
+
+# Number of sensors per resource for the top processes
+TOP_PROCESSES_COUNT = 5
+
 NET_IO_TYPES = [
     "network_in",
     "network_out",
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import os
 from typing import Any, NamedTuple
@@ -14,10 +14,20 @@ import psutil_home_assistant as ha_psutil
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_component import DEFAULT_SCAN_INTERVAL
-from homeassistant.helpers.update_coordinator import TimestampDataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    TimestampDataUpdateCoordinator,
+    UpdateFailed,
+)
 from homeassistant.util import dt as dt_util
 
-from custom_components.remote_systemmonitor.rsm_collector_api import SensorData
+from custom_components.remote_systemmonitor.rsm_collector_api import (
+    CollectorStats,
+    RemoteSystemMonitorCollectorApi,
+    SensorData,
+)
+
+from .const import COLLECTOR_STATS_INTERVAL
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -79,6 +89,29 @@ _LOGGER = logging.getLogger(__name__)
 #     free: float
 
 
+class CollectorStatsCoordinator(DataUpdateCoordinator[CollectorStats]):
+    """Polls the statistics of the collector itself."""
+
+    def __init__(
+        self, hass: HomeAssistant, collector_api: RemoteSystemMonitorCollectorApi
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Remote System Monitor collector stats coordinator",
+            update_interval=timedelta(seconds=COLLECTOR_STATS_INTERVAL),
+        )
+        self._collector_api = collector_api
+
+    async def _async_update_data(self) -> CollectorStats:
+        """Fetch data."""
+        try:
+            return await self._collector_api.get_collector_stats()
+        except Exception as err:
+            raise UpdateFailed(f"Getting collector stats failed: {err}") from err
+
+
 class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
     """A System monitor Data Update Coordinator."""
 
@@ -114,6 +147,7 @@ class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
             _disk_defaults[("disks", argument)] = set()
         return {
             **_disk_defaults,
+            ("disk_io", ""): set(),
             ("swap", ""): set(),
             ("memory", ""): set(),
             ("io_counters", ""): set(),
@@ -122,7 +156,11 @@ class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
             ("cpu_percent", ""): set(),
             ("boot", ""): set(),
             ("processes", ""): set(),
+            ("top_processes", ""): set(),
             ("temperatures", ""): set(),
+            ("pressure", ""): set(),
+            ("cgroups", ""): set(),
+            ("sockets", ""): set(),
         }
 
     # async def _async_update_data(self) -> SensorData:
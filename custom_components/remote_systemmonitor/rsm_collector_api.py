@@ -6,7 +6,7 @@ from __future__ import annotations
 import argparse
 import ast
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 import logging
 import re
@@ -16,12 +16,12 @@ from mashumaro.mixins.dict import DataClassDictMixin
 
 # Some hackery to be able to use the "internal" package
 try:
-    from .myjsonrpc import JsonRpc
+    from .myjsonrpc import JsonRpc, JsonRpcResponse, JsonRpcTimeoutError
     from .myjsonrpc.transports.aiohttp_websocketclient_transport import (
         AioHttpWebsocketClientTransport,
     )
 except ImportError:
-    from myjsonrpc import JsonRpc
+    from myjsonrpc import JsonRpc, JsonRpcResponse, JsonRpcTimeoutError
     from myjsonrpc.transports.aiohttp_websocketclient_transport import (
         AioHttpWebsocketClientTransport,
     )
@@ -29,6 +29,17 @@ except ImportError:
 
 DEFAULT_PORT = 2604
 
+# Seconds to wait for a response, a collector that does not answer in time is
+# considered gone
+CALL_TIMEOUT = 10
+
+# Seconds to wait for a response on a batch, collectors before API version
+# 0.0.6 silently ignore batches
+BATCH_TIMEOUT = 2
+
+# Order of the values in `cpu_times_percent`
+CPU_TIMES_FIELDS = ("user", "system", "iowait", "steal")
+
 LOGGER = logging.getLogger(__package__)
 
 
@@ -70,6 +81,15 @@ class DiskUsage(NamedTupleStringDecoder):
     percent: float
 
 
+@dataclass(frozen=True, kw_only=True)
+class DiskIo(DataClassDictMixin):
+    read: float
+    write: float
+    read_iops: float
+    write_iops: float
+    busy_percent: float | None
+
+
 @dataclass(frozen=True, kw_only=True)
 class Memory(NamedTupleStringDecoder):
     total: int
@@ -91,20 +111,99 @@ class SNetIo(NamedTupleStringDecoder):
     dropout: int
 
 
+@dataclass(frozen=True, kw_only=True)
+class ProcessUsage(DataClassDictMixin):
+    pid: int
+    name: str
+    cpu_percent: float
+    memory: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class PressureStall(DataClassDictMixin):
+    avg10: float
+    avg60: float
+    avg300: float
+    total: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class CgroupUsage(DataClassDictMixin):
+    cpu_percent: float | None
+    memory: int
+    io_read: float | None
+    io_write: float | None
+
+
+@dataclass(frozen=True, kw_only=True)
+class ProcessStats(DataClassDictMixin):
+    pid: int
+    rss: int
+    cpu_percent: float
+
+
+@dataclass(frozen=True, kw_only=True)
+class ExecutorPoolStats(DataClassDictMixin):
+    max_workers: int
+    max_queued: int
+    active: int
+    queued: int
+    peak_pending: int
+    completed: int
+    # Jobs not started because the pool was full, their probes were skipped
+    rejected: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class CollectorStats(DataClassDictMixin):
+    """Statistics of the collector itself."""
+
+    # Seconds the last update took, and per probe
+    update_duration: float | None
+    probe_durations: dict[str, float]
+    # Seconds the event loop was late, last and largest in the last minute
+    loop_lag: float
+    loop_lag_max: float
+    collector: ProcessStats | None
+    worker: ProcessStats | None
+    worker_restarts: int
+    # Bytes waiting to be sent per connection
+    connections: dict[str, int]
+    messages_sent: int
+    bytes_sent: int
+    # Not sent by older collectors
+    executor_pools: dict[str, ExecutorPoolStats] = field(default_factory=dict)
+
+
 @dataclass(frozen=True, kw_only=True, slots=True)
 class SensorData:
     """Sensor data."""
 
     disk_usage: dict[str, Any]
+    # IO rates per block device behind the disks
+    disk_io: dict[str, DiskIo]
     # swap: sswap
     memory: Memory
     io_counters: dict[str, SNetIo]
     # addresses: dict[str, list[snicaddr]]
     load: tuple[float, float, float]
     cpu_percent: float | None
+    cpu_percent_per_core: list[float]
+    # Per field of CPU_TIMES_FIELDS, None when not available on the platform
+    cpu_times_percent: dict[str, float | None]
     boot_time: datetime
-    # processes: list[Process]
+    # Running state per watched process name
+    processes: dict[str, bool]
+    # Processes using most resources, per "cpu" and "memory"
+    top_processes: dict[str, list[ProcessUsage]]
     # temperatures: dict[str, list[shwtemp]]
+    cpu_temperature: float | None
+    # Pressure stall information, "some" and "full" per resource
+    pressure: dict[str, dict[str, PressureStall]]
+    # Resource usage per cgroup name, e.g. container
+    cgroups: dict[str, CgroupUsage]
+    # Number of sockets per protocol and connection state
+    sockets: dict[str, dict[str, int]]
 
     @staticmethod
     def from_dict(data: dict[str, Any]) -> SensorData:
@@ -113,6 +212,9 @@ class SensorData:
                 k: DiskUsage.from_named_tuple_string(v)
                 for k, v in data["disk_usage"].items()
             },
+            disk_io={
+                k: DiskIo.from_dict(v) for k, v in (data.get("disk_io") or {}).items()
+            },
             # swap=data.get("swap"),
             memory=Memory.from_named_tuple_string(data["memory"]),
             io_counters={
@@ -122,9 +224,32 @@ class SensorData:
             # addresses=data.get("addresses"),
             load=ast.literal_eval(data["load"]),
             cpu_percent=data.get("cpu_percent"),
+            cpu_percent_per_core=data.get("cpu_percent_per_core") or [],
+            cpu_times_percent=dict(
+                zip(CPU_TIMES_FIELDS, data.get("cpu_times_percent") or [])
+            ),
             boot_time=datetime.fromisoformat(data["boot_time"]),
-            # processes=data.get("processes"),
+            # Older collectors send a list of processes, which is not usable
+            processes=(
+                data["processes"] if isinstance(data.get("processes"), dict) else {}
+            ),
+            top_processes={
+                k: [ProcessUsage.from_dict(usage) for usage in v]
+                for k, v in (data.get("top_processes") or {}).items()
+            },
             # temperatures=data.get("temperatures"),
+            cpu_temperature=data.get("cpu_temperature"),
+            pressure={
+                resource: {
+                    kind: PressureStall.from_dict(stall) for kind, stall in stalls.items()
+                }
+                for resource, stalls in (data.get("pressure") or {}).items()
+            },
+            cgroups={
+                k: CgroupUsage.from_dict(v)
+                for k, v in (data.get("cgroups") or {}).items()
+            },
+            sockets=data.get("sockets") or {},
         )
 
     # TODO: IS THIS USED??
@@ -166,7 +291,7 @@ class RemoteSystemMonitorCollectorApi:
 
         # TODO: Need to do something with disconnects/connection errors, probably on transport??
         self._transport = AioHttpWebsocketClientTransport()
-        self._jsonrpc = JsonRpc(self._transport)
+        self._jsonrpc = JsonRpc(self._transport, default_timeout=CALL_TIMEOUT)
         self._jsonrpc.register_notification_handler(
             "update_data", self._on_update_data_notification
         )
@@ -191,6 +316,7 @@ class RemoteSystemMonitorCollectorApi:
         # Don't call disconnect handler on intended disconnects
         self._on_disconnect = None
         await self._transport.disconnect()
+        await self._jsonrpc.close()
 
     def set_on_new_data_handler(self, on_new_data):
         self._on_new_data = on_new_data
@@ -204,7 +330,9 @@ class RemoteSystemMonitorCollectorApi:
 
     async def get_api_info(self) -> ApiInfo:
         response = await self._jsonrpc.call_method("get_api_info")
+        return self._api_info_from_response(response)
 
+    def _api_info_from_response(self, response: JsonRpcResponse) -> ApiInfo:
         if response.error is not None:
             raise Exception(f"Error: {response.error}")
 
@@ -216,7 +344,9 @@ class RemoteSystemMonitorCollectorApi:
 
     async def get_machine_info(self) -> MachineInfo:
         response = await self._jsonrpc.call_method("get_machine_info")
+        return self._machine_info_from_response(response)
 
+    def _machine_info_from_response(self, response: JsonRpcResponse) -> MachineInfo:
         if response.error is not None:
             raise Exception(f"Error: {response.error}")
         return MachineInfo.from_dict(response.result)
@@ -224,13 +354,80 @@ class RemoteSystemMonitorCollectorApi:
     async def get_initial_data(self):
         if self._last_data is None:
             response = await self._jsonrpc.call_method("get_initial_data")
-            if response.error is not None:
-                raise Exception(f"Error: {response.error}")
+            self._initial_data_from_response(response)
 
-            self._last_data = SensorData.from_dict(response.result["data"])
+        return self._last_data
 
+    def _initial_data_from_response(self, response: JsonRpcResponse) -> SensorData:
+        if response.error is not None:
+            raise Exception(f"Error: {response.error}")
+
+        self._last_data = SensorData.from_dict(response.result["data"])
         return self._last_data
 
+    async def get_setup_info(self) -> tuple[ApiInfo, MachineInfo, SensorData]:
+        """Return api info, machine info and initial data in one round trip.
+
+        Older collectors ignore the batch, then the calls are made one by one.
+        """
+        try:
+            responses = await self._jsonrpc.call_batch(
+                [
+                    ("get_api_info", None),
+                    ("get_machine_info", None),
+                    ("get_initial_data", None),
+                ],
+                timeout=BATCH_TIMEOUT,
+            )
+        except JsonRpcTimeoutError:
+            LOGGER.debug("No response on batch, getting setup info one by one")
+            return (
+                await self.get_api_info(),
+                await self.get_machine_info(),
+                await self.get_initial_data(),
+            )
+
+        api_info_response, machine_info_response, initial_data_response = responses
+        return (
+            self._api_info_from_response(api_info_response),
+            self._machine_info_from_response(machine_info_response),
+            self._initial_data_from_response(initial_data_response),
+        )
+
+    async def watch_processes(self, processes: list[str]) -> list[str]:
+        """Set the process names the collector reports the running state for."""
+        response = await self._jsonrpc.call_method(
+            "watch_processes", {"processes": processes}
+        )
+        if response.error is not None:
+            raise Exception(f"Error: {response.error}")
+        return response.result["processes"]
+
+    async def get_collector_stats(self) -> CollectorStats:
+        """Return what the collector costs and if it keeps up."""
+        response = await self._jsonrpc.call_method("get_collector_stats")
+        if response.error is not None:
+            raise Exception(f"Error: {response.error}")
+        return CollectorStats.from_dict(response.result)
+
+    async def subscribe_updates(self) -> None:
+        """Subscribe on the update data.
+
+        Collectors send it without subscribing as well, from API version 0.0.7
+        it is a topic that can be subscribed on.
+        """
+        await self._jsonrpc.subscribe("update_data", self._on_update_data_notification)
+
+    async def get_sources(self) -> dict[str, Any]:
+        """Return cost, interval and schema of the plugin metric sources.
+
+        Their samples are sent in the update data under the source name.
+        """
+        response = await self._jsonrpc.call_method("get_sources")
+        if response.error is not None:
+            raise Exception(f"Error: {response.error}")
+        return response.result["sources"]
+
 
 async def main(args):
 
@@ -244,15 +441,13 @@ async def main(args):
     api = RemoteSystemMonitorCollectorApi(args.host, args.port, on_new_data=on_new_data)
     await api.connect()
 
-    api_info = await api.get_api_info()
+    api_info, machine_info, initial_data = await api.get_setup_info()
     print(api_info)
-    if api_info.version != "0.0.2":
+    if api_info.version not in ("0.0.2", "0.0.3", "0.0.4", "0.0.5", "0.0.6", "0.0.7"):
         raise Exception(f"Unsupported API version: {api_info.version}")
 
-    machine_info = await api.get_machine_info()
     print(machine_info)
 
-    initial_data = await api.get_initial_data()
     print(initial_data)
 
     done = False
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 from collections.abc import Callable
-import contextlib
 from dataclasses import dataclass
 from datetime import datetime
 from functools import lru_cache
@@ -27,6 +26,7 @@ from homeassistant.const import (
     UnitOfDataRate,
     UnitOfInformation,
     UnitOfTemperature,
+    UnitOfTime,
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
@@ -37,9 +37,10 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify
 
 from . import SystemMonitorConfigEntry
-from .const import DOMAIN, NET_IO_TYPES
-from .coordinator import SystemMonitorCoordinator
-from .util import get_all_disk_mounts, get_all_network_interfaces, read_cpu_temperature
+from .const import DOMAIN, NET_IO_TYPES, TOP_PROCESSES_COUNT
+from .coordinator import CollectorStatsCoordinator, SystemMonitorCoordinator
+from .rsm_collector_api import CPU_TIMES_FIELDS, CollectorStats, ProcessUsage
+from .util import get_all_disk_mounts, get_all_network_interfaces
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -63,6 +64,21 @@ def get_cpu_icon() -> Literal["mdi:cpu-64-bit", "mdi:cpu-32-bit"]:
     return "mdi:cpu-32-bit"
 
 
+def get_processor_core_use(entity: SystemMonitorSensor) -> float | None:
+    """Return usage of the processor core."""
+    per_core = entity.coordinator.data.cpu_percent_per_core
+    if (index := int(entity.argument)) < len(per_core):
+        return per_core[index]
+    return None
+
+
+def get_disk_io(entity: SystemMonitorSensor) -> float | None:
+    """Return IO rate of the disk."""
+    if (disk_io := entity.coordinator.data.disk_io.get(entity.argument)) is not None:
+        return getattr(disk_io, DISK_IO[entity.entity_description.key])
+    return None
+
+
 def get_network(entity: SystemMonitorSensor) -> int | None:
     """Return network in and out."""
     counters = entity.coordinator.data.io_counters
@@ -129,6 +145,60 @@ def get_ip_address(
     return None
 
 
+def get_pressure(entity: SystemMonitorSensor) -> float | None:
+    """Return share of time stalled on the resource over the last 10 seconds."""
+    stalls = entity.coordinator.data.pressure.get(entity.argument, {})
+    kind = PRESSURE_KIND[entity.entity_description.key]
+    if kind in stalls:
+        return stalls[kind].avg10
+    return None
+
+
+def get_cgroup_usage(entity: SystemMonitorSensor) -> float | None:
+    """Return resource usage of the cgroup."""
+    if (usage := entity.coordinator.data.cgroups.get(entity.argument)) is not None:
+        return getattr(usage, CGROUP_USAGE[entity.entity_description.key])
+    return None
+
+
+def get_socket_count(entity: SystemMonitorSensor) -> int | None:
+    """Return number of sockets of the protocol in the state, or in all states."""
+    protocol, state = SOCKET_STATE[entity.entity_description.key]
+    if (states := entity.coordinator.data.sockets.get(protocol)) is None:
+        return None
+    if state is None:
+        return sum(states.values())
+    return states.get(state, 0)
+
+
+def get_top_process(entity: SystemMonitorSensor) -> str | None:
+    """Return name of the process at the rank of the sensor."""
+    if (usage := _get_top_process_usage(entity)) is not None:
+        return usage.name
+    return None
+
+
+def get_top_process_attributes(entity: SystemMonitorSensor) -> dict[str, Any]:
+    """Return resource usage of the process at the rank of the sensor."""
+    if (usage := _get_top_process_usage(entity)) is not None:
+        return {
+            "pid": usage.pid,
+            "cpu_percent": usage.cpu_percent,
+            "memory": usage.memory,
+        }
+    return {}
+
+
+def _get_top_process_usage(entity: SystemMonitorSensor) -> ProcessUsage | None:
+    top_processes = entity.coordinator.data.top_processes.get(
+        TOP_PROCESS_RESOURCE[entity.entity_description.key], []
+    )
+    index = int(entity.argument) - 1
+    if index < len(top_processes):
+        return top_processes[index]
+    return None
+
+
 @dataclass(frozen=True, kw_only=True)
 class SysMonitorSensorEntityDescription(SensorEntityDescription):
     """Describes System Monitor sensor entities."""
@@ -138,6 +208,7 @@ class SysMonitorSensorEntityDescription(SensorEntityDescription):
     none_is_unavailable: bool = False
     mandatory_arg: bool = False
     placeholder: str | None = None
+    attributes_fn: Callable[[SystemMonitorSensor], dict[str, Any]] | None = None
 
 
 # mypy: ignore-errors
@@ -202,6 +273,64 @@ SENSOR_TYPES: dict[str, SysMonitorSensorEntityDescription] = {
         none_is_unavailable=True,
         add_to_update=lambda entity: ("disks", entity.argument),
     ),
+    "disk_throughput_read": SysMonitorSensorEntityDescription(
+        key="disk_throughput_read",
+        translation_key="disk_throughput_read",
+        placeholder="device",
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        suggested_display_precision=3,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_disk_io,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("disk_io", ""),
+    ),
+    "disk_throughput_write": SysMonitorSensorEntityDescription(
+        key="disk_throughput_write",
+        translation_key="disk_throughput_write",
+        placeholder="device",
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        suggested_display_precision=3,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_disk_io,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("disk_io", ""),
+    ),
+    "disk_read_iops": SysMonitorSensorEntityDescription(
+        key="disk_read_iops",
+        translation_key="disk_read_iops",
+        placeholder="device",
+        native_unit_of_measurement="IOPS",
+        suggested_display_precision=1,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_disk_io,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("disk_io", ""),
+    ),
+    "disk_write_iops": SysMonitorSensorEntityDescription(
+        key="disk_write_iops",
+        translation_key="disk_write_iops",
+        placeholder="device",
+        native_unit_of_measurement="IOPS",
+        suggested_display_precision=1,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_disk_io,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("disk_io", ""),
+    ),
+    "disk_busy_percent": SysMonitorSensorEntityDescription(
+        key="disk_busy_percent",
+        translation_key="disk_busy_percent",
+        placeholder="device",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_disk_io,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("disk_io", ""),
+    ),
     # "ipv4_address": SysMonitorSensorEntityDescription(
     #     key="ipv4_address",
     #     translation_key="ipv4_address",
@@ -377,18 +506,178 @@ SENSOR_TYPES: dict[str, SysMonitorSensorEntityDescription] = {
         ),
         add_to_update=lambda entity: ("cpu_percent", ""),
     ),
-    # "processor_temperature": SysMonitorSensorEntityDescription(
-    #     key="processor_temperature",
-    #     translation_key="processor_temperature",
-    #     native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-    #     device_class=SensorDeviceClass.TEMPERATURE,
-    #     state_class=SensorStateClass.MEASUREMENT,
-    #     value_fn=lambda entity: read_cpu_temperature(
-    #         entity.coordinator.data.temperatures
-    #     ),
-    #     none_is_unavailable=True,
-    #     add_to_update=lambda entity: ("temperatures", ""),
-    # ),
+    "processor_use_core": SysMonitorSensorEntityDescription(
+        key="processor_use_core",
+        translation_key="processor_use_core",
+        placeholder="core",
+        native_unit_of_measurement=PERCENTAGE,
+        icon=get_cpu_icon(),
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_processor_core_use,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("cpu_percent", ""),
+    ),
+    **{
+        f"processor_{field}": SysMonitorSensorEntityDescription(
+            key=f"processor_{field}",
+            translation_key=f"processor_{field}",
+            native_unit_of_measurement=PERCENTAGE,
+            icon=get_cpu_icon(),
+            state_class=SensorStateClass.MEASUREMENT,
+            value_fn=lambda entity, field=field: (
+                entity.coordinator.data.cpu_times_percent.get(field)
+            ),
+            none_is_unavailable=True,
+            add_to_update=lambda entity: ("cpu_percent", ""),
+        )
+        for field in CPU_TIMES_FIELDS
+    },
+    "processor_temperature": SysMonitorSensorEntityDescription(
+        key="processor_temperature",
+        translation_key="processor_temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda entity: entity.coordinator.data.cpu_temperature,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("temperatures", ""),
+    ),
+    "pressure_some": SysMonitorSensorEntityDescription(
+        key="pressure_some",
+        translation_key="pressure_some",
+        placeholder="resource",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        mandatory_arg=True,
+        value_fn=get_pressure,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("pressure", ""),
+    ),
+    "pressure_full": SysMonitorSensorEntityDescription(
+        key="pressure_full",
+        translation_key="pressure_full",
+        placeholder="resource",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        mandatory_arg=True,
+        value_fn=get_pressure,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("pressure", ""),
+    ),
+    "cgroup_processor_use": SysMonitorSensorEntityDescription(
+        key="cgroup_processor_use",
+        translation_key="cgroup_processor_use",
+        placeholder="cgroup",
+        native_unit_of_measurement=PERCENTAGE,
+        icon=get_cpu_icon(),
+        state_class=SensorStateClass.MEASUREMENT,
+        mandatory_arg=True,
+        value_fn=get_cgroup_usage,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("cgroups", ""),
+    ),
+    "cgroup_memory_use": SysMonitorSensorEntityDescription(
+        key="cgroup_memory_use",
+        translation_key="cgroup_memory_use",
+        placeholder="cgroup",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_display_precision=1,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        mandatory_arg=True,
+        value_fn=get_cgroup_usage,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("cgroups", ""),
+    ),
+    "cgroup_throughput_io_read": SysMonitorSensorEntityDescription(
+        key="cgroup_throughput_io_read",
+        translation_key="cgroup_throughput_io_read",
+        placeholder="cgroup",
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        suggested_display_precision=3,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        mandatory_arg=True,
+        value_fn=get_cgroup_usage,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("cgroups", ""),
+    ),
+    "cgroup_throughput_io_write": SysMonitorSensorEntityDescription(
+        key="cgroup_throughput_io_write",
+        translation_key="cgroup_throughput_io_write",
+        placeholder="cgroup",
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        suggested_display_precision=3,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        mandatory_arg=True,
+        value_fn=get_cgroup_usage,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("cgroups", ""),
+    ),
+    "tcp_established": SysMonitorSensorEntityDescription(
+        key="tcp_established",
+        translation_key="tcp_established",
+        icon="mdi:lan-connect",
+        native_unit_of_measurement="sockets",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_socket_count,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("sockets", ""),
+    ),
+    "tcp_time_wait": SysMonitorSensorEntityDescription(
+        key="tcp_time_wait",
+        translation_key="tcp_time_wait",
+        icon="mdi:lan-pending",
+        native_unit_of_measurement="sockets",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_socket_count,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("sockets", ""),
+    ),
+    "tcp_listen": SysMonitorSensorEntityDescription(
+        key="tcp_listen",
+        translation_key="tcp_listen",
+        icon="mdi:lan",
+        native_unit_of_measurement="sockets",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_socket_count,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("sockets", ""),
+    ),
+    "udp_sockets": SysMonitorSensorEntityDescription(
+        key="udp_sockets",
+        translation_key="udp_sockets",
+        icon="mdi:lan",
+        native_unit_of_measurement="sockets",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_socket_count,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("sockets", ""),
+    ),
+    "top_cpu_process": SysMonitorSensorEntityDescription(
+        key="top_cpu_process",
+        translation_key="top_cpu_process",
+        placeholder="rank",
+        icon=get_cpu_icon(),
+        value_fn=get_top_process,
+        attributes_fn=get_top_process_attributes,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("top_processes", ""),
+    ),
+    "top_memory_process": SysMonitorSensorEntityDescription(
+        key="top_memory_process",
+        translation_key="top_memory_process",
+        placeholder="rank",
+        icon="mdi:memory",
+        value_fn=get_top_process,
+        attributes_fn=get_top_process_attributes,
+        none_is_unavailable=True,
+        add_to_update=lambda entity: ("top_processes", ""),
+    ),
     # "swap_free": SysMonitorSensorEntityDescription(
     #     key="swap_free",
     #     translation_key="swap_free",
@@ -418,6 +707,131 @@ SENSOR_TYPES: dict[str, SysMonitorSensorEntityDescription] = {
 }
 
 
+@dataclass(frozen=True, kw_only=True)
+class CollectorStatsSensorEntityDescription(SensorEntityDescription):
+    """Describes sensor entities for the statistics of the collector itself."""
+
+    value_fn: Callable[[CollectorStats], StateType]
+    attributes_fn: Callable[[CollectorStats], dict[str, Any]] | None = None
+
+
+COLLECTOR_STATS_SENSOR_TYPES: tuple[CollectorStatsSensorEntityDescription, ...] = (
+    CollectorStatsSensorEntityDescription(
+        key="collector_update_duration",
+        translation_key="collector_update_duration",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=3,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.update_duration,
+        # Shows which probe got slow
+        attributes_fn=lambda stats: {
+            probe: round(duration, 4)
+            for probe, duration in stats.probe_durations.items()
+        },
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_loop_lag",
+        translation_key="collector_loop_lag",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=3,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.loop_lag_max,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_memory_use",
+        translation_key="collector_memory_use",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        suggested_display_precision=1,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.collector.rss if stats.collector else None,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_processor_use",
+        translation_key="collector_processor_use",
+        native_unit_of_measurement=PERCENTAGE,
+        icon=get_cpu_icon(),
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.collector.cpu_percent if stats.collector else None,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_worker_memory_use",
+        translation_key="collector_worker_memory_use",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        suggested_display_precision=1,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.worker.rss if stats.worker else None,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_worker_processor_use",
+        translation_key="collector_worker_processor_use",
+        native_unit_of_measurement=PERCENTAGE,
+        icon=get_cpu_icon(),
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.worker.cpu_percent if stats.worker else None,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_worker_restarts",
+        translation_key="collector_worker_restarts",
+        icon="mdi:restart",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.worker_restarts,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_connections",
+        translation_key="collector_connections",
+        icon="mdi:lan-connect",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: len(stats.connections),
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_send_queue",
+        translation_key="collector_send_queue",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        # Largest queue, a client that can not keep up
+        value_fn=lambda stats: max(stats.connections.values(), default=0),
+        attributes_fn=lambda stats: dict(stats.connections),
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_messages_sent",
+        translation_key="collector_messages_sent",
+        icon="mdi:message-arrow-right",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.messages_sent,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_bytes_sent",
+        translation_key="collector_bytes_sent",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        suggested_display_precision=1,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.bytes_sent,
+    ),
+    CollectorStatsSensorEntityDescription(
+        key="collector_probes_skipped",
+        translation_key="collector_probes_skipped",
+        icon="mdi:timer-sand-full",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        # Jobs rejected by full executor pools, per pool in the attributes
+        value_fn=lambda stats: sum(
+            pool.rejected for pool in stats.executor_pools.values()
+        ),
+        attributes_fn=lambda stats: {
+            name: pool.to_dict() for name, pool in stats.executor_pools.items()
+        },
+    ),
+)
+
+
 # def check_legacy_resource(resource: str, resources: set[str]) -> bool:
 #     """Return True if legacy resource was configured."""
 #     # This function to check legacy resources can be removed
@@ -437,7 +851,29 @@ IO_COUNTER = {
     "throughput_network_out": "bytes_sent",
     "throughput_network_in": "bytes_recv",
 }
+DISK_IO = {
+    "disk_throughput_read": "read",
+    "disk_throughput_write": "write",
+    "disk_read_iops": "read_iops",
+    "disk_write_iops": "write_iops",
+    "disk_busy_percent": "busy_percent",
+}
 IF_ADDRS_FAMILY = {"ipv4_address": socket.AF_INET, "ipv6_address": socket.AF_INET6}
+CGROUP_USAGE = {
+    "cgroup_processor_use": "cpu_percent",
+    "cgroup_memory_use": "memory",
+    "cgroup_throughput_io_read": "io_read",
+    "cgroup_throughput_io_write": "io_write",
+}
+PRESSURE_KIND = {"pressure_some": "some", "pressure_full": "full"}
+# Protocol and state per sensor, None counts the sockets in all states
+SOCKET_STATE = {
+    "tcp_established": ("tcp", "ESTABLISHED"),
+    "tcp_time_wait": ("tcp", "TIME_WAIT"),
+    "tcp_listen": ("tcp", "LISTEN"),
+    "udp_sockets": ("udp", None),
+}
+TOP_PROCESS_RESOURCE = {"top_cpu_process": "cpu", "top_memory_process": "memory"}
 
 
 async def async_setup_entry(
@@ -446,7 +882,7 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up System Monitor sensors based on a config entry."""
-    entities: list[SystemMonitorSensor] = []
+    entities: list[SensorEntity] = []
     legacy_resources: set[str] = set(entry.options.get("resources", []))
     loaded_resources: set[str] = set()
     coordinator = entry.runtime_data.coordinator
@@ -461,16 +897,29 @@ async def async_setup_entry(
             "network_arguments": get_all_network_interfaces(hass, coordinator),
         }
 
-    cpu_temperature: float | None = None
-    with contextlib.suppress(AttributeError):
-        cpu_temperature = read_cpu_temperature(sensor_data.temperatures)
-
     startup_arguments = await hass.async_add_executor_job(get_arguments)
-    startup_arguments["cpu_temperature"] = cpu_temperature
+    startup_arguments["cpu_temperature"] = sensor_data.cpu_temperature
 
     _LOGGER.debug("Setup from options %s", entry.options)
 
     for _type, sensor_description in SENSOR_TYPES.items():
+        if _type in DISK_IO:
+            for argument, disk_io in sensor_data.disk_io.items():
+                if _type == "disk_busy_percent" and disk_io.busy_percent is None:
+                    # Not available on all platforms
+                    continue
+                loaded_resources.add(slugify(f"{_type}_{argument}"))
+                entities.append(
+                    SystemMonitorSensor(
+                        coordinator,
+                        sensor_description,
+                        entry.entry_id,
+                        argument,
+                        machine_id,
+                    )
+                )
+            continue
+
         if _type.startswith("disk_"):
             for argument in startup_arguments["disk_arguments"]:
                 # is_enabled = check_legacy_resource(
@@ -588,6 +1037,38 @@ async def async_setup_entry(
             )
             continue
 
+        if _type == "processor_use_core":
+            for core in range(len(sensor_data.cpu_percent_per_core)):
+                argument = str(core)
+                loaded_resources.add(slugify(f"{_type}_{argument}"))
+                entities.append(
+                    SystemMonitorSensor(
+                        coordinator,
+                        sensor_description,
+                        entry.entry_id,
+                        argument,
+                        machine_id,
+                    )
+                )
+            continue
+
+        if (field := _type.removeprefix("processor_")) in CPU_TIMES_FIELDS:
+            if sensor_data.cpu_times_percent.get(field) is None:
+                # Not all platforms have all CPU times, e.g. steal is Linux only
+                continue
+            argument = ""
+            loaded_resources.add(slugify(f"{_type}_{argument}"))
+            entities.append(
+                SystemMonitorSensor(
+                    coordinator,
+                    sensor_description,
+                    entry.entry_id,
+                    argument,
+                    machine_id,
+                )
+            )
+            continue
+
         if _type == "processor_temperature":
             if not startup_arguments["cpu_temperature"]:
                 # Don't load processor temperature sensor if we can't read it.
@@ -607,6 +1088,73 @@ async def async_setup_entry(
             )
             continue
 
+        if _type.startswith("pressure_"):
+            # Only on Linux
+            for argument, stalls in sensor_data.pressure.items():
+                if PRESSURE_KIND[_type] not in stalls:
+                    continue
+                loaded_resources.add(slugify(f"{_type}_{argument}"))
+                entities.append(
+                    SystemMonitorSensor(
+                        coordinator,
+                        sensor_description,
+                        entry.entry_id,
+                        argument,
+                        machine_id,
+                    )
+                )
+            continue
+
+        if _type.startswith("cgroup_"):
+            # Only the cgroups that exist at setup, like disks
+            for argument in sensor_data.cgroups:
+                loaded_resources.add(slugify(f"{_type}_{argument}"))
+                entities.append(
+                    SystemMonitorSensor(
+                        coordinator,
+                        sensor_description,
+                        entry.entry_id,
+                        argument,
+                        machine_id,
+                    )
+                )
+            continue
+
+        if _type in SOCKET_STATE:
+            if not sensor_data.sockets:
+                # Collector does not send socket counts
+                continue
+            argument = ""
+            loaded_resources.add(slugify(f"{_type}_{argument}"))
+            entities.append(
+                SystemMonitorSensor(
+                    coordinator,
+                    sensor_description,
+                    entry.entry_id,
+                    argument,
+                    machine_id,
+                )
+            )
+            continue
+
+        if _type.startswith("top_"):
+            if not sensor_data.top_processes:
+                # Collector does not send top processes
+                continue
+            for rank in range(1, TOP_PROCESSES_COUNT + 1):
+                argument = str(rank)
+                loaded_resources.add(slugify(f"{_type}_{argument}"))
+                entities.append(
+                    SystemMonitorSensor(
+                        coordinator,
+                        sensor_description,
+                        entry.entry_id,
+                        argument,
+                        machine_id,
+                    )
+                )
+            continue
+
         if _type.startswith("swap_"):
             argument = ""
             # is_enabled = check_legacy_resource(f"{_type}_{argument}", legacy_resources)
@@ -667,6 +1215,15 @@ async def async_setup_entry(
             ):
                 entity_registry.async_remove(entity_id)
 
+    if (stats_coordinator := entry.runtime_data.stats_coordinator) is not None:
+        for stats_description in COLLECTOR_STATS_SENSOR_TYPES:
+            loaded_resources.add(slugify(f"{stats_description.key}_"))
+            entities.append(
+                CollectorStatsSensor(
+                    stats_coordinator, stats_description, entry.entry_id, machine_id
+                )
+            )
+
     clean_obsolete_entities()
 
     async_add_entities(entities)
@@ -733,6 +1290,13 @@ class SystemMonitorSensor(CoordinatorEntity[SystemMonitorCoordinator], SensorEnt
         self._attr_native_value = self.entity_description.value_fn(self)
         super()._handle_coordinator_update()
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes."""
+        if self.entity_description.attributes_fn is not None:
+            return self.entity_description.attributes_fn(self)
+        return None
+
     @property
     def available(self) -> bool:
         """Return if entity is available."""
@@ -742,3 +1306,42 @@ class SystemMonitorSensor(CoordinatorEntity[SystemMonitorCoordinator], SensorEnt
                 and self.native_value is not None
             )
         return super().available
+
+
+class CollectorStatsSensor(CoordinatorEntity[CollectorStatsCoordinator], SensorEntity):
+    """Implementation of a sensor for the statistics of the collector itself."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    entity_description: CollectorStatsSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: CollectorStatsCoordinator,
+        sensor_description: CollectorStatsSensorEntityDescription,
+        entry_id: str,
+        machine_id: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = sensor_description
+        self._attr_unique_id: str = slugify(f"{machine_id}_{sensor_description.key}")
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, entry_id)})
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state."""
+        if self.coordinator.data is None:
+            return None
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes."""
+        if (
+            self.entity_description.attributes_fn is not None
+            and self.coordinator.data is not None
+        ):
+            return self.entity_description.attributes_fn(self.coordinator.data)
+        return None
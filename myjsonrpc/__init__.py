@@ -1,12 +1,32 @@
 import logging
 
-from .jsonrpc import JsonRpc, JsonRpcResponse, JsonRpcResponseError, JsonRpcNotification
+from .jsonrpc import (
+    JsonRpc,
+    JsonRpcConnectionError,
+    JsonRpcError,
+    JsonRpcNotification,
+    JsonRpcRawResult,
+    JsonRpcResponse,
+    JsonRpcResponseError,
+    JsonRpcSubscription,
+    JsonRpcTimeoutError,
+)
+from .observers import JsonRpcMetrics, JsonRpcObserver
+from .pubsub import Publisher
 
 __all__ = [
     "JsonRpc",
     "JsonRpcResponse",
     "JsonRpcResponseError",
     "JsonRpcNotification",
+    "JsonRpcRawResult",
+    "JsonRpcError",
+    "JsonRpcTimeoutError",
+    "JsonRpcConnectionError",
+    "JsonRpcSubscription",
+    "JsonRpcObserver",
+    "JsonRpcMetrics",
+    "Publisher",
 ]
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
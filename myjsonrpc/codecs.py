@@ -0,0 +1,100 @@
+"""JSON codecs, encoding to and decoding from bytes.
+
+orjson or msgspec are used when installed, they are a lot faster than the
+json module from the standard library which is used otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _default(obj: Any) -> Any:
+    # Like the json module, tuple subclasses (e.g. named tuples) become arrays
+    if isinstance(obj, tuple):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonCodec:
+    """Codec using the json module of the standard library."""
+
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def decode(self, data: str | bytes) -> Any:
+        """Decode a JSON document, raises ValueError when it is not valid."""
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec using orjson."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+        # Integer keys become strings, like with the json module
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def encode(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, default=_default, option=self._option)
+
+    def decode(self, data: str | bytes) -> Any:
+        # orjson.JSONDecodeError is a ValueError
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    """Codec using msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._decode_error = msgspec.DecodeError
+        self._encoder = msgspec.json.Encoder(enc_hook=_default)
+        self._decoder = msgspec.json.Decoder()
+
+    def encode(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def decode(self, data: str | bytes) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as err:
+            raise ValueError(str(err)) from err
+
+
+# In order of preference, fastest first. msgspec encodes an update about 1.5 times as
+# fast as orjson and decodes as fast, see benchmarks/jsonrpc_codecs.py
+CODECS: tuple[type[JsonCodec], ...] = (MsgspecCodec, OrjsonCodec, JsonCodec)
+
+
+def available_codecs() -> list[JsonCodec]:
+    """Return an instance of all codecs that can be used, in order of preference."""
+    codecs = []
+    for codec_class in CODECS:
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            continue
+    return codecs
+
+
+def get_codec(name: str | None = None) -> JsonCodec:
+    """Return the codec with name, or the fastest available one."""
+    for codec in available_codecs():
+        if name is None or codec.name == name:
+            _LOGGER.debug("Using JSON codec %s", codec.name)
+            return codec
+    raise ValueError(f"JSON codec {name} is not available")
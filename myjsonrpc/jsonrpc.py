@@ -4,14 +4,90 @@
 from __future__ import annotations
 
 import asyncio
+from collections import deque
+import contextlib
 import enum
+import inspect
 import json
 import logging
-from typing import Any, Callable, Awaitable
+import sys
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine
 import uuid
 
+from .codecs import JsonCodec, get_codec
+from .observers import JsonRpcObserver
 from .transports.transport_base import JsonRpcBaseTransport
 
+# Maximum number of handlers running at the same time per connection
+DEFAULT_MAX_CONCURRENT_HANDLERS = 16
+# Maximum number of received messages waiting for a handler slot per connection,
+# requests beyond that get a SERVER_BUSY error
+DEFAULT_MAX_QUEUED_MESSAGES = 64
+# Seconds to wait for the response on a call
+DEFAULT_CALL_TIMEOUT = 30
+
+# Methods to subscribe on and unsubscribe from topics, see pubsub.Publisher
+SUBSCRIBE_METHOD = "rpc.subscribe"
+UNSUBSCRIBE_METHOD = "rpc.unsubscribe"
+# Notification with a chunk of the result of a streaming handler, params are
+# the id of the request and the chunk
+CHUNK_METHOD = "rpc.chunk"
+
+# Put in the chunk queue of a stream when its response arrived
+_STREAM_END = object()
+
+
+def _is_stream_result(result: Any, count: int) -> bool:
+    """Return if result is the final result of a streaming handler that sent count chunks."""
+    return type(result) is dict and result.keys() == {"chunks"} and result["chunks"] == count
+
+
+def _failed_call(pending_future: asyncio.Future) -> bool:
+    """Return if a call got no response, or an error response."""
+    if not pending_future.done() or pending_future.cancelled():
+        return True
+    return (
+        pending_future.exception() is not None
+        or pending_future.result().error is not None
+    )
+
+
+def _create_eager_task(coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+    """
+    Return a task that already ran up to its first wait.
+
+    Handlers that do not wait for anything are done right away, without a round
+    trip through the event loop.
+    """
+    if sys.version_info >= (3, 12):
+        return asyncio.Task(coro, loop=asyncio.get_running_loop(), eager_start=True)
+    return asyncio.get_running_loop().create_task(coro)
+
+
+def _log_handler_task_exception(task: asyncio.Task) -> None:
+    if not task.cancelled() and (exception := task.exception()) is not None:
+        # Handler exceptions are already handled, this is e.g. a failed send
+        logging.error("Exception while handling message", exc_info=exception)
+
+
+def _is_cancelling() -> bool:
+    """Return if the current task is being cancelled, i.e. not by a handler itself."""
+    task = asyncio.current_task()
+    return task is not None and task.cancelling() > 0
+
+
+class JsonRpcError(Exception):
+    """Base of the exceptions raised when calling a remote method."""
+
+
+class JsonRpcTimeoutError(JsonRpcError, TimeoutError):
+    """No response was received in time."""
+
+
+class JsonRpcConnectionError(JsonRpcError, ConnectionError):
+    """The connection was closed before the response was received."""
+
 
 @enum.unique
 class JsonRpcErrorCode(enum.Enum):
@@ -20,6 +96,8 @@ class JsonRpcErrorCode(enum.Enum):
     METHOD_NOT_FOUND = (-32601, "Method not found")
     INVALID_PARAMS = (-32602, "Invalid method parameters")
     INTERNAL_ERROR = (-32603, "Internal JSON-RPC error")
+    # Implementation defined server error
+    SERVER_BUSY = (-32000, "Server busy")
 
 
 class JsonRpcResponseError:
@@ -37,6 +115,27 @@ class JsonRpcResponseError:
         return error
 
 
+class JsonRpcRawResult:
+    """
+    Result that is already encoded as JSON, it is sent as is.
+
+    Useful for results that rarely change, they do not have to be encoded for every request.
+    """
+
+    def __init__(self, json_text: str | bytes) -> None:
+        self.json_bytes = json_text.encode() if isinstance(json_text, str) else json_text
+
+    @property
+    def json_text(self) -> str:
+        return self.json_bytes.decode()
+
+    @classmethod
+    def from_result(
+        cls, result: Any, codec: JsonCodec | None = None
+    ) -> JsonRpcRawResult:
+        return cls((codec or get_codec()).encode(result))
+
+
 class JsonRpcResponse:
     def __init__(
         self,
@@ -49,6 +148,8 @@ class JsonRpcResponse:
         self.error = error
 
     def __str__(self) -> str:
+        if isinstance(self.result, JsonRpcRawResult) and self.error is None:
+            return f'{{"jsonrpc": "2.0", "id": {json.dumps(self.id)}, "result": {self.result.json_text}}}'
         return json.dumps(self.to_dict())
 
     def to_dict(self):
@@ -56,12 +157,27 @@ class JsonRpcResponse:
             "jsonrpc": "2.0",
             "id": self.id,
         }
-        if self.result is not None:
+        if isinstance(self.result, JsonRpcRawResult):
+            message["result"] = json.loads(self.result.json_text)
+        elif self.result is not None:
             message["result"] = self.result
         if self.error is not None:
             message["error"] = self.error.to_dict()
         return message
 
+    def to_bytes(self, codec: JsonCodec) -> bytes:
+        if isinstance(self.result, JsonRpcRawResult) and self.error is None:
+            return b"".join(
+                (
+                    b'{"jsonrpc":"2.0","id":',
+                    codec.encode(self.id),
+                    b',"result":',
+                    self.result.json_bytes,
+                    b"}",
+                )
+            )
+        return codec.encode(self.to_dict())
+
 
 class JsonRpcNotification:
     def __init__(
@@ -84,6 +200,9 @@ class JsonRpcNotification:
             message["params"] = self.params
         return message
 
+    def to_bytes(self, codec: JsonCodec) -> bytes:
+        return codec.encode(self.to_dict())
+
 
 class JsonRpcRequest(JsonRpcNotification):
     def __init__(
@@ -104,40 +223,445 @@ class JsonRpcRequest(JsonRpcNotification):
         return message
 
 
+class _InvalidParamsError(Exception):
+    """Params do not match the signature of the handler."""
+
+
+class _MethodHandler:
+    """
+    Handler of a method, with its signature inspected once at registration.
+
+    Calling it checks the params against the signature and calls the handler with them,
+    so bad params are reported as such instead of failing somewhere in the handler.
+    """
+
+    def __init__(
+        self, handler: Callable[..., Awaitable[Any]], lock: asyncio.Lock | None = None
+    ) -> None:
+        self.handler = handler
+        self.lock = lock
+        # Async generators stream their result in chunks
+        self.streaming = inspect.isasyncgenfunction(handler)
+
+        try:
+            parameters = inspect.signature(handler).parameters.values()
+        except (TypeError, ValueError):
+            # Not inspectable, e.g. some builtins, just call it with the params
+            self._check = False
+            return
+        self._check = True
+
+        kind = inspect.Parameter
+        positional = [
+            p for p in parameters if p.kind in (kind.POSITIONAL_ONLY, kind.POSITIONAL_OR_KEYWORD)
+        ]
+        self._max_positional = (
+            None
+            if any(p.kind == kind.VAR_POSITIONAL for p in parameters)
+            else len(positional)
+        )
+        self._min_positional = sum(1 for p in positional if p.default is p.empty)
+        # Keyword only parameters can not be given in a list
+        self._required_keyword_only = [
+            p.name for p in parameters if p.kind == kind.KEYWORD_ONLY and p.default is p.empty
+        ]
+
+        self._names = (
+            None
+            if any(p.kind == kind.VAR_KEYWORD for p in parameters)
+            else frozenset(
+                p.name
+                for p in parameters
+                if p.kind in (kind.POSITIONAL_OR_KEYWORD, kind.KEYWORD_ONLY)
+            )
+        )
+        self._required_names = frozenset(
+            p.name
+            for p in parameters
+            if p.kind in (kind.POSITIONAL_OR_KEYWORD, kind.KEYWORD_ONLY)
+            and p.default is p.empty
+        )
+        # Positional only parameters can not be given in a dict
+        self._required_positional_only = any(
+            p.kind == kind.POSITIONAL_ONLY and p.default is p.empty for p in parameters
+        )
+
+    def __call__(self, params: Any) -> Awaitable[Any]:
+        """Return the awaitable of the handler called with params, raises _InvalidParamsError."""
+        # Decoded JSON only has exact types
+        params_type = type(params)
+        if params_type is list:
+            if self._check:
+                self._check_list(len(params))
+            return self.handler(*params)
+        if params_type is dict:
+            if self._check:
+                self._check_dict(params.keys())
+            return self.handler(**params)
+        if params is None:
+            if self._check:
+                self._check_list(0)
+            return self.handler()
+        raise _InvalidParamsError("params must be an array or object")
+
+    def _check_list(self, count: int) -> None:
+        if count < self._min_positional:
+            raise _InvalidParamsError(f"at least {self._min_positional} params required")
+        if self._max_positional is not None and count > self._max_positional:
+            raise _InvalidParamsError(f"at most {self._max_positional} params allowed")
+        if self._required_keyword_only:
+            raise _InvalidParamsError(
+                f"params {', '.join(self._required_keyword_only)} must be given by name"
+            )
+
+    def _check_dict(self, names) -> None:
+        if self._names is not None and (unknown := names - self._names):
+            raise _InvalidParamsError(f"unknown params {', '.join(sorted(unknown))}")
+        if missing := self._required_names - names:
+            raise _InvalidParamsError(f"missing params {', '.join(sorted(missing))}")
+        if self._required_positional_only:
+            raise _InvalidParamsError("params must be given as array")
+
+
+class JsonRpcSubscription:
+    """Subscription on a topic, returned by `JsonRpc.subscribe`."""
+
+    def __init__(self, jsonrpc: JsonRpc, topic: str) -> None:
+        self._jsonrpc = jsonrpc
+        self.topic = topic
+
+    async def unsubscribe(self) -> None:
+        """Stop receiving the notifications of the topic."""
+        await self._jsonrpc.unsubscribe(self.topic)
+
+
 class JsonRpc:
-    def __init__(self, transport: JsonRpcBaseTransport) -> None:
+    def __init__(
+        self,
+        transport: JsonRpcBaseTransport,
+        max_concurrent_handlers: int = DEFAULT_MAX_CONCURRENT_HANDLERS,
+        default_timeout: float | None = DEFAULT_CALL_TIMEOUT,
+        codec: JsonCodec | None = None,
+        binary_frames: bool = False,
+        max_queued_messages: int = DEFAULT_MAX_QUEUED_MESSAGES,
+    ) -> None:
         self._transport = transport
+        self._codec = codec or get_codec()
+        # Messages are JSON text, but can be sent as binary frames for peers that prefer it.
+        # Both are accepted when receiving.
+        self._transport_send: Callable[[bytes], Awaitable[None]] = (
+            transport.send if binary_frames else transport.send_encoded_text
+        )
+        self._send_message = self._transport_send
+        # Checked before every hook, so without observers they cost next to nothing
+        self._observers: list[JsonRpcObserver] = []
+        self._default_timeout = default_timeout
         self._pending_method_calls: dict[str, asyncio.Future] = {}
-        self._notification_handlers: dict[str, Callable[..., Awaitable[None]]] = {}
-        self._request_handlers: dict[str, Callable[..., Awaitable[Any]]] = {}
+        # Chunks of streamed results, per request id
+        self._chunk_queues: dict[str, asyncio.Queue] = {}
+        self._chunks: dict[str, list] = {}
+        self._notification_handlers: dict[str, _MethodHandler] = {}
+        self._request_handlers: dict[str, _MethodHandler] = {}
+        self._handler_semaphore = asyncio.Semaphore(max_concurrent_handlers)
+        self._max_concurrent_handlers = max_concurrent_handlers
+        self._handler_tasks: set[asyncio.Task] = set()
+        # Received messages waiting for a handler task. The receiver never waits for
+        # a slot itself, it has to keep reading e.g. the responses handlers wait for.
+        self._max_queued_messages = max_queued_messages
+        self._queued_messages: deque[Any] = deque()
 
         transport.register_on_receive_handler(self._on_receive)
+        transport.register_on_close_handler(self._on_close)
+
+    def add_observer(self, observer: JsonRpcObserver) -> None:
+        """Tell observer what this connection does from now on, e.g. a JsonRpcMetrics."""
+        self._observers.append(observer)
+        # Sent messages are only counted when there is someone to tell
+        self._send_message = self._observed_send
+
+    def remove_observer(self, observer: JsonRpcObserver) -> None:
+        self._observers.remove(observer)
+        if not self._observers:
+            self._send_message = self._transport_send
+
+    async def _observed_send(self, message: bytes) -> None:
+        for observer in self._observers:
+            observer.on_send(len(message))
+        await self._transport_send(message)
+
+    def _observe_call_start(self, method: str) -> float | None:
+        """Return the start time of a call, None when there are no observers."""
+        if not self._observers:
+            return None
+        for observer in self._observers:
+            observer.on_call_start(method)
+        return time.perf_counter()
 
-    def register_notification_handler(self, method, handler):
-        self._notification_handlers[method] = handler
+    def _observe_call_end(self, method: str, start: float | None, failed: bool) -> None:
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        for observer in self._observers:
+            observer.on_call_end(method, duration, failed)
+
+    def register_notification_handler(self, method, handler, concurrent=False):
+        """
+        Register a handler for notifications of method.
+
+        By default notifications are handled one at a time in the order they arrive,
+        concurrent handlers can run at the same time like request handlers.
+        """
+        # Serial handlers hold the lock while running, concurrent ones a slot of the semaphore
+        self._notification_handlers[method] = _MethodHandler(
+            handler, lock=None if concurrent else asyncio.Lock()
+        )
 
     def register_request_handler(self, method, handler):
-        self._request_handlers[method] = handler
+        """
+        Register a handler for requests of method.
+
+        Requests with params that do not fit the signature of the handler get an
+        INVALID_PARAMS error response without calling it.
+        """
+        self._request_handlers[method] = _MethodHandler(handler)
 
     async def call_method(
-        self, method: str, params: Any | None = None
+        self, method: str, params: Any | None = None, timeout: float | None = None
     ) -> JsonRpcResponse:
+        """
+        Call a remote method and return its response.
+
+        Raises JsonRpcTimeoutError when there is no response within timeout seconds,
+        None uses the default timeout. Raises JsonRpcConnectionError when the
+        connection closes while waiting.
+
+        When the other side streams the result, the result is the list of all chunks.
+        """
         logging.debug("Call method: %s, params: %s", method, params)
 
-        pending_future: asyncio.Future = asyncio.Future()
+        request = JsonRpcRequest(method, params)
+        pending_future = self._add_pending_method_call(request)
+        start = self._observe_call_start(method)
+        failed = True
+        try:
+            async with self._call_timeout(timeout, method):
+                await self._send_message(request.to_bytes(self._codec))
+                response = await pending_future
+            failed = response.error is not None
+            return response
+        finally:
+            # Also when timed out or cancelled, a late response is just ignored
+            self._pending_method_calls.pop(request.id, None)
+            self._chunks.pop(request.id, None)
+            self._observe_call_end(method, start, failed)
+
+    async def call_method_stream(
+        self, method: str, params: Any | None = None, timeout: float | None = None
+    ) -> AsyncIterator[Any]:
+        """
+        Call a remote method with a streaming handler and iterate over the chunks of its result.
+
+        Chunks are handed out as they arrive, so the whole result is never in memory.
+        The timeout applies to waiting for each chunk. Raises JsonRpcError when the
+        handler fails, possibly after some chunks.
+        """
+        logging.debug("Call method stream: %s, params: %s", method, params)
 
         request = JsonRpcRequest(method, params)
+        pending_future = self._add_pending_method_call(request, collect_chunks=False)
+        chunks: asyncio.Queue = asyncio.Queue()
+        self._chunk_queues[request.id] = chunks
+        start = self._observe_call_start(method)
+        failed = True
+        count = 0
+        try:
+            await self._send_message(request.to_bytes(self._codec))
+            while True:
+                async with self._call_timeout(timeout, method):
+                    chunk = await chunks.get()
+                if chunk is _STREAM_END:
+                    break
+                count += 1
+                yield chunk
+
+            # Raises when the connection was closed
+            response = pending_future.result()
+            if response.error is not None:
+                raise JsonRpcError(f"Streaming {method} failed: {response.error}")
+            if not _is_stream_result(response.result, count):
+                # The result of a plain handler would get lost
+                raise JsonRpcError(f"{method} is not a streaming method")
+            failed = False
+        finally:
+            # Also when the caller stops early, later chunks are just ignored
+            self._pending_method_calls.pop(request.id, None)
+            self._chunk_queues.pop(request.id, None)
+            self._observe_call_end(method, start, failed)
+
+    async def call_batch(
+        self, calls: list[tuple[str, Any | None]], timeout: float | None = None
+    ) -> list[JsonRpcResponse]:
+        """
+        Call several methods in one message, calls are (method, params) tuples.
+
+        The responses are returned in the order of the calls. Raises like `call_method`
+        when not all responses are received.
+        """
+        logging.debug("Call batch: %s", calls)
+
+        requests = [JsonRpcRequest(method, params) for method, params in calls]
+        pending_futures = [self._add_pending_method_call(request) for request in requests]
+        starts = [self._observe_call_start(method) for method, _ in calls]
+        try:
+            async with self._call_timeout(timeout, "batch"):
+                await self._send_message(
+                    b"[%s]" % b",".join(request.to_bytes(self._codec) for request in requests)
+                )
+                return await asyncio.gather(*pending_futures)
+        finally:
+            for request in requests:
+                self._pending_method_calls.pop(request.id, None)
+                self._chunks.pop(request.id, None)
+            # Every call of the batch counts on its own, also when others got no response
+            for (method, _), start, pending_future in zip(calls, starts, pending_futures):
+                if start is not None:
+                    self._observe_call_end(method, start, _failed_call(pending_future))
+
+    def _add_pending_method_call(
+        self, request: JsonRpcRequest, collect_chunks: bool = True
+    ) -> asyncio.Future:
+        pending_future = asyncio.get_running_loop().create_future()
         self._pending_method_calls[request.id] = pending_future
-
-        await self._transport.send(str(request))
-
-        # TODO: Add some kind of timeout?
-        await pending_future
-        return pending_future.result()
+        if collect_chunks:
+            # In case the result is streamed, so even no chunks give a list
+            self._chunks[request.id] = []
+        return pending_future
+
+    @contextlib.asynccontextmanager
+    async def _call_timeout(self, timeout: float | None, method: str):
+        timeout = self._default_timeout if timeout is None else timeout
+        try:
+            async with asyncio.timeout(timeout):
+                yield
+        except TimeoutError as err:
+            raise JsonRpcTimeoutError(
+                f"No response on {method} within {timeout} seconds"
+            ) from err
+
+    def _on_close(self) -> None:
+        """Fail the calls that are still waiting for a response, drop the queued messages."""
+        self._queued_messages.clear()
+        pending_method_calls = list(self._pending_method_calls.values())
+        self._pending_method_calls.clear()
+        self._chunks.clear()
+        for chunks in self._chunk_queues.values():
+            chunks.put_nowait(_STREAM_END)
+        if pending_method_calls:
+            logging.debug("Connection closed, failing %s calls", len(pending_method_calls))
+        for pending_future in pending_method_calls:
+            if not pending_future.done():
+                pending_future.set_exception(
+                    JsonRpcConnectionError("Connection closed")
+                )
 
     async def send_notification(self, method: str, params: Any | None = None) -> None:
         logging.debug("Send notification, method: %s, params: %s", method, params)
-        await self._transport.send(str(JsonRpcNotification(method, params)))
+        await self._send_message(
+            JsonRpcNotification(method, params).to_bytes(self._codec)
+        )
+
+    async def send_encoded(self, message: bytes) -> None:
+        """Send a message that is already encoded, e.g. by a Publisher."""
+        await self._send_message(message)
+
+    async def subscribe(
+        self, topic: str, handler: Callable[..., Awaitable[None]], concurrent=False
+    ) -> JsonRpcSubscription:
+        """
+        Subscribe on a topic of the other side, handler is called with the params of its notifications.
+
+        Raises JsonRpcError when the other side does not know the topic.
+        """
+        self.register_notification_handler(topic, handler, concurrent=concurrent)
+        response = await self.call_method(SUBSCRIBE_METHOD, {"topic": topic})
+        if response.error is not None:
+            self._notification_handlers.pop(topic, None)
+            raise JsonRpcError(f"Subscribing on {topic} failed: {response.error}")
+        return JsonRpcSubscription(self, topic)
+
+    async def unsubscribe(self, topic: str) -> None:
+        """Stop receiving the notifications of a topic."""
+        self._notification_handlers.pop(topic, None)
+        response = await self.call_method(UNSUBSCRIBE_METHOD, {"topic": topic})
+        if response.error is not None:
+            raise JsonRpcError(f"Unsubscribing from {topic} failed: {response.error}")
+
+    async def drain(self) -> None:
+        """Wait until the handlers of all received messages are done."""
+        while self._handler_tasks:
+            await asyncio.wait(set(self._handler_tasks))
+
+    async def close(self) -> None:
+        """Cancel the handlers that are still running, e.g. when the connection is gone."""
+        self._queued_messages.clear()
+        for task in self._handler_tasks:
+            task.cancel()
+        await self.drain()
+
+    async def _dispatch(self, message: Any) -> None:
+        """Handle a request, notification or batch in a task, or queue it when all slots are taken."""
+        if len(self._handler_tasks) < self._max_concurrent_handlers:
+            self._start_handler_task(message)
+        elif len(self._queued_messages) < self._max_queued_messages:
+            self._queued_messages.append(message)
+        else:
+            await self._reject(message)
+
+    def _start_handler_task(self, message: Any) -> None:
+        if isinstance(message, list):
+            coro = self._handle_batch(message)
+        else:
+            coro = self._handle_and_respond(message)
+        task = _create_eager_task(coro)
+        if task.done():
+            # Handled without waiting for anything
+            _log_handler_task_exception(task)
+            return
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_task_done)
+
+    def _handler_task_done(self, task: asyncio.Task) -> None:
+        self._handler_tasks.discard(task)
+        _log_handler_task_exception(task)
+        while (
+            self._queued_messages
+            and len(self._handler_tasks) < self._max_concurrent_handlers
+        ):
+            self._start_handler_task(self._queued_messages.popleft())
+
+    async def _reject(self, message: Any) -> None:
+        """Respond to the requests in message with SERVER_BUSY, notifications are dropped."""
+        messages = message if isinstance(message, list) else [message]
+        responses = [
+            self._encode(
+                JsonRpcResponse(
+                    id=item["id"],
+                    error=JsonRpcResponseError(JsonRpcErrorCode.SERVER_BUSY),
+                )
+            )
+            for item in messages
+            if type(item) is dict and item.get("method") and item.get("id") is not None
+        ]
+        logging.warning(
+            "Too many messages queued, rejected %s requests and dropped %s notifications",
+            len(responses),
+            len(messages) - len(responses),
+        )
+        if not responses:
+            return
+        await self._send_message(
+            b"[%s]" % b",".join(responses) if isinstance(message, list) else responses[0]
+        )
 
     async def _handle_notification(self, method, params):
         notification_handler = self._notification_handlers.get(method, None)
@@ -145,15 +669,25 @@ class JsonRpc:
             logging.debug("No notification handler for method: %s", method)
             return
 
+        start = time.perf_counter() if self._observers else None
+        failed = True
         try:
-            if isinstance(params, list):
-                await notification_handler(*params)
-            elif isinstance(params, dict):
-                await notification_handler(**params)
-            elif params is None:
-                await notification_handler()
+            async with notification_handler.lock or self._handler_semaphore:
+                await notification_handler(params)
+            failed = False
+        except _InvalidParamsError as err:
+            logging.warning("Invalid params for notification %s: %s", method, err)
         except Exception:
             logging.exception("Exception in notification handler")
+        except asyncio.CancelledError:
+            if _is_cancelling():
+                raise
+            logging.exception("Notification handler cancelled itself")
+        finally:
+            if start is not None:
+                duration = time.perf_counter() - start
+                for observer in self._observers:
+                    observer.on_notification(method, duration, failed)
 
         # No responses for notifications
         return
@@ -162,99 +696,219 @@ class JsonRpc:
         request_handler = self._request_handlers.get(method, None)
         if request_handler is None:
             logging.debug("No request handler for method: %s", method)
-            return str(
+            return self._encode(
                 JsonRpcResponse(
                     id=id,
                     error=JsonRpcResponseError(JsonRpcErrorCode.METHOD_NOT_FOUND),
                 )
             )
 
-        # TODO: Maybe requests should be handled an a separate task?
+        start = None
+        if self._observers:
+            for observer in self._observers:
+                observer.on_request_start(method)
+            start = time.perf_counter()
         result = None
         error = None
         try:
-            if isinstance(params, list):
-                result = await request_handler(*params)
-            elif isinstance(params, dict):
-                result = await request_handler(**params)
-            elif params is None:
-                result = await request_handler()
-            else:
-                error = JsonRpcResponseError(JsonRpcErrorCode.INVALID_PARAMS)
+            async with self._handler_semaphore:
+                if request_handler.streaming:
+                    result = await self._send_chunks(id, request_handler(params))
+                else:
+                    result = await request_handler(params)
+        except _InvalidParamsError as err:
+            error = JsonRpcResponseError(JsonRpcErrorCode.INVALID_PARAMS, data=str(err))
         except Exception:
+            logging.exception("Exception in request handler for method: %s", method)
             error = JsonRpcResponseError(JsonRpcErrorCode.INTERNAL_ERROR)
+        except asyncio.CancelledError:
+            # No response when the connection is closed, but a handler cancelling
+            # itself is just a failing handler
+            if _is_cancelling():
+                raise
+            logging.exception("Request handler for method %s cancelled itself", method)
+            error = JsonRpcResponseError(JsonRpcErrorCode.INTERNAL_ERROR)
+        finally:
+            if start is not None:
+                duration = time.perf_counter() - start
+                # Cancelled requests get no response, so no error code either
+                error_code = None if error is None else error.code.value[0]
+                for observer in self._observers:
+                    observer.on_request_end(method, duration, error_code)
+
+        return self._encode(JsonRpcResponse(id, result=result, error=error))
+
+    async def _send_chunks(self, id, chunks: AsyncIterator[Any]) -> dict:
+        """Send the chunks yielded by a streaming handler, returns the final result."""
+        count = 0
+        async with contextlib.aclosing(chunks):
+            async for chunk in chunks:
+                # Encoded and sent one by one, other messages can go in between
+                await self._send_message(
+                    JsonRpcNotification(CHUNK_METHOD, {"id": id, "chunk": chunk}).to_bytes(
+                        self._codec
+                    )
+                )
+                count += 1
+        return {"chunks": count}
+
+    def _handle_chunk(self, params: Any) -> None:
+        if type(params) is not dict or (id := params.get("id")) is None:
+            logging.warning("Invalid chunk: %s", params)
+            return
 
-        return str(JsonRpcResponse(id, result=result, error=error))
+        if (chunks := self._chunk_queues.get(id)) is not None:
+            chunks.put_nowait(params.get("chunk"))
+        elif (collected := self._chunks.get(id)) is not None:
+            # Collected for call_method
+            collected.append(params.get("chunk"))
+        else:
+            logging.debug("No pending stream for id: %s", id)
 
-    async def _handle_response(self, id, result, error):
+    def _handle_response(self, id, result, error):
         if pending_method_handler := self._pending_method_calls.pop(id, None):
-            pending_method_handler.set_result(JsonRpcResponse(id, result, error))
+            if (
+                (chunks := self._chunks.pop(id, None)) is not None
+                and error is None
+                and _is_stream_result(result, len(chunks))
+            ):
+                result = chunks
+            if not pending_method_handler.done():
+                pending_method_handler.set_result(JsonRpcResponse(id, result, error))
+            if (chunk_queue := self._chunk_queues.get(id)) is not None:
+                chunk_queue.put_nowait(_STREAM_END)
             return None
 
         logging.warning("No pending response handler for id: %s", id)
         return None
 
-    async def _on_receive(self, inbound_message: str) -> None:
+    def _encode(self, message: JsonRpcResponse) -> bytes:
+        return message.to_bytes(self._codec)
+
+    async def _on_receive(self, inbound_message: str | bytes) -> None:
         logging.debug("On receive, message %s", inbound_message)
+        if self._observers:
+            # Text frames are UTF-8 on the wire
+            size = (
+                len(inbound_message.encode())
+                if isinstance(inbound_message, str)
+                else len(inbound_message)
+            )
+            for observer in self._observers:
+                observer.on_receive(size)
 
         try:
-            message = json.loads(inbound_message)
-        except json.JSONDecodeError:
-            logging.warning(f"Invalid JSON message: {inbound_message}")
-            await self._transport.send(str(
-                JsonRpcResponse(
-                    id=None, error=JsonRpcResponseError(JsonRpcErrorCode.PARSE_ERROR)
+            message = self._codec.decode(inbound_message)
+        except ValueError:
+            logging.warning("Invalid JSON message: %s", inbound_message)
+            await self._send_message(
+                self._encode(
+                    JsonRpcResponse(
+                        id=None,
+                        error=JsonRpcResponseError(JsonRpcErrorCode.PARSE_ERROR),
+                    )
                 )
-            ))
+            )
             return
 
+        # Requests and notifications are handled in separate tasks so a slow handler
+        # does not block the messages after it, responses are sent when ready. When
+        # all slots are taken they are queued, the receiver keeps reading.
         if isinstance(message, list):
-            logging.warning(
-                "BATCH request objects not supported yet. Message is ignored"
-            )
+            if message:
+                # Responses and chunks can be in an array as well, e.g. when the other
+                # side coalesces its messages
+                message = [item for item in message if not self._handle_in_receiver(item)]
+                if not message:
+                    return
+            await self._dispatch(message)
             return
 
-        if not isinstance(message, dict):
-            logging.warning(f"Invalid JSON-RPC message: {inbound_message}")
+        if self._handle_in_receiver(message):
+            return
+        if isinstance(message, dict) and message.get("method") is None:
+            # Not a valid response either
+            if response := await self._handle_message(message):
+                await self._send_message(response)
+            return
+        await self._dispatch(message)
+
+    def _handle_in_receiver(self, message: Any) -> bool:
+        """
+        Handle responses and chunks right away, returns if the message was one.
+
+        Responses only resolve pending calls, so they are never held up by slow
+        handlers. Chunks have to stay in order.
+        """
+        if type(message) is not dict or message.get("jsonrpc") != "2.0":
+            return False
+        method = message.get("method")
+        if method is None:
+            if message.get("id") is None or (
+                "result" not in message and "error" not in message
+            ):
+                return False
+            self._handle_response(message["id"], message.get("result"), message.get("error"))
+            return True
+        if method == CHUNK_METHOD:
+            self._handle_chunk(message.get("params"))
+            return True
+        return False
+
+    async def _handle_and_respond(self, message: Any) -> None:
+        if response := await self._handle_message(message):
+            await self._send_message(response)
+
+    async def _handle_batch(self, messages: list) -> None:
+        if not messages:
+            await self._send_message(
+                self._encode(
+                    JsonRpcResponse(
+                        id=None,
+                        error=JsonRpcResponseError(JsonRpcErrorCode.INVALID_REQUEST),
+                    )
+                )
+            )
             return
 
-        if message.get("jsonrpc", None) != "2.0":
-            await self._transport.send(str(
+        # Messages in a batch are handled concurrently, the responses are sent together
+        responses = await asyncio.gather(
+            *(self._handle_message(message) for message in messages)
+        )
+        if responses := [response for response in responses if response]:
+            await self._send_message(b"[%s]" % b",".join(responses))
+
+    async def _handle_message(self, message: Any) -> bytes | None:
+        """Handle a single message, returns the response to send if there is one."""
+        if not isinstance(message, dict):
+            logging.warning("Invalid JSON-RPC message: %s", message)
+            return self._encode(
                 JsonRpcResponse(
                     id=None,
                     error=JsonRpcResponseError(JsonRpcErrorCode.INVALID_REQUEST),
                 )
-            ))
-            return
+            )
 
-        method = message.get("method", None)
-        if method and not isinstance(method, str):
-            await self._transport.send(str(
+        get = message.get
+        method = get("method")
+        if get("jsonrpc") != "2.0" or (method and type(method) is not str):
+            return self._encode(
                 JsonRpcResponse(
                     id=None,
                     error=JsonRpcResponseError(JsonRpcErrorCode.INVALID_REQUEST),
                 )
-            ))
-            return
-
-        params = message.get(
-            "params", None
-        )  # TODO: Add more checking, params should be a dict or list
-        id = message.get("id", None)
-        result = message.get("result", None)
-        error = message.get("error", None)
-
-        if method and id is None:
-            logging.debug("Notification message received for method: %s", method)
-            await self._handle_notification(method, params)
-            return
+            )
 
+        id = get("id")
         if method:
-            logging.debug("Request message received for method: %s", method)
-            if response := await self._handle_request(id, method, params):
-                await self._transport.send(response) 
-            return
-
+            # Params are checked against the handler signature
+            if id is None:
+                await self._handle_notification(method, get("params"))
+                return None
+            return await self._handle_request(id, method, get("params"))
+
+        result = get("result")
+        error = get("error")
         if id and (result or error):
             logging.debug(
                 "Response message received for id: %s, result: %s, error: %s",
@@ -262,17 +916,15 @@ class JsonRpc:
                 result,
                 error,
             )
-            if response := await self._handle_response(id, result=result, error=error):
-                await self._transport.send(response)
-            return
+            return self._handle_response(id, result=result, error=error)
 
         logging.warning(
             "Invalid JSON-RPC message. Not a request, notification or response... : %s",
-            inbound_message,
+            message,
         )
-        await self._transport.send(str(
+        return self._encode(
             JsonRpcResponse(
                 id=None,
                 error=JsonRpcResponseError(JsonRpcErrorCode.INVALID_REQUEST),
             )
-        ))
+        )
@@ -0,0 +1,151 @@
+"""Observers of what a JsonRpc connection does, for metrics and tracing."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket has no bound
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class JsonRpcObserver:
+    """
+    Gets told what a JsonRpc connection does, attach with `JsonRpc.add_observer`.
+
+    All methods do nothing, subclasses override what they need. They are called in the
+    middle of handling messages, so they should be quick and must not raise.
+    Sizes are in bytes of the encoded messages, durations in seconds.
+    """
+
+    def on_receive(self, size: int) -> None:
+        """A message was received."""
+
+    def on_send(self, size: int) -> None:
+        """A message is about to be sent."""
+
+    def on_request_start(self, method: str) -> None:
+        """A received request is about to be handled."""
+
+    def on_request_end(self, method: str, duration: float, error_code: int | None) -> None:
+        """A received request was handled, error_code is the code of the error response if any."""
+
+    def on_notification(self, method: str, duration: float, failed: bool) -> None:
+        """A received notification was handled."""
+
+    def on_call_start(self, method: str) -> None:
+        """A method of the other side is about to be called."""
+
+    def on_call_end(self, method: str, duration: float, failed: bool) -> None:
+        """
+        A call to the other side ended.
+
+        Failed is true for error responses, timeouts, closed connections and cancelled calls.
+        """
+
+
+class LatencyHistogram:
+    """Number of durations per bucket of LATENCY_BUCKETS."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, duration: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return count, total duration and the cumulative bucket counts, like Prometheus."""
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "total": self.total, "buckets": buckets}
+
+
+class MethodStats:
+    """Counters and latencies of a method."""
+
+    def __init__(self) -> None:
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def add(self, duration: float, failed: bool) -> None:
+        self.latency.add(duration)
+        if failed:
+            self.errors += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"errors": self.errors, "latency": self.latency.as_dict()}
+
+
+class JsonRpcMetrics(JsonRpcObserver):
+    """
+    Counts messages and bytes, and keeps latencies per method.
+
+    One instance can be attached to several connections to get the totals of all.
+    """
+
+    def __init__(self) -> None:
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        # Received requests being handled and calls waiting for a response
+        self.requests_in_flight = 0
+        self.calls_in_flight = 0
+        self.requests: dict[str, MethodStats] = {}
+        self.notifications: dict[str, MethodStats] = {}
+        self.calls: dict[str, MethodStats] = {}
+
+    def on_receive(self, size: int) -> None:
+        self.messages_received += 1
+        self.bytes_received += size
+
+    def on_send(self, size: int) -> None:
+        self.messages_sent += 1
+        self.bytes_sent += size
+
+    def on_request_start(self, method: str) -> None:
+        self.requests_in_flight += 1
+
+    def on_request_end(self, method: str, duration: float, error_code: int | None) -> None:
+        self.requests_in_flight -= 1
+        _method_stats(self.requests, method).add(duration, error_code is not None)
+
+    def on_notification(self, method: str, duration: float, failed: bool) -> None:
+        _method_stats(self.notifications, method).add(duration, failed)
+
+    def on_call_start(self, method: str) -> None:
+        self.calls_in_flight += 1
+
+    def on_call_end(self, method: str, duration: float, failed: bool) -> None:
+        self.calls_in_flight -= 1
+        _method_stats(self.calls, method).add(duration, failed)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "messages_received": self.messages_received,
+            "bytes_received": self.bytes_received,
+            "messages_sent": self.messages_sent,
+            "bytes_sent": self.bytes_sent,
+            "requests_in_flight": self.requests_in_flight,
+            "calls_in_flight": self.calls_in_flight,
+            "requests": _stats_dict(self.requests),
+            "notifications": _stats_dict(self.notifications),
+            "calls": _stats_dict(self.calls),
+        }
+
+
+def _method_stats(stats: dict[str, MethodStats], method: str) -> MethodStats:
+    if (method_stats := stats.get(method)) is None:
+        method_stats = stats[method] = MethodStats()
+    return method_stats
+
+
+def _stats_dict(stats: dict[str, MethodStats]) -> dict[str, Any]:
+    return {method: method_stats.as_dict() for method, method_stats in stats.items()}
@@ -0,0 +1,111 @@
+"""Publishing notifications on topics to the connections subscribed to them."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import logging
+from typing import Any
+
+from .codecs import JsonCodec, get_codec
+from .jsonrpc import (
+    SUBSCRIBE_METHOD,
+    UNSUBSCRIBE_METHOD,
+    JsonRpc,
+    JsonRpcNotification,
+    _InvalidParamsError,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Publisher:
+    """
+    Sends notifications on named topics to the connections subscribed to them.
+
+    Connections subscribe with the "rpc.subscribe" and "rpc.unsubscribe" methods, a
+    notification is sent with the topic as method. Every published message is encoded once,
+    no matter the number of subscribers.
+
+    Like a broadcast, publishing does not wait for the connections. A connection that is
+    still busy sending the previous message of a topic skips the message, so one slow
+    connection does not hold up the others.
+    """
+
+    def __init__(self, topics: Iterable[str], codec: JsonCodec | None = None) -> None:
+        self._codec = codec or get_codec()
+        self._subscribers: dict[str, set[JsonRpc]] = {topic: set() for topic in topics}
+        self._sending: dict[tuple[str, JsonRpc], asyncio.Task] = {}
+
+    @property
+    def topics(self) -> list[str]:
+        return list(self._subscribers)
+
+    def attach(self, jsonrpc: JsonRpc, topics: Iterable[str] = ()) -> None:
+        """Let a connection subscribe, optionally subscribed to topics already."""
+
+        async def _on_subscribe(topic: str) -> dict:
+            self._topic_subscribers(topic).add(jsonrpc)
+            return {"topics": self.subscriptions(jsonrpc)}
+
+        async def _on_unsubscribe(topic: str) -> dict:
+            self._topic_subscribers(topic).discard(jsonrpc)
+            return {"topics": self.subscriptions(jsonrpc)}
+
+        jsonrpc.register_request_handler(SUBSCRIBE_METHOD, _on_subscribe)
+        jsonrpc.register_request_handler(UNSUBSCRIBE_METHOD, _on_unsubscribe)
+        for topic in topics:
+            self._subscribers[topic].add(jsonrpc)
+
+    def detach(self, jsonrpc: JsonRpc) -> None:
+        """Remove all subscriptions of a connection, e.g. when it is closed."""
+        for topic, subscribers in self._subscribers.items():
+            subscribers.discard(jsonrpc)
+            if task := self._sending.pop((topic, jsonrpc), None):
+                task.cancel()
+
+    def subscriptions(self, jsonrpc: JsonRpc) -> list[str]:
+        """Return the topics a connection is subscribed to."""
+        return [
+            topic
+            for topic, subscribers in self._subscribers.items()
+            if jsonrpc in subscribers
+        ]
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._subscribers[topic])
+
+    def publish(self, topic: str, params: Any | None = None) -> int:
+        """Send a notification to the subscribers of topic, returns to how many."""
+        if not self._subscribers[topic]:
+            # Not even worth encoding
+            return 0
+        return self.publish_encoded(
+            topic, JsonRpcNotification(topic, params).to_bytes(self._codec)
+        )
+
+    def publish_encoded(self, topic: str, message: bytes) -> int:
+        """Send an already encoded notification to the subscribers of topic."""
+        sent = 0
+        for jsonrpc in self._subscribers[topic]:
+            key = (topic, jsonrpc)
+            if key in self._sending:
+                _LOGGER.debug("Skipped %s, previous message is still being sent", topic)
+                continue
+            task = asyncio.create_task(jsonrpc.send_encoded(message))
+            self._sending[key] = task
+            task.add_done_callback(lambda task, key=key: self._sent(key, task))
+            sent += 1
+        return sent
+
+    def _sent(self, key: tuple[str, JsonRpc], task: asyncio.Task) -> None:
+        if self._sending.get(key) is task:
+            del self._sending[key]
+        if not task.cancelled() and (exception := task.exception()) is not None:
+            # The connection is closing, it gets detached
+            _LOGGER.debug("Publishing %s failed: %s", key[0], exception)
+
+    def _topic_subscribers(self, topic: str) -> set[JsonRpc]:
+        if (subscribers := self._subscribers.get(topic)) is None:
+            raise _InvalidParamsError(f"unknown topic {topic}")
+        return subscribers
@@ -30,10 +30,22 @@ class AioHttpWebsocketClientTransport(JsonRpcBaseTransport):
         if self._clientsession:
             await self._clientsession.close()
 
-    async def send(self, message:str):
+    async def send(self, message: str | bytes):
         logging.debug("Transport Send: %s", message)
         assert self._websocket is not None
-        await self._websocket.send_str(message)
+        if isinstance(message, bytes):
+            await self._websocket.send_bytes(message)
+        else:
+            await self._websocket.send_str(message)
+
+    async def send_encoded_text(self, message: bytes):
+        logging.debug("Transport Send: %s", message)
+        assert self._websocket is not None
+        if hasattr(self._websocket, "send_frame"):
+            await self._websocket.send_frame(message, aiohttp.WSMsgType.TEXT)
+        else:
+            # aiohttp before 3.11
+            await self._websocket.send_str(message.decode())
 
     async def _receive_task_handler(self, websocket) -> None:
         while True:
@@ -43,13 +55,14 @@ class AioHttpWebsocketClientTransport(JsonRpcBaseTransport):
                 # CLOSING = 0x100
                 # CLOSED = 0x101
                 # ERROR = 0x102
-                logging.debug(f"Transport receiver -- {message}")
+                logging.debug("Transport receiver -- %s", message)
 
                 if message.type == aiohttp.WSMsgType.CLOSE:
                     logging.debug("Connection CLOSE initiated from the other side")
                     continue
                 if message.type == aiohttp.WSMsgType.CLOSED:  # This is an aiohttp specific code
                     logging.debug("Connection CLOSED, exiting receive task!!!")
+                    self._call_on_close_handler()
                     if self._on_disconnect:
                         await self._on_disconnect()
                     return
@@ -59,10 +72,12 @@ class AioHttpWebsocketClientTransport(JsonRpcBaseTransport):
                 if message.type == aiohttp.WSMsgType.PONG:
                     logging.debug("PONG?")
                     continue
-                if message.type == aiohttp.WSMsgType.TEXT:
+                if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    # data is str for text and bytes for binary
                     if self._on_receive_handler:
                         await self._on_receive_handler(message.data)
                     continue
             except Exception:
                 logging.exception("Exception in websocket receiver")
+                self._call_on_close_handler()
                 return
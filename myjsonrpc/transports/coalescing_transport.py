@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+from itertools import groupby
+import logging
+
+from .transport_base import JsonRpcBaseTransport
+
+
+class CoalescingTransport(JsonRpcBaseTransport):
+    """
+    Wraps a transport and combines the messages sent close together into one JSON array.
+
+    Messages sent in the same event loop iteration, or within `window` seconds after the
+    first one, are sent as one message. While a combined message is being sent, new
+    messages wait and go out together in the next one.
+
+    The other side has to accept arrays of messages that are not only requests, like
+    `JsonRpc` does.
+    """
+
+    def __init__(self, transport: JsonRpcBaseTransport, window: float = 0) -> None:
+        self._transport = transport
+        self._window = window
+        # Encoded messages with if they are sent as binary, and the future of their send
+        self._queue: list[tuple[bytes, bool, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    def register_on_receive_handler(self, handler):
+        self._transport.register_on_receive_handler(handler)
+
+    def register_on_close_handler(self, handler):
+        self._transport.register_on_close_handler(handler)
+
+    async def send(self, message: str | bytes):
+        if isinstance(message, str):
+            await self._enqueue(message.encode(), binary=False)
+        else:
+            await self._enqueue(message, binary=True)
+
+    async def send_encoded_text(self, message: bytes):
+        await self._enqueue(message, binary=False)
+
+    async def _enqueue(self, message: bytes, binary: bool) -> None:
+        sent = asyncio.get_running_loop().create_future()
+        self._queue.append((message, binary, sent))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+            self._flush_task.add_done_callback(self._flush_done)
+        # Raises when sending the combined message failed
+        await sent
+
+    async def _flush(self) -> None:
+        queue: list[tuple[bytes, bool, asyncio.Future]] = []
+        try:
+            while self._queue:
+                if self._window:
+                    await asyncio.sleep(self._window)
+                else:
+                    # Let the others that run in this iteration add their messages
+                    await asyncio.sleep(0)
+
+                queue, self._queue = self._queue, []
+                # Binary and text messages can not be combined, the order is kept
+                for binary, group in groupby(queue, key=lambda queued: queued[1]):
+                    queued = list(group)
+                    try:
+                        await self._send_combined([message for message, _, _ in queued], binary)
+                    except Exception as err:  # noqa: BLE001
+                        for _, _, sent in queued:
+                            if not sent.done():
+                                sent.set_exception(err)
+                    else:
+                        for _, _, sent in queued:
+                            if not sent.done():
+                                sent.set_result(None)
+        finally:
+            self._flush_task = None
+            # Only left when cancelled, the senders must not wait forever
+            self._fail_unsent([*queue, *self._queue])
+            self._queue = []
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        if self._flush_task is task:
+            # Cancelled before it started
+            self._flush_task = None
+            self._fail_unsent(self._queue)
+            self._queue = []
+
+    @staticmethod
+    def _fail_unsent(queue: list[tuple[bytes, bool, asyncio.Future]]) -> None:
+        for _, _, sent in queue:
+            if not sent.done():
+                sent.set_exception(ConnectionError("Sending was cancelled"))
+
+    async def _send_combined(self, messages: list[bytes], binary: bool) -> None:
+        if len(messages) == 1:
+            combined = messages[0]
+        else:
+            logging.debug("Transport Coalesced %s messages", len(messages))
+            # Arrays, e.g. batch responses, are merged in, arrays can not be nested
+            combined = b"[%s]" % b",".join(
+                message[1:-1] if message[:1] == b"[" else message for message in messages
+            )
+        if binary:
+            await self._transport.send(combined)
+        else:
+            await self._transport.send_encoded_text(combined)
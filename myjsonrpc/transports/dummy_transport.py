@@ -10,20 +10,31 @@ class JsonRpcDummyTransport:
 
     def __init__(self) -> None:
         self._on_receive_handler = None
-        self.sent_messages: list[str] = []
+        self._on_close_handler = None
+        self.sent_messages: list[str | bytes] = []
 
     def register_on_receive_handler(self, handler):
         self._on_receive_handler = handler
 
-    async def send(self, message: str):
+    async def send_encoded_text(self, message: bytes):
+        await self.send(message.decode())
+
+    def register_on_close_handler(self, handler):
+        self._on_close_handler = handler
+
+    async def send(self, message: str | bytes):
         logging.debug("Transport send: %s", message)
         self.sent_messages.append(message)
 
-    async def call_receive(self, message: str):
+    async def call_receive(self, message: str | bytes):
         if self._on_receive_handler:
             await self._on_receive_handler(message)
 
-    def last_sent_message(self) -> str | None:
+    def call_close(self):
+        if self._on_close_handler:
+            self._on_close_handler()
+
+    def last_sent_message(self) -> str | bytes | None:
         if self.sent_messages:
             return self.sent_messages[-1]
         return None
\ No newline at end of file
@@ -10,13 +10,36 @@ class JsonRpcBaseTransport(ABC):
     """
     Transports should derive from this class. It mainly exists to force implementation of abstract members.
     """
+    _on_close_handler: Callable[[], None] | None = None
+
     @abstractmethod
-    def register_on_receive_handler(self, handler: Callable[[str], Awaitable[None]]):
-        """Register a handler which will handle JSONRPC messages received by the transport."""
+    def register_on_receive_handler(self, handler: Callable[[str | bytes], Awaitable[None]]):
+        """
+        Register a handler which will handle JSONRPC messages received by the transport.
+
+        Messages received as text are passed as str, binary ones as bytes.
+        """
         pass
 
     @abstractmethod
-    async def send(self, message: str):
-        """Send the, already formatted, JSONRPC message over the transport."""
+    async def send(self, message: str | bytes):
+        """Send the, already formatted, JSONRPC message over the transport, str as text and bytes as binary."""
         pass
 
+    async def send_encoded_text(self, message: bytes):
+        """
+        Send the, already encoded, JSONRPC message over the transport as text.
+
+        Transports that can send the UTF-8 bytes without decoding them first should override this.
+        """
+        await self.send(message.decode())
+
+    def register_on_close_handler(self, handler: Callable[[], None]):
+        """Register a handler which will be called when the connection is closed."""
+        self._on_close_handler = handler
+
+    def _call_on_close_handler(self):
+        """Transports call this when the connection is closed, for any reason."""
+        if self._on_close_handler is not None:
+            self._on_close_handler()
+
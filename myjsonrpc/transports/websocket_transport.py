@@ -23,16 +23,22 @@ class WebsocketsServerTransport(JsonRpcBaseTransport):
     def register_on_receive_handler(self, handler):
         self._on_receive_handler = handler
 
-    async def send(self, message:str):
+    async def send(self, message: str | bytes):
+        # websockets sends str as text and bytes as binary frame, and receives them the same way
         logging.debug("Transport Send: %s", message)
         assert self._websocket is not None
         await self._websocket.send(message)
 
+    async def send_encoded_text(self, message: bytes):
+        logging.debug("Transport Send: %s", message)
+        assert self._websocket is not None
+        await self._websocket.send(message, text=True)
+
     async def _receive_task(self, websocket) -> None:
         assert self._on_receive_handler is not None
         try:
             async for message in websocket:
-                logging.debug(f"Transport receiver -- {message}")
+                logging.debug("Transport receiver -- %s", message)
                 if self._on_receive_handler is not None:
                     await self._on_receive_handler(message)
                 continue
@@ -40,5 +46,6 @@ class WebsocketsServerTransport(JsonRpcBaseTransport):
             logging.exception("Exception in websocket receiver")
             return
         finally:
+            self._call_on_close_handler()
             await self._on_disconnect()
 
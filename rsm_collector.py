@@ -8,138 +8,322 @@ import asyncio
 import logging
 import platform
 import functools
+import signal
+import sys
 import machineid
+import psutil
 
-from websockets.asyncio.server import broadcast, serve
+from websockets.asyncio.server import serve
 
-from rsm_collector import async_setup_entry
-from rsm_collector.coordinator import SensorData
-from rsm_collector.hass_stubs import DEFAULT_SCAN_INTERVAL, ConfigEntry, HomeAssistant
+from rsm_collector.cgroups import DEFAULT_CGROUP_PATTERNS, split_pattern
+from rsm_collector.coordinator import RESERVED_SOURCE_NAMES
+from rsm_collector.pressure import PressureTrigger
+from rsm_collector.sampler import SamplerProcess, snapshot_params
+from rsm_collector.sources import describe_sources
+from rsm_collector.stats import LoopLagMonitor, ProcessStats, SendCounter
 
-from myjsonrpc import JsonRpc, JsonRpcNotification
+from myjsonrpc import JsonRpc, JsonRpcMetrics, JsonRpcRawResult, Publisher
+from myjsonrpc.codecs import get_codec
+from myjsonrpc.transports.coalescing_transport import CoalescingTransport
 from myjsonrpc.transports.websocket_transport import WebsocketsServerTransport
 
 CONNECTIONS = set()
+# Messages sent to all connections
+SENT = SendCounter()
+# Process names watched per connection
+WATCHED_PROCESSES: dict = {}
+# Fastest JSON codec that is installed, the worker picks the same one
+CODEC = get_codec()
+# Topic of the `update_data` notifications
+UPDATE_TOPIC = "update_data"
+PUBLISHER = Publisher([UPDATE_TOPIC], CODEC)
+# Requests handled and messages sent and received, of all connections
+RPC_METRICS = JsonRpcMetrics()
+
+API_VERSION = "0.0.7"
+
+
+def update_watched_processes(sampler: SamplerProcess):
+    sampler.set_watched_processes(
+        name for names in WATCHED_PROCESSES.values() for name in names
+    )
 
-API_VERSION = "0.0.2"
 
-async def myjsonrpc_handler(websocket, machine_id: str, newest_data: SensorData):
-    async def _on_get_api_info() -> dict:
-        logging.info("Get api info")
-        return {
-            "version": API_VERSION,
-            "id": "RemoteSystemMonitorCollectorApi",
-        }
+def pressure_trigger(value: str) -> PressureTrigger:
+    try:
+        return PressureTrigger.parse(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
 
-    async def _on_get_machine_info() -> dict:
-        logging.info("Get machine info")
+
+def cgroup_pattern(value: str) -> str:
+    try:
+        split_pattern(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+    return value
+
+
+def get_machine_info(machine_id: str) -> dict:
+    # Blocking, platform.processor() can run `uname -p`
+    return {
+        "id": machine_id,
+        "os": platform.system(),
+        "os_alias": platform.system_alias(
+            platform.system(), platform.release(), platform.version()
+        ),
+        "version": platform.version(),
+        "release": platform.release(),
+        "platform": platform.platform(),
+        "hostname": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+class StaticResults:
+    """Results of the RPCs that do not change while running, already encoded.
+
+    They are determined once at startup, so connecting clients do not make
+    the collector start subprocesses or encode the same JSON over and over.
+    `refresh` determines them again, e.g. on SIGHUP after a hostname change.
+    """
+
+    def __init__(self, machine_id: str) -> None:
+        self._machine_id = machine_id
+        self._refresh_task: asyncio.Task | None = None
+        self.api_info = JsonRpcRawResult.from_result(
+            {
+                "version": API_VERSION,
+                "id": "RemoteSystemMonitorCollectorApi",
+            }
+        )
+        self.machine_info: JsonRpcRawResult | None = None
+        self.sources: JsonRpcRawResult | None = None
+
+    async def refresh(self) -> None:
+        machine_info, sources = await asyncio.gather(
+            asyncio.to_thread(get_machine_info, self._machine_id),
+            # Plugin metric sources are sampled by the worker, clients get their schema
+            asyncio.to_thread(describe_sources, RESERVED_SOURCE_NAMES),
+        )
+        self.machine_info = JsonRpcRawResult.from_result(machine_info, CODEC)
+        self.sources = JsonRpcRawResult.from_result({"sources": sources}, CODEC)
+        logging.debug("Static results refreshed, machine info: %s", machine_info)
+        if sources:
+            logging.info("Metric sources: %s", ", ".join(sources))
+
+    def schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+
+class CollectorStats:
+    """Statistics of the collector itself for `get_collector_stats`."""
+
+    def __init__(self, sampler: SamplerProcess) -> None:
+        self._sampler = sampler
+        self.loop_lag = LoopLagMonitor()
+        self._collector = ProcessStats(psutil)
+        self._worker: ProcessStats | None = None
+
+    def as_dict(self) -> dict:
+        if self._sampler.pid is not None and (
+            self._worker is None or self._worker.pid != self._sampler.pid
+        ):
+            # Worker was (re)started
+            try:
+                self._worker = ProcessStats(psutil, self._sampler.pid)
+            except psutil.Error:
+                self._worker = None
+
+        sampler_stats = self._sampler.stats
         return {
-            "id": machine_id,
-            "os": platform.system(),
-            "os_alias": platform.system_alias(
-                platform.system(), platform.release(), platform.version()
+            "update_duration": (
+                sampler_stats.update_duration if sampler_stats else None
             ),
-            "version": platform.version(),
-            "release": platform.release(),
-            "platform": platform.platform(),
-            "hostname": platform.node(),
-            "machine": platform.machine(),
-            "processor": platform.processor(),
+            "probe_durations": sampler_stats.probe_durations if sampler_stats else {},
+            "executor_pools": sampler_stats.executor_pools if sampler_stats else {},
+            "loop_lag": self.loop_lag.lag,
+            "loop_lag_max": self.loop_lag.max_lag,
+            "collector": self._collector.read(),
+            "worker": self._worker.read() if self._worker is not None else None,
+            "worker_restarts": self._sampler.restarts,
+            # Bytes waiting to be sent per connection, grows when a client can not keep up
+            "connections": {
+                "{}:{}".format(*websocket.remote_address[:2]): (
+                    websocket.transport.get_write_buffer_size()
+                )
+                for websocket in CONNECTIONS
+            },
+            "messages_sent": SENT.messages,
+            "bytes_sent": SENT.bytes,
+            "rpc": RPC_METRICS.as_dict(),
         }
 
-    async def _on_get_initial_data() -> dict:
+
+class CountingServerTransport(WebsocketsServerTransport):
+    """Counts the messages sent."""
+
+    async def send(self, message: str | bytes):
+        SENT.count(message)
+        await super().send(message)
+
+    async def send_encoded_text(self, message: bytes):
+        SENT.count(message)
+        await super().send_encoded_text(message)
+
+
+async def myjsonrpc_handler(
+    websocket,
+    static_results: StaticResults,
+    sampler: SamplerProcess,
+    collector_stats: CollectorStats,
+    coalesce_window: float | None,
+):
+    async def _on_get_api_info() -> JsonRpcRawResult:
+        logging.info("Get api info")
+        return static_results.api_info
+
+    async def _on_get_machine_info() -> JsonRpcRawResult:
+        logging.info("Get machine info")
+        assert static_results.machine_info is not None
+        return static_results.machine_info
+
+    async def _on_get_initial_data() -> JsonRpcRawResult:
         logging.info("Get initial data")
-        return {"data": newest_data.as_dict()}
+        snapshot = sampler.latest()
+        assert snapshot is not None
+        # Handed out as encoded by the worker
+        return JsonRpcRawResult(snapshot_params(snapshot))
+
+    async def _on_watch_processes(processes: list[str]) -> dict:
+        logging.info("Watch processes %s", processes)
+        WATCHED_PROCESSES[websocket] = set(processes)
+        update_watched_processes(sampler)
+        return {"processes": sorted(WATCHED_PROCESSES[websocket])}
+
+    async def _on_get_sources() -> JsonRpcRawResult:
+        logging.info("Get sources")
+        assert static_results.sources is not None
+        return static_results.sources
+
+    async def _on_get_collector_stats() -> dict:
+        logging.debug("Get collector stats")
+        return collector_stats.as_dict()
 
     disconnected_future: asyncio.Future = asyncio.Future()
 
     async def _on_disconnect() -> None:
         disconnected_future.set_result(None)
 
-    transport = WebsocketsServerTransport(websocket, on_disconnect=_on_disconnect)
+    transport = CountingServerTransport(websocket, on_disconnect=_on_disconnect)
 
-    jsonrpc = JsonRpc(transport)
+    jsonrpc = JsonRpc(
+        (
+            CoalescingTransport(transport, coalesce_window)
+            if coalesce_window is not None
+            else transport
+        ),
+        codec=CODEC,
+    )
+    jsonrpc.add_observer(RPC_METRICS)
     jsonrpc.register_request_handler("get_api_info", _on_get_api_info)
     jsonrpc.register_request_handler("get_machine_info", _on_get_machine_info)
     jsonrpc.register_request_handler("get_initial_data", _on_get_initial_data)
+    jsonrpc.register_request_handler("watch_processes", _on_watch_processes)
+    jsonrpc.register_request_handler("get_sources", _on_get_sources)
+    jsonrpc.register_request_handler("get_collector_stats", _on_get_collector_stats)
+    # Clients before API version 0.0.7 do not subscribe, they expect the updates anyway
+    PUBLISHER.attach(jsonrpc, topics=[UPDATE_TOPIC])
 
     await transport.connect()
 
     await disconnected_future
-
-
-async def websocket_handler(websocket, machine_id: str, newest_data: SensorData):
+    PUBLISHER.detach(jsonrpc)
+    # Nobody is listening for the responses anymore
+    await jsonrpc.close()
+
+
+async def websocket_handler(
+    websocket,
+    static_results: StaticResults,
+    sampler: SamplerProcess,
+    collector_stats: CollectorStats,
+    coalesce_window: float | None,
+):
     CONNECTIONS.add(websocket)
 
     try:
         logging.info("New connection from %s", websocket.remote_address)
-        await myjsonrpc_handler(websocket, machine_id, newest_data)
+        await myjsonrpc_handler(
+            websocket, static_results, sampler, collector_stats, coalesce_window
+        )
         logging.info("Connection closed from %s", websocket.remote_address)
     finally:
         CONNECTIONS.remove(websocket)
+        if WATCHED_PROCESSES.pop(websocket, None):
+            update_watched_processes(sampler)
 
 
 async def main(args):
     print("Remote System Monitor Collector")
     print(f"API version: {API_VERSION}")
+    print(f"JSON codec: {CODEC.name}")
     print("------------------------------")
 
-    hass = HomeAssistant()
-    entry = ConfigEntry()
-
-    await async_setup_entry(hass, entry)
-
-    assert entry.runtime_data is not None
-
-    # Subscribe all disks for updates
-    disk_arguments = entry.runtime_data.coordinator._arguments
-    for disk_argument in disk_arguments:
-        entry.runtime_data.coordinator.update_subscribers[("disks", disk_argument)] = (
-            "dummy"  # Would normally be entity_id
-        )
-
-    # Subscribe all / most data for updates
-    entry.runtime_data.coordinator.update_subscribers[("swap", "")] = set("dummy")
-    entry.runtime_data.coordinator.update_subscribers[("memory", "")] = set("dummy")
-    entry.runtime_data.coordinator.update_subscribers[("io_counters", "")] = set("dummy")
-    # entry.runtime_data.coordinator.update_subscribers[("addresses", "")] = set("dummy")
-    entry.runtime_data.coordinator.update_subscribers[("load", "")] = set("dummy")
-    entry.runtime_data.coordinator.update_subscribers[("cpu_percent", "")] = set("dummy")
-    ## Technically not needed to send all the time since when rebooting collector will be restarted anyway
-    ## But lets leave it in for now to avoid additional work now
-    entry.runtime_data.coordinator.update_subscribers[("boot", "")] = set("dummy")
-    ## I don't have a case for monitoring processes and it seems like a lot of data. Leave out for now
-    # # entry.runtime_data.coordinator.update_subscribers[("processes", "")] = set("dummy")
-    # Temperatures are not supported on Windows and my Linux is WSL which also has no temp sensors, so keep disabled for now
-    # entry.runtime_data.coordinator.update_subscribers[("temperatures", "")] = set("dummy")
-
-    new_data: SensorData = await entry.runtime_data.coordinator._async_update_data()
-
     machine_id = (
         args.machine_id
         if args.machine_id is not None
         else machineid.hashed_id("RemoteSystemMonitorCollector")
     )  # Don't change the app id because it would change the machine id !!!
 
-    # This binds the websocket_handler function with the machine_id and new_data arguments pre-filled.
-    # This is needed because the serve function requires a function with only one argument (websocket) but
-    # our websocket_handler has three arguments.
-    bound_websocket_handler = functools.partial(
-        websocket_handler, machine_id=machine_id, newest_data=new_data
+    # All sampling is done in a separate worker process, this process only
+    # serves the websocket connections.
+    sampler = SamplerProcess(
+        loglevel=args.loglevel,
+        pressure_triggers=tuple(args.pressure_trigger),
+        cgroup_patterns=tuple(args.cgroup or DEFAULT_CGROUP_PATTERNS),
     )
+    await sampler.start()
 
-    async with serve(bound_websocket_handler, "0.0.0.0", 2604):
-        while True:
-            new_data = await entry.runtime_data.coordinator._async_update_data()
+    static_results = StaticResults(machine_id)
+    await static_results.refresh()
 
-            notification = JsonRpcNotification(
-                "update_data", {"data": new_data.as_dict()}
-            )
+    collector_stats = CollectorStats(sampler)
+    collector_stats.loop_lag.start()
+
+    if sys.platform != "win32":
+        # Make sure the worker and its shared memory get cleaned up when stopped as a service
+        main_task = asyncio.current_task()
+        assert main_task is not None
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGHUP, static_results.schedule_refresh
+        )
 
-            # print(json.dumps(json.loads(str(notification)), indent=2))
-            broadcast(CONNECTIONS, str(notification))
+    # This binds the websocket_handler function with the other arguments pre-filled.
+    # This is needed because the serve function requires a function with only one argument (websocket) but
+    # our websocket_handler has more arguments.
+    bound_websocket_handler = functools.partial(
+        websocket_handler,
+        static_results=static_results,
+        sampler=sampler,
+        collector_stats=collector_stats,
+        coalesce_window=args.coalesce_window,
+    )
 
-            await asyncio.sleep(DEFAULT_SCAN_INTERVAL)
+    try:
+        async with serve(bound_websocket_handler, "0.0.0.0", 2604):
+            while True:
+                # Snapshots are already encoded `update_data` notifications
+                snapshot = await sampler.wait_for_snapshot()
+                PUBLISHER.publish_encoded(UPDATE_TOPIC, snapshot)
+    except asyncio.CancelledError:
+        logging.info("Collector stopped")
+    finally:
+        collector_stats.loop_lag.stop()
+        sampler.stop()
 
 
 if __name__ == "__main__":
@@ -156,6 +340,27 @@ if __name__ == "__main__":
         default="INFO",
         help="Define loglevel, default is INFO.",
     )
+    parser.add_argument(
+        "--pressure-trigger",
+        type=pressure_trigger,
+        action="append",
+        default=[],
+        metavar="TRIGGER",
+        help="Send an update as soon as the pressure stall time crosses a threshold, e.g. 'memory some 150ms in 2s'. Can be given multiple times. Linux only.",
+    )
+    parser.add_argument(
+        "--cgroup",
+        type=cgroup_pattern,
+        action="append",
+        metavar="PATTERN",
+        help=f"Cgroups to send resource usage for, relative to the cgroup v2 root. Only the last part can have wildcards. Can be given multiple times. Default is Docker containers: {', '.join(DEFAULT_CGROUP_PATTERNS)}. Linux only.",
+    )
+    parser.add_argument(
+        "--coalesce-window",
+        type=float,
+        metavar="SECONDS",
+        help="Combine the messages sent to a connection within this many seconds into one, 0 combines the messages sent at the same moment. Default is off. Needs clients that support collector API version 0.0.6 or newer.",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=args.loglevel)
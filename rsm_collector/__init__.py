@@ -5,6 +5,7 @@ from dataclasses import dataclass
 import importlib.util  # It is here to load for ha_psutil which seems to be missing it, but does need it  # noqa: F401
 import logging
 
+from .const import EXECUTOR_POOLS
 from .coordinator import SystemMonitorCoordinator
 from .hass_stubs import ConfigEntry, HomeAssistant
 from .util import get_all_disk_mounts
@@ -27,6 +28,9 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: SystemMonitorConfigEntry
 ) -> bool:
     """Set up System Monitor from a config entry."""
+    for name, (max_workers, max_queued) in EXECUTOR_POOLS.items():
+        hass.async_create_executor_pool(name, max_workers, max_queued)
+
     psutil_wrapper = await hass.async_add_executor_job(ha_psutil.PsutilWrapper)
 
     disk_arguments = list(
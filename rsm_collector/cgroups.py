@@ -0,0 +1,196 @@
+"""Resource usage of cgroups, e.g. containers, from the Linux cgroup v2 interface."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import fnmatch
+import logging
+import os
+import re
+import time
+from typing import NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+CGROUP_PATH = "/sys/fs/cgroup"
+
+# Docker containers with the systemd and the cgroupfs cgroup driver
+DEFAULT_CGROUP_PATTERNS = ("system.slice/docker-*.scope", "docker/*")
+
+_CONTAINER_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class CgroupUsage(NamedTuple):
+    """Resource usage of a cgroup, rates are None until there are two reads."""
+
+    # Of a single CPU, like `top`, so it can go over 100%
+    cpu_percent: float | None
+    memory: int
+    # Bytes per second
+    io_read: float | None
+    io_write: float | None
+
+
+def split_pattern(pattern: str) -> tuple[str, str]:
+    """Split a pattern in parent and name, raises ValueError when not valid."""
+    parent, _, name = pattern.strip("/").rpartition("/")
+    if not name or any(char in parent for char in "*?["):
+        raise ValueError(
+            f"Invalid cgroup pattern '{pattern}', only the last part can have wildcards"
+        )
+    return parent, name
+
+
+def cgroup_name(path: str) -> str:
+    """Return short name for a cgroup, the short id for containers."""
+    name = os.path.basename(path).removesuffix(".scope").removeprefix("docker-")
+    if _CONTAINER_ID.match(name):
+        return name[:12]
+    return name
+
+
+@dataclass(slots=True)
+class _Cgroup:
+    name: str
+    cpu_fd: int
+    memory_fd: int
+    io_fd: int | None
+    # Totals of the previous read to calculate rates
+    timestamp: float | None = None
+    cpu_usage: int = 0
+    io_read: int = 0
+    io_write: int = 0
+
+    def close(self) -> None:
+        for fd in (self.cpu_fd, self.memory_fd, self.io_fd):
+            if fd is not None:
+                os.close(fd)
+
+
+def _read_cpu_usage(fd: int) -> int:
+    # First line is "usage_usec <value>"
+    for line in os.pread(fd, 4096, 0).split(b"\n"):
+        if line.startswith(b"usage_usec "):
+            return int(line[11:])
+    raise ValueError("No usage_usec in cpu.stat")
+
+
+def _read_io(fd: int) -> tuple[int, int]:
+    # A line per device like "8:0 rbytes=1 wbytes=2 rios=3 wios=4 dbytes=5 dios=6"
+    read = write = 0
+    for line in os.pread(fd, 65536, 0).split(b"\n"):
+        for field in line.split()[1:]:
+            key, _, value = field.partition(b"=")
+            if key == b"rbytes":
+                read += int(value)
+            elif key == b"wbytes":
+                write += int(value)
+    return read, write
+
+
+class CgroupMonitor:
+    """Reads resource usage of the cgroups matching the patterns.
+
+    Patterns are relative to the cgroup root and can only have wildcards in
+    the last part, e.g. "system.slice/docker-*.scope". Finding new cgroups
+    only lists the parent directory of each pattern and only new cgroups get
+    their files opened, so this stays cheap with hundreds of containers.
+    """
+
+    def __init__(self, path: str = CGROUP_PATH) -> None:
+        self._path = path
+        self._patterns: dict[str, list[str]] = {}
+        self._cgroups: dict[str, _Cgroup] = {}
+
+    @staticmethod
+    def is_supported(path: str = CGROUP_PATH) -> bool:
+        """Return True when the path is a cgroup v2 hierarchy."""
+        return os.path.isfile(os.path.join(path, "cgroup.controllers"))
+
+    def set_patterns(self, patterns: Iterable[str]) -> None:
+        """Set the patterns of the cgroups to monitor."""
+        self._patterns = {}
+        for pattern in patterns:
+            parent, name = split_pattern(pattern)
+            self._patterns.setdefault(parent, []).append(name)
+        self.close()
+
+    def read(self) -> dict[str, CgroupUsage]:
+        """Return the resource usage per cgroup name."""
+        self._discover()
+
+        now = time.monotonic()
+        usages = {}
+        for path, cgroup in list(self._cgroups.items()):
+            try:
+                cpu_usage = _read_cpu_usage(cgroup.cpu_fd)
+                memory = int(os.pread(cgroup.memory_fd, 32, 0))
+                io_read, io_write = (
+                    _read_io(cgroup.io_fd) if cgroup.io_fd is not None else (0, 0)
+                )
+            except (OSError, ValueError) as err:
+                # Removed since the last discovery
+                _LOGGER.debug("Reading cgroup %s failed: %s", path, err)
+                self._remove(path)
+                continue
+
+            cpu_percent = read_rate = write_rate = None
+            if cgroup.timestamp is not None and (elapsed := now - cgroup.timestamp):
+                cpu_percent = round((cpu_usage - cgroup.cpu_usage) / elapsed / 1e4, 1)
+                read_rate = (io_read - cgroup.io_read) / elapsed
+                write_rate = (io_write - cgroup.io_write) / elapsed
+            cgroup.timestamp = now
+            cgroup.cpu_usage = cpu_usage
+            cgroup.io_read = io_read
+            cgroup.io_write = io_write
+            usages[cgroup.name] = CgroupUsage(cpu_percent, memory, read_rate, write_rate)
+        return usages
+
+    def close(self) -> None:
+        """Close the files of all cgroups."""
+        for path in list(self._cgroups):
+            self._remove(path)
+
+    def _discover(self) -> None:
+        paths = set()
+        for parent, names in self._patterns.items():
+            try:
+                with os.scandir(os.path.join(self._path, parent)) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False) and any(
+                            fnmatch.fnmatchcase(entry.name, name) for name in names
+                        ):
+                            paths.add(os.path.join(parent, entry.name))
+            except OSError:
+                # Parent does not exist (yet), e.g. no container started
+                continue
+
+        for path in self._cgroups.keys() - paths:
+            self._remove(path)
+        for path in paths - self._cgroups.keys():
+            self._add(path)
+
+    def _add(self, path: str) -> None:
+        directory = os.path.join(self._path, path)
+        fds: list[int] = []
+        try:
+            for filename in ("cpu.stat", "memory.current"):
+                fds.append(os.open(os.path.join(directory, filename), os.O_RDONLY))
+        except OSError as err:
+            # Memory controller not enabled or cgroup removed in the meantime
+            _LOGGER.debug("Can not monitor cgroup %s: %s", path, err)
+            for fd in fds:
+                os.close(fd)
+            return
+        try:
+            io_fd = os.open(os.path.join(directory, "io.stat"), os.O_RDONLY)
+        except OSError:
+            # IO controller is not enabled for all cgroups
+            io_fd = None
+        self._cgroups[path] = _Cgroup(cgroup_name(path), fds[0], fds[1], io_fd)
+        _LOGGER.debug("Monitoring cgroup %s", path)
+
+    def _remove(self, path: str) -> None:
+        self._cgroups.pop(path).close()
+        _LOGGER.debug("Stopped monitoring cgroup %s", path)
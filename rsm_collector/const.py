@@ -5,6 +5,17 @@ DOMAIN = "remote_systemmonitor"
 CONF_INDEX = "index"
 CONF_PROCESS = "process"
 
+# Executor pools for sampling the probes, name: (max_workers, max_queued)
+# Probes get the pool of their cost, see sources.COST_POOLS
+EXECUTOR_POOLS = {
+    "fast": (1, 1),
+    "slow": (2, 2),
+    "blocking": (1, 1),
+}
+
+# Number of processes to send per resource for the top processes
+TOP_PROCESSES_COUNT = 5
+
 NET_IO_TYPES = [
     "network_in",
     "network_out",
@@ -2,37 +2,73 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+import functools
 import logging
+import time
+from types import MappingProxyType
 from typing import Any, NamedTuple
 
-from psutil import Process
 from psutil._common import sdiskusage, shwtemp, snetio, snicaddr, sswap
 import psutil_home_assistant as ha_psutil
 
-from .hass_stubs import HomeAssistant
+from .cgroups import CgroupMonitor, CgroupUsage
+from .const import TOP_PROCESSES_COUNT
+from .hass_stubs import ExecutorPoolFullError, HomeAssistant
 from .hass_stubs import DEFAULT_SCAN_INTERVAL
 from .hass_stubs import TimestampDataUpdateCoordinator
 from .hass_stubs import dt as dt_util
+from .cpu import CpuUsage, CpuUsageReader
+from .diskio import DiskIo, DiskIoRates
+from .hwmon import HwmonTemperatureReader
+from .pressure import PressureReader, PressureStall
+from .processes import ProcessUsage, ProcessWatcher, TopProcesses
+from .sockets import SocketCounter
+from .sources import Cost, MetricSource, ProbeSource, load_sources
+from .util import read_cpu_temperature
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds to wait for slow probes before sending the snapshot without them
+PROBE_TIMEOUT = 2
+
 
 @dataclass(frozen=True, kw_only=True, slots=True)
 class SensorData:
     """Sensor data."""
 
     disk_usage: dict[str, sdiskusage]
+    # IO rates per block device behind the disks
+    disk_io: dict[str, DiskIo]
     swap: sswap
     memory: VirtualMemory
     io_counters: dict[str, snetio]
     addresses: dict[str, list[snicaddr]]
     load: tuple[float, float, float]
     cpu_percent: float | None
+    cpu_percent_per_core: list[float]
+    # In the order of cpu.CPU_TIMES_FIELDS
+    cpu_times_percent: list[float | None]
     boot_time: datetime
-    processes: list[Process]
+    # Running state per watched process name
+    processes: dict[str, bool]
+    # Processes using most resources, per "cpu" and "memory"
+    top_processes: dict[str, list[ProcessUsage]]
     temperatures: dict[str, list[shwtemp]]
+    cpu_temperature: float | None
+    # Pressure stall information, "some" and "full" per resource
+    pressure: dict[str, dict[str, PressureStall]]
+    # Resource usage per cgroup name, e.g. container
+    cgroups: dict[str, CgroupUsage]
+    # Number of sockets per protocol and connection state
+    sockets: dict[str, dict[str, int]]
+    # Serialized samples of the plugin sources, sent under their name
+    sources: Mapping[str, Any] = field(default_factory=dict)
+    # Seconds spent per probe while sampling, not part of the API data
+    probe_durations: Mapping[str, float] = field(default_factory=dict)
 
     def as_dict(self) -> dict[str, Any]:
         """Return as dict."""
@@ -50,15 +86,30 @@ class SensorData:
             temperatures = {k: str(v) for k, v in self.temperatures.items()}
         return {
             "disk_usage": disk_usage,
+            "disk_io": {k: v._asdict() for k, v in self.disk_io.items()},
             "swap": str(self.swap),
             "memory": str(self.memory),
             "io_counters": io_counters,
             "addresses": addresses,
             "load": str(self.load),
             "cpu_percent": self.cpu_percent,
+            "cpu_percent_per_core": self.cpu_percent_per_core,
+            "cpu_times_percent": self.cpu_times_percent,
             "boot_time": str(self.boot_time),
-            "processes": str(self.processes),
+            "processes": self.processes,
+            "top_processes": {
+                k: [usage._asdict() for usage in v]
+                for k, v in self.top_processes.items()
+            },
             "temperatures": temperatures,
+            "cpu_temperature": self.cpu_temperature,
+            "pressure": {
+                resource: {kind: stall._asdict() for kind, stall in stalls.items()}
+                for resource, stalls in self.pressure.items()
+            },
+            "cgroups": {k: v._asdict() for k, v in self.cgroups.items()},
+            "sockets": self.sockets,
+            **self.sources,
         }
 
 
@@ -76,6 +127,16 @@ class VirtualMemory(NamedTuple):
     free: float
 
 
+# Plugin sources can not use the names of built in probes or data
+RESERVED_SOURCE_NAMES = frozenset(
+    {
+        "disks",
+        "boot",
+        *(data_field.name for data_field in fields(SensorData)),
+    }
+)
+
+
 class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
     """A System monitor Data Update Coordinator."""
 
@@ -96,11 +157,55 @@ class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
         self._psutil = psutil_wrapper.psutil
         self._arguments = arguments
         self.boot_time: datetime | None = None
+        self._hwmon: HwmonTemperatureReader | None = (
+            HwmonTemperatureReader() if HwmonTemperatureReader.is_supported() else None
+        )
+        self._pressure: PressureReader | None = (
+            PressureReader() if PressureReader.is_supported() else None
+        )
+        self._cgroups: CgroupMonitor | None = (
+            CgroupMonitor() if CgroupMonitor.is_supported() else None
+        )
+        self._disk_io = DiskIoRates(self._psutil, arguments)
+        self._cpu_usage = CpuUsageReader(self._psutil)
+        self._sockets = SocketCounter(self._psutil)
+        self._process_watcher = ProcessWatcher(self._psutil)
+        self._top_processes = TopProcesses(self._psutil, TOP_PROCESSES_COUNT)
 
         self._initial_update: bool = True
         self.update_subscribers: dict[tuple[str, str], set[str]] = (
             self.set_subscribers_tuples(arguments)
         )
+        self._samples: dict[str, Any] = {}
+        self._probe_durations: dict[str, float] = {}
+        self._probes_in_flight: set[str] = set()
+        # Monotonic time each probe was last sampled, for sources with an interval
+        self._sampled_at: dict[str, float] = {}
+        self._sources: dict[str, MetricSource] = {
+            source.name: source
+            for source in (
+                ProbeSource("disks", self._sample_disks, Cost.SLOW),
+                ProbeSource("disk_io", self._sample_disk_io),
+                ProbeSource("swap", self._sample_swap),
+                ProbeSource("memory", self._sample_memory),
+                ProbeSource("io_counters", self._sample_io_counters),
+                ProbeSource("addresses", self._sample_addresses),
+                ProbeSource("load", self._sample_load),
+                ProbeSource("cpu_percent", self._sample_cpu_percent),
+                ProbeSource("boot", self._sample_boot),
+                ProbeSource("processes", self._sample_processes, Cost.SLOW),
+                ProbeSource("top_processes", self._sample_top_processes, Cost.SLOW),
+                ProbeSource("temperatures", self._sample_temperatures),
+                ProbeSource("pressure", self._sample_pressure),
+                ProbeSource("cgroups", self._sample_cgroups),
+                ProbeSource("sockets", self._sample_sockets, Cost.SLOW),
+            )
+        }
+        self.plugin_sources: list[str] = []
+        for source in load_sources(self._psutil, RESERVED_SOURCE_NAMES):
+            self._sources[source.name] = source
+            self.plugin_sources.append(source.name)
+            self.update_subscribers[(source.name, "")] = set()
 
     def set_subscribers_tuples(
         self, arguments: list[str]
@@ -111,6 +216,7 @@ class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
             _disk_defaults[("disks", argument)] = set()
         return {
             **_disk_defaults,
+            ("disk_io", ""): set(),
             ("swap", ""): set(),
             ("memory", ""): set(),
             ("io_counters", ""): set(),
@@ -119,41 +225,184 @@ class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
             ("cpu_percent", ""): set(),
             ("boot", ""): set(),
             ("processes", ""): set(),
+            ("top_processes", ""): set(),
             ("temperatures", ""): set(),
+            ("pressure", ""): set(),
+            ("cgroups", ""): set(),
+            ("sockets", ""): set(),
         }
 
+    def set_watched_processes(self, names: Iterable[str]) -> None:
+        """Set the process names to report the running state for."""
+        self._process_watcher.set_watched(names)
+        self.update_subscribers[("processes", "")] = (
+            {"dummy"} if self._process_watcher.watched else set()
+        )
+
+    def set_cgroup_patterns(self, patterns: Iterable[str]) -> None:
+        """Set the patterns of the cgroups to report resource usage for."""
+        if self._cgroups is None:
+            _LOGGER.debug("Cgroups ignored, system has no cgroup v2 hierarchy")
+            return
+        self._cgroups.set_patterns(patterns)
+
+    @property
+    def watched_pids(self) -> frozenset[int]:
+        """Pids of the running processes with a watched name."""
+        return self._process_watcher.watched_pids
+
+    def process_exited(self, pid: int) -> None:
+        """Handle exit of a process, reported before the next update."""
+        self._process_watcher.process_exited(pid)
+
     async def _async_update_data(self) -> SensorData:
         """Fetch data."""
         _LOGGER.debug("Update list is: %s", self.update_subscribers)
 
-        _data = await self.hass.async_add_executor_job(self.update_data)
+        # Probes are sampled with one executor job per pool, so slow probes can
+        # not hold up the fast ones. The event loop only assembles the snapshot.
+        probes = [probe for probe in self._sources if self._is_subscribed(probe)]
+        now = time.monotonic()
+        jobs: list[asyncio.Future] = []
+        for pool, pool_probes in self._group_by_pool(
+            probe
+            for probe in probes
+            if probe not in self._probes_in_flight and self._is_due(probe, now)
+        ).items():
+            try:
+                job = self.hass.async_add_pool_executor_job(
+                    pool, self.update_data, pool_probes
+                )
+            except ExecutorPoolFullError as err:
+                _LOGGER.warning("%s, skipping probes %s", err, pool_probes)
+                continue
+            self._probes_in_flight.update(pool_probes)
+            self._sampled_at.update(dict.fromkeys(pool_probes, now))
+            job.add_done_callback(functools.partial(self._store_samples, pool_probes))
+            jobs.append(job)
+
+        if jobs:
+            # Probes that do not finish in time keep running and will be picked
+            # up by a next update, until then their previous sample is used.
+            await asyncio.wait(
+                jobs, timeout=None if self._initial_update else PROBE_TIMEOUT
+            )
+        if self._probes_in_flight:
+            _LOGGER.debug("Probes still running: %s", self._probes_in_flight)
+
+        samples = {
+            probe: self._samples[probe] for probe in probes if probe in self._samples
+        }
+        probe_durations = {
+            probe: self._probe_durations[probe]
+            for probe in probes
+            if probe in self._probe_durations
+        }
+        _LOGGER.debug("Probe durations: %s", probe_durations)
 
-        load: tuple = (None, None, None)
-        if self.update_subscribers[("load", "")] or self._initial_update:
-            load = self._psutil.getloadavg()  # This used `os.getloadavg` before, but that does not exist on Windows
-            _LOGGER.debug("Load: %s", load)
+        cpu_temperature: float | None = None
+        if "temperatures" in samples:
+            if self._hwmon is not None:
+                cpu_temperature = self._hwmon.cpu_temperature
+            if cpu_temperature is None:
+                cpu_temperature = read_cpu_temperature(samples["temperatures"])
 
-        cpu_percent: float | None = None
-        if self.update_subscribers[("cpu_percent", "")] or self._initial_update:
-            cpu_percent = self._psutil.cpu_percent(interval=None)
-            _LOGGER.debug("cpu_percent: %s", cpu_percent)
+        cpu_usage: CpuUsage | None = samples.get("cpu_percent")
 
         self._initial_update = False
         return SensorData(
-            disk_usage=_data["disks"],
-            swap=_data["swap"],
-            memory=_data["memory"],
-            io_counters=_data["io_counters"],
-            addresses=_data["addresses"],
-            load=load,
-            cpu_percent=cpu_percent,
-            boot_time=_data["boot_time"],
-            processes=_data["processes"],
-            temperatures=_data["temperatures"],
+            disk_usage=samples.get("disks", {}),
+            disk_io=samples.get("disk_io", {}),
+            swap=samples.get("swap"),
+            memory=samples.get("memory"),
+            io_counters=samples.get("io_counters"),
+            addresses=samples.get("addresses"),
+            load=samples.get("load", (None, None, None)),
+            cpu_percent=cpu_usage.total if cpu_usage else None,
+            cpu_percent_per_core=cpu_usage.per_core if cpu_usage else [],
+            cpu_times_percent=cpu_usage.times_percent if cpu_usage else [],
+            boot_time=self.boot_time,
+            processes=samples.get("processes", {}),
+            top_processes=samples.get("top_processes", {}),
+            temperatures=samples.get("temperatures", {}),
+            cpu_temperature=cpu_temperature,
+            pressure=samples.get("pressure", {}),
+            cgroups=samples.get("cgroups", {}),
+            sockets=samples.get("sockets", {}),
+            sources=self._serialize_sources(samples),
+            probe_durations=MappingProxyType(probe_durations),
         )
 
-    def update_data(self) -> dict[str, Any]:
-        """To be extended by data update coordinators."""
+    def _serialize_sources(self, samples: dict[str, Any]) -> dict[str, Any]:
+        serialized = {}
+        for name in self.plugin_sources:
+            if name not in samples:
+                continue
+            try:
+                serialized[name] = self._sources[name].serialize(samples[name])
+            except Exception:
+                # Like a failed sample, the source is left out of this update
+                _LOGGER.exception("Serializing %s failed", name)
+        return serialized
+
+    def _group_by_pool(self, probes: Iterable[str]) -> dict[str, list[str]]:
+        pools: dict[str, list[str]] = {}
+        for probe in probes:
+            pools.setdefault(self._sources[probe].pool_name, []).append(probe)
+        return pools
+
+    def _store_samples(self, probes: list[str], job: asyncio.Future) -> None:
+        self._probes_in_flight.difference_update(probes)
+        if job.cancelled():
+            return
+        if (err := job.exception()) is not None:
+            _LOGGER.error("Sampling %s failed", probes, exc_info=err)
+            return
+        samples, probe_durations = job.result()
+        self._samples.update(samples)
+        self._probe_durations.update(probe_durations)
+
+    def update_data(
+        self, probes: Iterable[str]
+    ) -> tuple[dict[str, Any], dict[str, float]]:
+        """Sample the probes, returns the samples and seconds spent per probe.
+
+        Blocking, so it must run in an executor.
+        """
+        samples: dict[str, Any] = {}
+        probe_durations: dict[str, float] = {}
+        for probe in probes:
+            start = time.perf_counter()
+            try:
+                samples[probe] = self._sources[probe].sample()
+            except Exception:
+                # A broken probe, e.g. from a plugin, must not take the others down
+                _LOGGER.exception("Sampling %s failed", probe)
+            probe_durations[probe] = time.perf_counter() - start
+        return samples, probe_durations
+
+    def _is_subscribed(self, probe: str) -> bool:
+        """Return True if the probe needs to be sampled this update."""
+        if self._initial_update:
+            return True
+        if probe == "disks":
+            return any(
+                self.update_subscribers[("disks", argument)]
+                for argument in self._arguments
+            )
+        if probe == "boot":
+            # Boot time only needs to refresh on first pass
+            return False
+        return bool(self.update_subscribers[(probe, "")])
+
+    def _is_due(self, probe: str, now: float) -> bool:
+        """Return True if the interval of the probe passed since the last sample."""
+        interval = self._sources[probe].interval
+        if interval is None or probe not in self._sampled_at:
+            return True
+        return now - self._sampled_at[probe] >= interval
+
+    def _sample_disks(self) -> dict[str, sdiskusage]:
         disks: dict[str, sdiskusage] = {}
         for argument in self._arguments:
             if self.update_subscribers[("disks", argument)] or self._initial_update:
@@ -168,56 +417,89 @@ class SystemMonitorCoordinator(TimestampDataUpdateCoordinator[SensorData]):
                     _LOGGER.warning("OS error for %s, error %s", argument, err)
                 else:
                     disks[argument] = usage
+        return disks
+
+    def _sample_disk_io(self) -> dict[str, DiskIo]:
+        disk_io = self._disk_io.read()
+        _LOGGER.debug("disk_io: %s", disk_io)
+        return disk_io
+
+    def _sample_swap(self) -> sswap:
+        swap = self._psutil.swap_memory()
+        _LOGGER.debug("sswap: %s", swap)
+        return swap
+
+    def _sample_memory(self) -> VirtualMemory:
+        memory = self._psutil.virtual_memory()
+        _LOGGER.debug("memory: %s", memory)
+        return VirtualMemory(
+            memory.total, memory.available, memory.percent, memory.used, memory.free
+        )
 
-        swap: sswap | None = None
-        if self.update_subscribers[("swap", "")] or self._initial_update:
-            swap = self._psutil.swap_memory()
-            _LOGGER.debug("sswap: %s", swap)
-
-        memory = None
-        if self.update_subscribers[("memory", "")] or self._initial_update:
-            memory = self._psutil.virtual_memory()
-            _LOGGER.debug("memory: %s", memory)
-            memory = VirtualMemory(
-                memory.total, memory.available, memory.percent, memory.used, memory.free
-            )
-
-        io_counters: dict[str, snetio] | None = None
-        if self.update_subscribers[("io_counters", "")] or self._initial_update:
-            io_counters = self._psutil.net_io_counters(pernic=True)
-            _LOGGER.debug("io_counters: %s", io_counters)
-
-        addresses: dict[str, list[snicaddr]] | None = None
-        if self.update_subscribers[("addresses", "")] or self._initial_update:
-            addresses = self._psutil.net_if_addrs()
-            _LOGGER.debug("ip_addresses: %s", addresses)
-
-        if self._initial_update:
-            # Boot time only needs to refresh on first pass
-            self.boot_time = dt_util.utc_from_timestamp(self._psutil.boot_time())
-            _LOGGER.debug("boot time: %s", self.boot_time)
-
-        processes = None
-        if self.update_subscribers[("processes", "")] or self._initial_update:
-            processes = self._psutil.process_iter()
-            _LOGGER.debug("processes: %s", processes)
-            processes = list(processes)
-
+    def _sample_io_counters(self) -> dict[str, snetio]:
+        io_counters = self._psutil.net_io_counters(pernic=True)
+        _LOGGER.debug("io_counters: %s", io_counters)
+        return io_counters
+
+    def _sample_addresses(self) -> dict[str, list[snicaddr]]:
+        addresses = self._psutil.net_if_addrs()
+        _LOGGER.debug("ip_addresses: %s", addresses)
+        return addresses
+
+    def _sample_load(self) -> tuple[float, float, float]:
+        load = self._psutil.getloadavg()  # This used `os.getloadavg` before, but that does not exist on Windows
+        _LOGGER.debug("Load: %s", load)
+        return load
+
+    def _sample_cpu_percent(self) -> CpuUsage | None:
+        cpu_usage = self._cpu_usage.read()
+        _LOGGER.debug("cpu_usage: %s", cpu_usage)
+        return cpu_usage
+
+    def _sample_boot(self) -> datetime:
+        self.boot_time = dt_util.utc_from_timestamp(self._psutil.boot_time())
+        _LOGGER.debug("boot time: %s", self.boot_time)
+        return self.boot_time
+
+    def _sample_processes(self) -> dict[str, bool]:
+        processes = self._process_watcher.update()
+        _LOGGER.debug("processes: %s", processes)
+        return processes
+
+    def _sample_top_processes(self) -> dict[str, list[ProcessUsage]]:
+        top_processes = self._top_processes.update()
+        _LOGGER.debug("top_processes: %s", top_processes)
+        return top_processes
+
+    def _sample_temperatures(self) -> dict[str, list[shwtemp]]:
         temps: dict[str, list[shwtemp]] = {}
-        if self.update_subscribers[("temperatures", "")] or self._initial_update:
-            try:
-                temps = self._psutil.sensors_temperatures()
-                _LOGGER.debug("temps: %s", temps)
-            except AttributeError:
-                _LOGGER.debug("OS does not provide temperature sensors")
-
-        return {
-            "disks": disks,
-            "swap": swap,
-            "memory": memory,
-            "io_counters": io_counters,
-            "addresses": addresses,
-            "boot_time": self.boot_time,
-            "processes": processes,
-            "temperatures": temps,
-        }
+        if self._hwmon is not None and (temps := self._hwmon.read()):
+            _LOGGER.debug("temps: %s", temps)
+            return temps
+
+        # psutil also has fallbacks, e.g. for systems with only thermal zones
+        try:
+            temps = self._psutil.sensors_temperatures()
+            _LOGGER.debug("temps: %s", temps)
+        except AttributeError:
+            _LOGGER.debug("OS does not provide temperature sensors")
+        return temps
+
+    def _sample_pressure(self) -> dict[str, dict[str, PressureStall]]:
+        if self._pressure is None:
+            return {}
+        pressure = self._pressure.read()
+        _LOGGER.debug("pressure: %s", pressure)
+        return pressure
+
+    def _sample_cgroups(self) -> dict[str, CgroupUsage]:
+        if self._cgroups is None:
+            return {}
+        cgroups = self._cgroups.read()
+        _LOGGER.debug("cgroups: %s", cgroups)
+        return cgroups
+
+    def _sample_sockets(self) -> dict[str, dict[str, int]]:
+        sockets = self._sockets.read()
+        _LOGGER.debug("sockets: %s", sockets)
+        return sockets
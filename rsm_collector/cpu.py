@@ -0,0 +1,96 @@
+"""CPU usage per core and per kind of CPU time."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to measure over on the first read, so the first snapshot has the usage
+# per core, the integration creates its sensors from it
+FIRST_READ_INTERVAL = 0.1
+
+# Order of the CPU times in `CpuUsage.times_percent`, part of the API
+CPU_TIMES_FIELDS = ("user", "system", "iowait", "steal")
+
+
+class CpuUsage(NamedTuple):
+    """CPU usage since the previous read, in percent."""
+
+    total: float
+    per_core: list[float]
+    # In the order of CPU_TIMES_FIELDS, None when the platform does not have it
+    times_percent: list[float | None]
+
+
+def _total_time(times) -> float:
+    total = sum(times)
+    # On Linux guest time is also counted in user time
+    return total - getattr(times, "guest", 0) - getattr(times, "guest_nice", 0)
+
+
+def _idle_time(times) -> float:
+    # Same as psutil.cpu_percent, waiting for IO is idle
+    return times.idle + getattr(times, "iowait", 0)
+
+
+class CpuUsageReader:
+    """Calculates all CPU usage from one `cpu_times(percpu=True)` call.
+
+    `cpu_percent` and `cpu_times_percent` each read the CPU times again,
+    per core and in total. Here the totals are summed from the per core times.
+    """
+
+    def __init__(self, psutil) -> None:
+        self._psutil = psutil
+        self._previous: list | None = None
+        self._usage: CpuUsage | None = None
+
+    def read(self) -> CpuUsage | None:
+        """Return usage since the previous read, None when CPUs went on- or offline.
+
+        Blocking, the first read sleeps FIRST_READ_INTERVAL.
+        """
+        if self._previous is None:
+            self._previous = self._psutil.cpu_times(percpu=True)
+            time.sleep(FIRST_READ_INTERVAL)
+
+        current = self._psutil.cpu_times(percpu=True)
+        previous, self._previous = self._previous, current
+        if len(previous) != len(current):
+            # CPUs went on- or offline
+            return None
+
+        per_core = []
+        busy_sum = total_sum = 0.0
+        field_sums = dict.fromkeys(CPU_TIMES_FIELDS, 0.0)
+        for before, after in zip(previous, current):
+            total = max(0.0, _total_time(after) - _total_time(before))
+            busy = max(0.0, total - (_idle_time(after) - _idle_time(before)))
+            per_core.append(round(min(100.0, 100 * busy / total), 1) if total else 0.0)
+            busy_sum += busy
+            total_sum += total
+            for field in CPU_TIMES_FIELDS:
+                if hasattr(after, field):
+                    field_sums[field] += max(
+                        0.0, getattr(after, field) - getattr(before, field)
+                    )
+
+        if not total_sum:
+            # Read too quickly after the previous one, the next read measures from
+            # the previous one again
+            self._previous = previous
+            return self._usage
+        self._usage = CpuUsage(
+            total=round(100 * busy_sum / total_sum, 1),
+            per_core=per_core,
+            times_percent=[
+                round(100 * field_sums[field] / total_sum, 1)
+                if hasattr(current[0], field)
+                else None
+                for field in CPU_TIMES_FIELDS
+            ],
+        )
+        return self._usage
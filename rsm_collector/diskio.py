@@ -0,0 +1,126 @@
+"""Disk IO rates of the block devices behind the monitored mounts."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+import os
+import time
+from typing import NamedTuple
+
+from psutil._common import sdiskio
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to measure over on the first read, so the first snapshot has rates
+FIRST_READ_INTERVAL = 0.1
+
+
+class DiskIo(NamedTuple):
+    """IO rates of a disk since the previous read."""
+
+    # Bytes per second
+    read: float
+    write: float
+    # Operations per second
+    read_iops: float
+    write_iops: float
+    # Share of time the disk was busy, only on Linux and FreeBSD
+    busy_percent: float | None
+
+
+def get_disk_devices(psutil, mountpoints: Iterable[str]) -> set[str]:
+    """Return the names of the block devices the mount points are on.
+
+    Names are like the ones from `disk_io_counters(perdisk=True)`, e.g.
+    /dev/mapper/vg-root becomes dm-0.
+    """
+    mountpoints = set(mountpoints)
+    devices = set()
+    for part in psutil.disk_partitions(all=True):
+        if part.mountpoint in mountpoints and part.device.startswith("/dev/"):
+            devices.add(os.path.basename(os.path.realpath(part.device)))
+    _LOGGER.debug("Disk devices for %s: %s", mountpoints, devices)
+    return devices
+
+
+class DiskIoRates:
+    """Calculates IO rates from the counters of the devices behind the mounts.
+
+    psutil already compensates counters that wrap around. Counters can still
+    go back when a device is removed and added again, that read gives no
+    rates.
+
+    The first read measures over FIRST_READ_INTERVAL, the integration creates
+    its disk IO sensors from the devices in the first snapshot.
+    """
+
+    def __init__(self, psutil, mountpoints: Iterable[str]) -> None:
+        self._psutil = psutil
+        self._mountpoints = list(mountpoints)
+        self._devices: set[str] | None = None
+        self._timestamp: float | None = None
+        self._counters: dict[str, sdiskio] = {}
+
+    def read(self) -> dict[str, DiskIo]:
+        """Return IO rates per device since the previous read.
+
+        Blocking, the first read sleeps FIRST_READ_INTERVAL.
+        """
+        if self._timestamp is None:
+            self._timestamp, self._counters = self._read_counters()
+            time.sleep(FIRST_READ_INTERVAL)
+
+        now, counters = self._read_counters()
+        rates: dict[str, DiskIo] = {}
+        if (elapsed := now - self._timestamp) > 0:
+            for device, counter in counters.items():
+                if (previous := self._counters.get(device)) is None:
+                    continue
+                if (rate := _rates(previous, counter, elapsed)) is not None:
+                    rates[device] = rate
+        self._timestamp = now
+        self._counters = counters
+        return rates
+
+    def _read_counters(self) -> tuple[float, dict[str, sdiskio]]:
+        if self._devices is None:
+            self._devices = get_disk_devices(self._psutil, self._mountpoints)
+
+        now = time.monotonic()
+        counters = {
+            device: counter
+            for device, counter in (
+                self._psutil.disk_io_counters(perdisk=True) or {}
+            ).items()
+            if device in self._devices
+        }
+        if self._counters.keys() - counters.keys():
+            # Device renamed or removed, look again on the next read
+            self._devices = None
+        return now, counters
+
+
+def _rates(previous: sdiskio, current: sdiskio, elapsed: float) -> DiskIo | None:
+    read = current.read_bytes - previous.read_bytes
+    write = current.write_bytes - previous.write_bytes
+    read_count = current.read_count - previous.read_count
+    write_count = current.write_count - previous.write_count
+    if min(read, write, read_count, write_count) < 0:
+        # Counters were reset
+        return None
+
+    busy_percent = None
+    if hasattr(current, "busy_time"):
+        # busy_time is in milliseconds
+        busy_percent = round(
+            min(100.0, max(0, current.busy_time - previous.busy_time) / elapsed / 10),
+            1,
+        )
+    return DiskIo(
+        read / elapsed,
+        write / elapsed,
+        read_count / elapsed,
+        write_count / elapsed,
+        busy_percent,
+    )
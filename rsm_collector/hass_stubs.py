@@ -3,6 +3,7 @@ Dummy HomeAssistant implementations for the collector.
 Intended to keep changes of copied code limited, so it will be easier to update in the future
 """
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 import logging
 from typing import Any, Awaitable, Callable, Generic
@@ -11,10 +12,67 @@ from typing_extensions import TypeVar
 
 DEFAULT_SCAN_INTERVAL = 15
 
+class ExecutorPoolFullError(Exception):
+    """Raised when a job is added to an executor pool that has no room left."""
+
+
+class ExecutorPool():
+    """Named executor with a limited amount of workers and queued jobs.
+
+    Not part of Home Assistant, it is used to keep slow probes from delaying fast ones.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queued: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix=f"rsm_{name}"
+        )
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit[*_Ts, _T](
+        self, loop: asyncio.AbstractEventLoop, target: Callable[[*_Ts], _T], *args: *_Ts
+    ) -> asyncio.Future[_T]:
+        """Submit a job, raises ExecutorPoolFullError when the queue is full."""
+        if self.pending >= self.max_workers + self.max_queued:
+            self.rejected += 1
+            raise ExecutorPoolFullError(f"Executor pool {self.name} is full")
+
+        task = loop.run_in_executor(self._executor, target, *args)
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        task.add_done_callback(self._job_done)
+        return task
+
+    def _job_done(self, _task: asyncio.Future) -> None:
+        self.pending -= 1
+        self.completed += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return usage and saturation counters."""
+        return {
+            "max_workers": self.max_workers,
+            "max_queued": self.max_queued,
+            "active": min(self.pending, self.max_workers),
+            "queued": max(self.pending - self.max_workers, 0),
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
 class HomeAssistant():
 
     def __init__(self):
         self.loop = asyncio.get_event_loop()
+        self.executor_pools: dict[str, ExecutorPool] = {}
 
 #    @callback
     def async_add_executor_job[*_Ts, _T](
@@ -30,6 +88,20 @@ class HomeAssistant():
 
         return task
 
+    def async_create_executor_pool(
+        self, name: str, max_workers: int, max_queued: int
+    ) -> ExecutorPool:
+        """Create a named executor pool for async_add_pool_executor_job."""
+        pool = ExecutorPool(name, max_workers, max_queued)
+        self.executor_pools[name] = pool
+        return pool
+
+    def async_add_pool_executor_job[*_Ts, _T](
+        self, pool: str, target: Callable[[*_Ts], _T], *args: *_Ts
+    ) -> asyncio.Future[_T]:
+        """Add an executor job to a named executor pool from within the event loop."""
+        return self.executor_pools[pool].submit(self.loop, target, *args)
+
 
 _DataT = TypeVar("_DataT", default=dict[str, Any])
 
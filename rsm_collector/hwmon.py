@@ -0,0 +1,140 @@
+"""Temperature sensors read directly from the Linux hwmon interface."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import glob
+import logging
+import os
+
+from psutil._common import shwtemp
+
+from .util import is_cpu_sensor
+
+_LOGGER = logging.getLogger(__name__)
+
+HWMON_PATH = "/sys/class/hwmon"
+
+
+@dataclass(slots=True)
+class _TemperatureSensor:
+    fd: int
+    name: str
+    label: str
+    high: float | None
+    critical: float | None
+
+
+def _read_millidegrees(path: str) -> float | None:
+    try:
+        with open(path, "rb") as file:
+            return int(file.read()) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8") as file:
+            return file.read().strip()
+    except OSError:
+        return ""
+
+
+class HwmonTemperatureReader:
+    """Reads temperatures from hwmon, like `psutil.sensors_temperatures()`.
+
+    psutil walks and globs all of hwmon on every call. This reader only
+    does that when the set of hwmon devices changes and keeps the input
+    files open so a read is a `pread` per sensor.
+    The CPU sensor is also selected once at discovery.
+    """
+
+    def __init__(self, path: str = HWMON_PATH) -> None:
+        self._path = path
+        self._hwmons: frozenset[str] | None = None
+        self._sensors: list[_TemperatureSensor] = []
+        self._cpu_sensor: _TemperatureSensor | None = None
+        # CPU temperature from the last read
+        self.cpu_temperature: float | None = None
+
+    @staticmethod
+    def is_supported(path: str = HWMON_PATH) -> bool:
+        """Return True when the system has a hwmon interface."""
+        return os.path.isdir(path)
+
+    def read(self) -> dict[str, list[shwtemp]]:
+        """Return temperatures per device name."""
+        hwmons = frozenset(os.listdir(self._path))
+        if hwmons != self._hwmons:
+            self._discover(hwmons)
+
+        temps: dict[str, list[shwtemp]] = {}
+        self.cpu_temperature = None
+        for sensor in self._sensors:
+            try:
+                current = int(os.pread(sensor.fd, 32, 0)) / 1000.0
+            except (OSError, ValueError) as err:
+                # Device probably went away, look again on the next read
+                _LOGGER.debug("Reading %s failed: %s", sensor.name, err)
+                self._hwmons = None
+                continue
+            temps.setdefault(sensor.name, []).append(
+                shwtemp(sensor.label, current, sensor.high, sensor.critical)
+            )
+            if sensor is self._cpu_sensor:
+                self.cpu_temperature = round(current, 1)
+        return temps
+
+    def close(self) -> None:
+        """Close all sensor files."""
+        for sensor in self._sensors:
+            os.close(sensor.fd)
+        self._sensors = []
+        self._cpu_sensor = None
+
+    def _discover(self, hwmons: frozenset[str]) -> None:
+        self.close()
+        self._hwmons = hwmons
+
+        # Same lookup as psutil, so names, labels and order are the same
+        basenames = glob.glob(os.path.join(self._path, "hwmon*", "temp*_*"))
+        # CentOS has an intermediate /device directory
+        basenames.extend(
+            glob.glob(os.path.join(self._path, "hwmon*", "device", "temp*_*"))
+        )
+
+        bases = {
+            os.path.join(os.path.dirname(path), os.path.basename(path).split("_")[0])
+            for path in basenames
+        }
+        for base in sorted(bases):
+            name = _read_text(os.path.join(os.path.dirname(base), "name"))
+            if not name:
+                continue
+            try:
+                fd = os.open(base + "_input", os.O_RDONLY)
+            except OSError:
+                continue
+            self._sensors.append(
+                _TemperatureSensor(
+                    fd=fd,
+                    name=name,
+                    label=_read_text(base + "_label"),
+                    high=_read_millidegrees(base + "_max"),
+                    critical=_read_millidegrees(base + "_crit"),
+                )
+            )
+
+        numbers: dict[str, int] = {}
+        for sensor in self._sensors:
+            numbers[sensor.name] = numbers.get(sensor.name, 0) + 1
+            if is_cpu_sensor(sensor.name, sensor.label, numbers[sensor.name]):
+                self._cpu_sensor = sensor
+                break
+
+        _LOGGER.debug(
+            "Discovered %s temperature sensors, CPU sensor: %s",
+            len(self._sensors),
+            self._cpu_sensor,
+        )
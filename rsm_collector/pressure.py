@@ -0,0 +1,204 @@
+"""Pressure Stall Information (PSI) from the Linux /proc/pressure interface."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import logging
+import os
+import re
+import select
+import threading
+from typing import NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+PRESSURE_PATH = "/proc/pressure"
+PRESSURE_RESOURCES = ("cpu", "memory", "io")
+
+_TRIGGER_PATTERN = re.compile(
+    r"^\s*(cpu|memory|io)\s+(some|full)\s+(\d+)\s*(us|ms|s)\s+in\s+(\d+)\s*(us|ms|s)\s*$"
+)
+_MICROSECONDS = {"us": 1, "ms": 1000, "s": 1000000}
+
+
+class PressureStall(NamedTuple):
+    """Share of time tasks were stalled on a resource."""
+
+    avg10: float
+    avg60: float
+    avg300: float
+    # Total stall time in microseconds
+    total: int
+
+
+def _parse_pressure(text: str) -> dict[str, PressureStall]:
+    stalls = {}
+    for line in text.splitlines():
+        kind, *fields = line.split()
+        values = dict(field.split("=") for field in fields)
+        stalls[kind] = PressureStall(
+            float(values["avg10"]),
+            float(values["avg60"]),
+            float(values["avg300"]),
+            int(values["total"]),
+        )
+    return stalls
+
+
+class PressureReader:
+    """Reads the pressure of all resources.
+
+    The pressure files are kept open, so a read is a `pread` per resource.
+    """
+
+    def __init__(self, path: str = PRESSURE_PATH) -> None:
+        self._fds: dict[str, int] = {}
+        for resource in PRESSURE_RESOURCES:
+            try:
+                self._fds[resource] = os.open(
+                    os.path.join(path, resource), os.O_RDONLY
+                )
+            except OSError as err:
+                _LOGGER.debug("No pressure information for %s: %s", resource, err)
+
+    @staticmethod
+    def is_supported(path: str = PRESSURE_PATH) -> bool:
+        """Return True when the kernel provides pressure information."""
+        return os.path.isdir(path)
+
+    def read(self) -> dict[str, dict[str, PressureStall]]:
+        """Return the "some" and "full" pressure per resource."""
+        pressure = {}
+        for resource, fd in self._fds.items():
+            try:
+                pressure[resource] = _parse_pressure(os.pread(fd, 256, 0).decode())
+            except OSError as err:
+                # CPU pressure can be disabled at runtime, e.g. with psi=0
+                _LOGGER.debug("Reading pressure for %s failed: %s", resource, err)
+        return pressure
+
+    def close(self) -> None:
+        """Close all pressure files."""
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds = {}
+
+
+@dataclass(frozen=True, slots=True)
+class PressureTrigger:
+    """Threshold of stall time within a time window, like "memory some 150ms in 2s"."""
+
+    resource: str
+    kind: str
+    # Both in microseconds
+    threshold: int
+    window: int
+
+    @classmethod
+    def parse(cls, trigger: str) -> PressureTrigger:
+        """Parse a trigger, raises ValueError when it is not valid."""
+        if (match := _TRIGGER_PATTERN.match(trigger)) is None:
+            raise ValueError(
+                f"Invalid pressure trigger '{trigger}', expected something like 'memory some 150ms in 2s'"
+            )
+        resource, kind, threshold, threshold_unit, window, window_unit = match.groups()
+        return cls(
+            resource,
+            kind,
+            int(threshold) * _MICROSECONDS[threshold_unit],
+            int(window) * _MICROSECONDS[window_unit],
+        )
+
+    def __str__(self) -> str:
+        return f"{self.resource} {self.kind} {self.threshold}us in {self.window}us"
+
+
+class PressureTriggerMonitor:
+    """Reports crossed pressure triggers as they happen.
+
+    Every trigger is a file descriptor the kernel signals with POLLPRI when
+    the threshold is crossed, at most once per window. The event loop can
+    not wait for POLLPRI and the kernel clears the event when it is polled,
+    so it can not go through a nested epoll either. A thread blocks in
+    `poll` on the triggers instead, nothing is polled while the system is calm.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        on_trigger: Callable[[PressureTrigger], None],
+        path: str = PRESSURE_PATH,
+    ) -> None:
+        self._loop = loop
+        self._on_trigger = on_trigger
+        self._path = path
+        self._poll = select.poll()
+        self._triggers: dict[int, PressureTrigger] = {}
+        # Written to on close to wake up the thread
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        self._poll.register(self._wakeup_read, select.POLLIN)
+        self._thread: threading.Thread | None = None
+
+    def add(self, trigger: PressureTrigger) -> None:
+        """Add a trigger, raises OSError when the kernel does not accept it.
+
+        Triggers can only be added before the monitor is started.
+        """
+        assert self._thread is None
+        fd = os.open(
+            os.path.join(self._path, trigger.resource), os.O_RDWR | os.O_NONBLOCK
+        )
+        try:
+            os.write(fd, f"{trigger.kind} {trigger.threshold} {trigger.window}\0".encode())
+        except OSError:
+            os.close(fd)
+            raise
+        self._poll.register(fd, select.POLLPRI)
+        self._triggers[fd] = trigger
+        _LOGGER.info("Pressure trigger added: %s", trigger)
+
+    def add_all(self, triggers: Iterable[PressureTrigger]) -> None:
+        """Add triggers, the ones not accepted by the kernel are logged and skipped."""
+        for trigger in triggers:
+            try:
+                self.add(trigger)
+            except OSError as err:
+                # Without CAP_SYS_RESOURCE the window must be a multiple of 2s
+                _LOGGER.warning("Pressure trigger %s not accepted: %s", trigger, err)
+
+    def start(self) -> None:
+        """Start monitoring the triggers."""
+        self._thread = threading.Thread(
+            target=self._run, name="pressure triggers", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop monitoring and remove all triggers."""
+        if self._thread is not None:
+            os.write(self._wakeup_write, b"\0")
+            self._thread.join()
+            self._thread = None
+        for fd in self._triggers:
+            os.close(fd)
+        self._triggers = {}
+        os.close(self._wakeup_read)
+        os.close(self._wakeup_write)
+
+    def _run(self) -> None:
+        while self._triggers:
+            for fd, events in self._poll.poll():
+                if fd == self._wakeup_read:
+                    return
+                trigger = self._triggers[fd]
+                if events & select.POLLERR:
+                    # Monitored cgroup went away, trigger will never fire again
+                    _LOGGER.warning("Pressure trigger %s removed by the kernel", trigger)
+                    self._poll.unregister(fd)
+                    del self._triggers[fd]
+                    os.close(fd)
+                    continue
+                _LOGGER.debug("Pressure trigger crossed: %s", trigger)
+                self._loop.call_soon_threadsafe(self._on_trigger, trigger)
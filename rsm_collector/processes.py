@@ -0,0 +1,237 @@
+"""Process monitoring for the collector."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+import heapq
+import logging
+import os
+import sys
+from typing import NamedTuple
+
+from psutil import Error as PsutilError, Process
+
+_LOGGER = logging.getLogger(__name__)
+
+# Linux truncates the process name in /proc/<pid>/comm to this length
+COMM_LENGTH = 15
+# Number of updates the names of new pids are read again, a wrapper that execs the
+# real binary changes the name right after starting
+RENAME_UPDATES = 2
+
+_USAGE_ATTRS = ["name", "cpu_percent", "memory_info"]
+
+
+class ProcessWatcher:
+    """Keeps track of which of the watched process names are running.
+
+    A pid -> name cache is kept between updates, only names of new pids are
+    read, so an update costs a pid listing plus a read per new process. Names
+    of new pids are read again for RENAME_UPDATES updates.
+    """
+
+    def __init__(self, psutil) -> None:
+        self._psutil = psutil
+        self._names: dict[int, str | None] = {}
+        # Number of the update new pids were first seen in
+        self._new_pids: dict[int, int] = {}
+        self._updates = 0
+        # (pid, start time) of processes reported as exited that can still be listed,
+        # e.g. as zombie. The start time tells when the pid is used again.
+        self._exited: set[tuple[int, float | None]] = set()
+        self.watched: frozenset[str] = frozenset()
+        # Pids of the running processes with a watched name
+        self.watched_pids: frozenset[int] = frozenset()
+
+    def set_watched(self, names: Iterable[str]) -> None:
+        """Set the process names to watch."""
+        self.watched = frozenset(names)
+        _LOGGER.debug("Watched processes: %s", self.watched)
+
+    def process_exited(self, pid: int) -> None:
+        """Mark a process as exited before it disappears from the process list."""
+        if (start_time := self._read_start_time(pid)) is not None:
+            self._exited.add((pid, start_time))
+
+    def update(self) -> dict[str, bool]:
+        """Refresh the process list and return running state per watched name."""
+        self._updates += 1
+        pids = set(self._psutil.pids())
+        for exited in list(self._exited):
+            pid, start_time = exited
+            if pid in pids and self._read_start_time(pid) == start_time:
+                pids.discard(pid)
+            else:
+                # Gone, or the pid is used by a new process
+                self._exited.discard(exited)
+        for pid in self._names.keys() - pids:
+            del self._names[pid]
+            self._new_pids.pop(pid, None)
+        for pid, seen in list(self._new_pids.items()):
+            if self._updates - seen >= RENAME_UPDATES:
+                del self._new_pids[pid]
+            else:
+                self._names[pid] = self._read_name(pid)
+        for pid in pids - self._names.keys():
+            self._names[pid] = self._read_name(pid)
+            self._new_pids[pid] = self._updates
+
+        # Long names only show up truncated in comm
+        comms = {name[:COMM_LENGTH]: name for name in self.watched}
+        comms.update({name: name for name in self.watched})
+        watched_pids = set()
+        running = set()
+        for pid, comm in self._names.items():
+            if (name := comms.get(comm)) is not None:
+                watched_pids.add(pid)
+                running.add(name)
+        self.watched_pids = frozenset(watched_pids)
+        return {name: name in running for name in self.watched}
+
+    def _read_name(self, pid: int) -> str | None:
+        if sys.platform == "linux":
+            try:
+                with open(f"/proc/{pid}/comm", encoding="utf-8", errors="replace") as file:
+                    return file.read().rstrip("\n")
+            except OSError:
+                # Process ended in the meantime
+                return None
+
+        try:
+            return self._psutil.Process(pid).name()
+        except PsutilError:
+            return None
+
+    def _read_start_time(self, pid: int) -> float | None:
+        """Return when the process started, in an OS specific unit."""
+        if sys.platform == "linux":
+            try:
+                with open(f"/proc/{pid}/stat", encoding="utf-8", errors="replace") as file:
+                    # Field 22, the name in field 2 can contain spaces and parentheses
+                    return float(file.read().rpartition(")")[2].split()[19])
+            except (OSError, IndexError, ValueError):
+                return None
+
+        try:
+            return self._psutil.Process(pid).create_time()
+        except PsutilError:
+            return None
+
+
+class ProcessExitMonitor:
+    """Reports exits of processes as they happen, using pidfds.
+
+    A pidfd becomes readable when its process exits, so the event loop can
+    wait for that without polling. Needs Linux 5.3 or newer.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, on_exit: Callable[[int], None]
+    ) -> None:
+        self._loop = loop
+        self._on_exit = on_exit
+        self._pidfds: dict[int, int] = {}
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Return True when the platform supports pidfds."""
+        if not hasattr(os, "pidfd_open"):
+            return False
+        try:
+            os.close(os.pidfd_open(os.getpid()))
+        except OSError:
+            # Kernel older than 5.3
+            return False
+        return True
+
+    def update(self, pids: Iterable[int]) -> None:
+        """Monitor exactly the given pids."""
+        pids = set(pids)
+        for pid in self._pidfds.keys() - pids:
+            self._remove(pid)
+        for pid in pids - self._pidfds.keys():
+            try:
+                pidfd = os.pidfd_open(pid)
+            except OSError:
+                # Already gone, the next update will notice
+                continue
+            self._pidfds[pid] = pidfd
+            self._loop.add_reader(pidfd, self._exited, pid)
+
+    def close(self) -> None:
+        """Stop monitoring all processes."""
+        for pid in list(self._pidfds):
+            self._remove(pid)
+
+    def _exited(self, pid: int) -> None:
+        _LOGGER.debug("Process %s exited", pid)
+        self._remove(pid)
+        self._on_exit(pid)
+
+    def _remove(self, pid: int) -> None:
+        pidfd = self._pidfds.pop(pid)
+        self._loop.remove_reader(pidfd)
+        os.close(pidfd)
+
+
+class ProcessUsage(NamedTuple):
+    """Resource usage of a single process."""
+
+    pid: int
+    name: str
+    cpu_percent: float
+    memory: int
+
+
+class TopProcesses:
+    """Finds the processes using the most CPU and memory.
+
+    Process objects are kept between updates, psutil needs the same object
+    to calculate CPU usage since the previous update. New processes report
+    0% CPU on their first update. CPU usage is per core like `top`, so it
+    can go over 100%.
+    """
+
+    def __init__(self, psutil, count: int) -> None:
+        self._psutil = psutil
+        self._count = count
+        self._processes: dict[int, Process] = {}
+
+    def update(self) -> dict[str, list[ProcessUsage]]:
+        """Refresh usage of all processes and return the top ones."""
+        pids = set(self._psutil.pids())
+        for pid in self._processes.keys() - pids:
+            del self._processes[pid]
+        for pid in pids - self._processes.keys():
+            try:
+                self._processes[pid] = self._psutil.Process(pid)
+            except PsutilError:
+                pass
+
+        usages: list[ProcessUsage] = []
+        for pid, process in list(self._processes.items()):
+            try:
+                # Reads all attributes in one go where the platform supports it
+                info = process.as_dict(_USAGE_ATTRS, ad_value=None)
+            except PsutilError:
+                # Gone since the pid listing
+                del self._processes[pid]
+                continue
+            if info["cpu_percent"] is None or info["memory_info"] is None:
+                # Not allowed to read
+                continue
+            usages.append(
+                ProcessUsage(
+                    pid,
+                    info["name"] or "",
+                    info["cpu_percent"],
+                    info["memory_info"].rss,
+                )
+            )
+
+        # Heap based selection, no need to sort all processes
+        return {
+            "cpu": heapq.nlargest(self._count, usages, key=lambda u: u.cpu_percent),
+            "memory": heapq.nlargest(self._count, usages, key=lambda u: u.memory),
+        }
@@ -0,0 +1,454 @@
+"""Sampling worker process for the collector.
+
+The worker process owns the SystemMonitorCoordinator and does all the psutil
+calls. Every snapshot is encoded once, as the `update_data` notification that
+goes out to the clients, and written into a shared memory double buffer.
+The websocket server in the main process only reads the latest snapshot from
+that buffer, so slow or blocking probes can never stall RPC handling.
+
+The pipe between the processes is used as doorbell for new snapshots, which
+also tells how long sampling took, and, the other way around, to pass
+settings like the watched processes to the worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from multiprocessing.shared_memory import SharedMemory
+import struct
+import time
+from typing import NamedTuple
+
+from myjsonrpc.codecs import get_codec
+
+from . import async_setup_entry
+from .cgroups import DEFAULT_CGROUP_PATTERNS
+from .coordinator import SystemMonitorCoordinator
+from .hass_stubs import DEFAULT_SCAN_INTERVAL, ConfigEntry, HomeAssistant
+from .pressure import PressureReader, PressureTrigger, PressureTriggerMonitor
+from .processes import ProcessExitMonitor
+
+_LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_SLOT_SIZE = 1024 * 1024
+
+# Seconds to wait before restarting a worker that died
+RESTART_DELAY = 5
+
+# Buffer header: generation, index of the slot holding the latest snapshot
+_BUFFER_HEADER = struct.Struct("<QQ")
+# Slot header: sequence lock, length of the snapshot in the slot
+_SLOT_HEADER = struct.Struct("<QQ")
+
+_MAX_READ_ATTEMPTS = 100
+
+# Snapshots are `update_data` notifications put together around the encoded params,
+# so the params can be handed out as they are
+_SNAPSHOT_PREFIX = b'{"jsonrpc":"2.0","method":"update_data","params":'
+_SNAPSHOT_SUFFIX = b"}"
+
+
+def encode_snapshot(params: bytes) -> bytes:
+    """Return the `update_data` notification with the already encoded params."""
+    return b"".join((_SNAPSHOT_PREFIX, params, _SNAPSHOT_SUFFIX))
+
+
+def snapshot_params(snapshot: bytes) -> bytes:
+    """Return the encoded params of a snapshot, without decoding it."""
+    return snapshot[len(_SNAPSHOT_PREFIX) : -len(_SNAPSHOT_SUFFIX)]
+
+
+class SnapshotBuffer:
+    """Double buffer in shared memory guarded by a sequence lock per slot.
+
+    There must only be one writer. The writer always fills the slot that is
+    not the latest one, so readers are only retried when the writer laps
+    them, which takes two complete writes.
+    """
+
+    def __init__(self, shm: SharedMemory, slot_size: int) -> None:
+        self._shm = shm
+        self._buf = shm.buf
+        self.slot_size = slot_size
+
+    @classmethod
+    def create(cls, slot_size: int = SNAPSHOT_SLOT_SIZE) -> SnapshotBuffer:
+        """Create a new, empty, buffer."""
+        shm = SharedMemory(
+            create=True,
+            size=_BUFFER_HEADER.size + 2 * (_SLOT_HEADER.size + slot_size),
+        )
+        buffer = cls(shm, slot_size)
+        _BUFFER_HEADER.pack_into(buffer._buf, 0, 0, 0)
+        for slot in (0, 1):
+            _SLOT_HEADER.pack_into(buffer._buf, buffer._slot_offset(slot), 0, 0)
+        return buffer
+
+    @classmethod
+    def attach(cls, name: str, slot_size: int = SNAPSHOT_SLOT_SIZE) -> SnapshotBuffer:
+        """Attach to a buffer created by another process."""
+        return cls(SharedMemory(name=name), slot_size)
+
+    @property
+    def name(self) -> str:
+        """Name to attach to this buffer from another process."""
+        return self._shm.name
+
+    @property
+    def generation(self) -> int:
+        """Number of snapshots written so far."""
+        return _BUFFER_HEADER.unpack_from(self._buf, 0)[0]
+
+    def _slot_offset(self, slot: int) -> int:
+        return _BUFFER_HEADER.size + slot * (_SLOT_HEADER.size + self.slot_size)
+
+    def write(self, snapshot: bytes) -> int:
+        """Write a snapshot and return its generation."""
+        if len(snapshot) > self.slot_size:
+            raise ValueError(
+                f"Snapshot of {len(snapshot)} bytes does not fit in slot of {self.slot_size} bytes"
+            )
+
+        generation, latest = _BUFFER_HEADER.unpack_from(self._buf, 0)
+        slot = 1 - latest if generation else 0
+        offset = self._slot_offset(slot)
+        sequence = _SLOT_HEADER.unpack_from(self._buf, offset)[0]
+
+        # Odd sequence marks the slot as being written
+        _SLOT_HEADER.pack_into(self._buf, offset, sequence + 1, len(snapshot))
+        data_offset = offset + _SLOT_HEADER.size
+        self._buf[data_offset : data_offset + len(snapshot)] = snapshot
+        _SLOT_HEADER.pack_into(self._buf, offset, sequence + 2, len(snapshot))
+
+        _BUFFER_HEADER.pack_into(self._buf, 0, generation + 1, slot)
+        return generation + 1
+
+    def read(self) -> bytes | None:
+        """Return the latest snapshot, None when nothing was written yet."""
+        for _ in range(_MAX_READ_ATTEMPTS):
+            generation, latest = _BUFFER_HEADER.unpack_from(self._buf, 0)
+            if generation == 0:
+                return None
+            offset = self._slot_offset(latest)
+            sequence, length = _SLOT_HEADER.unpack_from(self._buf, offset)
+            if sequence & 1:
+                continue
+            data_offset = offset + _SLOT_HEADER.size
+            snapshot = bytes(self._buf[data_offset : data_offset + length])
+            if _SLOT_HEADER.unpack_from(self._buf, offset)[0] == sequence:
+                return snapshot
+        raise RuntimeError("Could not get a consistent snapshot from the buffer")
+
+    def close(self) -> None:
+        """Close access to the buffer from this process."""
+        self._buf.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Destroy the buffer, only to be done by the creator."""
+        self._shm.unlink()
+
+
+class SamplerStats(NamedTuple):
+    """Sent by the worker with every new snapshot."""
+
+    generation: int
+    # Seconds the update took, and per probe
+    update_duration: float
+    probe_durations: dict[str, float]
+    # Usage and saturation counters per executor pool, see ExecutorPool.stats
+    executor_pools: dict[str, dict[str, int]]
+
+
+@dataclass(frozen=True, kw_only=True)
+class SamplerConfig:
+    """Configuration passed to the sampling worker process."""
+
+    buffer_name: str
+    slot_size: int = SNAPSHOT_SLOT_SIZE
+    scan_interval: float = DEFAULT_SCAN_INTERVAL
+    loglevel: str = "INFO"
+    pressure_triggers: tuple[PressureTrigger, ...] = ()
+    cgroup_patterns: tuple[str, ...] = DEFAULT_CGROUP_PATTERNS
+
+
+def subscribe_all(coordinator: SystemMonitorCoordinator) -> None:
+    """Subscribe all data the collector sends out for updates."""
+    # Subscribe all disks for updates
+    for disk_argument in coordinator._arguments:
+        coordinator.update_subscribers[("disks", disk_argument)] = (
+            "dummy"  # Would normally be entity_id
+        )
+
+    # Subscribe all / most data for updates
+    coordinator.update_subscribers[("disk_io", "")] = set("dummy")
+    coordinator.update_subscribers[("swap", "")] = set("dummy")
+    coordinator.update_subscribers[("memory", "")] = set("dummy")
+    coordinator.update_subscribers[("io_counters", "")] = set("dummy")
+    # coordinator.update_subscribers[("addresses", "")] = set("dummy")
+    coordinator.update_subscribers[("load", "")] = set("dummy")
+    coordinator.update_subscribers[("cpu_percent", "")] = set("dummy")
+    ## Technically not needed to send all the time since when rebooting collector will be restarted anyway
+    ## But lets leave it in for now to avoid additional work now
+    coordinator.update_subscribers[("boot", "")] = set("dummy")
+    coordinator.update_subscribers[("top_processes", "")] = set("dummy")
+    # Processes are only subscribed while clients watch processes, see `set_watched_processes`
+    # Temperatures are not supported on Windows, but then it is just an empty result
+    coordinator.update_subscribers[("temperatures", "")] = set("dummy")
+    coordinator.update_subscribers[("pressure", "")] = set("dummy")
+    coordinator.update_subscribers[("cgroups", "")] = set("dummy")
+    coordinator.update_subscribers[("sockets", "")] = set("dummy")
+    for name in coordinator.plugin_sources:
+        coordinator.update_subscribers[(name, "")] = set("dummy")
+
+
+def run_sampler(config: SamplerConfig, conn: Connection) -> None:
+    """Entry point of the sampling worker process."""
+    logging.basicConfig(level=config.loglevel)
+    buffer = SnapshotBuffer.attach(config.buffer_name, config.slot_size)
+    try:
+        asyncio.run(_async_run_sampler(config, buffer, conn))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        buffer.close()
+
+
+async def _async_run_sampler(
+    config: SamplerConfig, buffer: SnapshotBuffer, conn: Connection
+) -> None:
+    hass = HomeAssistant()
+    entry = ConfigEntry()
+
+    await async_setup_entry(hass, entry)
+
+    assert entry.runtime_data is not None
+    coordinator = entry.runtime_data.coordinator
+    subscribe_all(coordinator)
+    if config.cgroup_patterns:
+        coordinator.set_cgroup_patterns(config.cgroup_patterns)
+
+    refresh = asyncio.Event()
+    listener = asyncio.create_task(_listen_for_commands(conn, coordinator, refresh))
+
+    def _on_process_exit(pid: int) -> None:
+        coordinator.process_exited(pid)
+        # Report a stopped process right away instead of on the next interval
+        refresh.set()
+
+    # Without pidfds stopped processes are only noticed by the periodic update
+    exit_monitor = (
+        ProcessExitMonitor(asyncio.get_running_loop(), _on_process_exit)
+        if ProcessExitMonitor.is_supported()
+        else None
+    )
+
+    def _on_pressure_trigger(trigger: PressureTrigger) -> None:
+        # Report the pressure right away instead of on the next interval
+        refresh.set()
+
+    if config.pressure_triggers and PressureReader.is_supported():
+        pressure_monitor = PressureTriggerMonitor(
+            asyncio.get_running_loop(), _on_pressure_trigger
+        )
+        pressure_monitor.add_all(config.pressure_triggers)
+        pressure_monitor.start()
+    elif config.pressure_triggers:
+        _LOGGER.warning("Pressure triggers ignored, system has no pressure information")
+
+    codec = get_codec()
+    try:
+        while True:
+            if listener.done():
+                # Main process is gone or sent garbage, nothing left to sample for
+                listener.result()
+                return
+
+            refresh.clear()
+            start = time.perf_counter()
+            data = await coordinator._async_update_data()
+            update_duration = time.perf_counter() - start
+            if exit_monitor is not None:
+                exit_monitor.update(coordinator.watched_pids)
+
+            snapshot = encode_snapshot(codec.encode({"data": data.as_dict()}))
+            try:
+                generation = buffer.write(snapshot)
+            except ValueError as err:
+                _LOGGER.error("Snapshot dropped: %s", err)
+            else:
+                pool_stats = {
+                    name: pool.stats() for name, pool in hass.executor_pools.items()
+                }
+                # Ring the doorbell so the server knows there is a new snapshot
+                conn.send(
+                    SamplerStats(
+                        generation,
+                        update_duration,
+                        dict(data.probe_durations),
+                        pool_stats,
+                    )
+                )
+
+            try:
+                async with asyncio.timeout(config.scan_interval):
+                    await refresh.wait()
+            except TimeoutError:
+                pass
+    finally:
+        # Probes still running are abandoned, the process is exiting anyway
+        for pool in hass.executor_pools.values():
+            pool.shutdown()
+
+
+async def _listen_for_commands(
+    conn: Connection, coordinator: SystemMonitorCoordinator, refresh: asyncio.Event
+) -> None:
+    """Apply commands sent by the main process."""
+    while True:
+        try:
+            command, argument = await asyncio.to_thread(conn.recv)
+        except EOFError:
+            return
+
+        _LOGGER.debug("Command %s: %s", command, argument)
+        if command == "watch_processes":
+            coordinator.set_watched_processes(argument)
+            # Send the new state right away instead of waiting for the next interval
+            refresh.set()
+        else:
+            _LOGGER.warning("Unknown command %s", command)
+
+
+class SamplerProcess:
+    """Runs the sampling worker process and hands out the snapshots.
+
+    The worker is restarted when it dies.
+    """
+
+    def __init__(
+        self,
+        scan_interval: float = DEFAULT_SCAN_INTERVAL,
+        loglevel: str = "INFO",
+        pressure_triggers: tuple[PressureTrigger, ...] = (),
+        cgroup_patterns: tuple[str, ...] = DEFAULT_CGROUP_PATTERNS,
+    ) -> None:
+        self._scan_interval = scan_interval
+        self._loglevel = loglevel
+        self._pressure_triggers = pressure_triggers
+        self._cgroup_patterns = cgroup_patterns
+        self._context = multiprocessing.get_context("spawn")
+        self._buffer: SnapshotBuffer | None = None
+        self._process: BaseProcess | None = None
+        self._conn: Connection | None = None
+        self._watched_processes: list[str] = []
+        # Of the latest snapshot
+        self.stats: SamplerStats | None = None
+        self.restarts = 0
+
+    async def start(self) -> None:
+        """Start the worker and wait for the first snapshot."""
+        self._buffer = SnapshotBuffer.create()
+        self._start_worker()
+        await self.wait_for_snapshot()
+
+    def stop(self) -> None:
+        """Stop the worker and release the buffer."""
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(RESTART_DELAY)
+            self._process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer.unlink()
+            self._buffer = None
+
+    def set_watched_processes(self, names: Iterable[str]) -> None:
+        """Set the process names the worker reports the running state for."""
+        self._watched_processes = sorted(set(names))
+        self._send_watched_processes()
+
+    @property
+    def pid(self) -> int | None:
+        """Pid of the worker process."""
+        return self._process.pid if self._process is not None else None
+
+    def latest(self) -> bytes | None:
+        """Return latest snapshot as encoded `update_data` notification."""
+        assert self._buffer is not None
+        return self._buffer.read()
+
+    async def wait_for_snapshot(self) -> bytes:
+        """Wait for the next snapshot and return it.
+
+        Restarts the worker when it died in the meantime.
+        """
+        while True:
+            assert self._conn is not None
+            try:
+                self.stats = await asyncio.to_thread(self._conn.recv)
+            except (EOFError, OSError):
+                await self._restart_worker()
+                continue
+
+            if snapshot := self.latest():
+                return snapshot
+
+    def _start_worker(self) -> None:
+        assert self._buffer is not None
+        config = SamplerConfig(
+            buffer_name=self._buffer.name,
+            slot_size=self._buffer.slot_size,
+            scan_interval=self._scan_interval,
+            loglevel=self._loglevel,
+            pressure_triggers=self._pressure_triggers,
+            cgroup_patterns=self._cgroup_patterns,
+        )
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=run_sampler,
+            args=(config, child_conn),
+            name="rsm_collector sampler",
+            daemon=True,
+        )
+        self._process.start()
+        # Only the worker should hold this end, otherwise its death goes unnoticed
+        child_conn.close()
+        self._conn = parent_conn
+        _LOGGER.info("Sampler worker started with pid %s", self._process.pid)
+        if self._watched_processes:
+            # A restarted worker has to be told again
+            self._send_watched_processes()
+
+    def _send_watched_processes(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.send(("watch_processes", self._watched_processes))
+        except OSError as err:
+            # Worker died, it gets the list again when restarted
+            _LOGGER.debug("Could not send watched processes: %s", err)
+
+    async def _restart_worker(self) -> None:
+        assert self._process is not None and self._conn is not None
+        await asyncio.to_thread(self._process.join, RESTART_DELAY)
+        _LOGGER.error(
+            "Sampler worker died with exitcode %s, restarting in %s seconds",
+            self._process.exitcode,
+            RESTART_DELAY,
+        )
+        if self._process.is_alive():
+            self._process.kill()
+        self._conn.close()
+        await asyncio.sleep(RESTART_DELAY)
+        self.restarts += 1
+        self._start_worker()
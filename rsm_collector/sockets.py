@@ -0,0 +1,110 @@
+"""Counts of sockets per protocol and connection state."""
+
+from __future__ import annotations
+
+from collections import Counter
+import logging
+import os
+import re
+import socket
+import sys
+
+_LOGGER = logging.getLogger(__name__)
+
+PROCFS_PATH = "/proc"
+
+# Files per protocol, IPv4 and IPv6 sockets are counted together
+SOCKET_FILES = {"tcp": ("tcp", "tcp6"), "udp": ("udp", "udp6")}
+
+# Kernel socket states, named like psutil does
+SOCKET_STATES = {
+    b"01": "ESTABLISHED",
+    b"02": "SYN_SENT",
+    b"03": "SYN_RECV",
+    b"04": "FIN_WAIT1",
+    b"05": "FIN_WAIT2",
+    b"06": "TIME_WAIT",
+    b"07": "CLOSE",
+    b"08": "CLOSE_WAIT",
+    b"09": "LAST_ACK",
+    b"0A": "LISTEN",
+    b"0B": "CLOSING",
+    b"0C": "NEW_SYN_RECV",
+}
+
+READ_SIZE = 256 * 1024
+
+# "  sl  local_address rem_address   st ...", only the state is captured.
+# The sl column gets wider with many sockets, so no fixed offsets.
+_STATE_PATTERN = re.compile(
+    rb"^ *\d+: [0-9A-F]+:[0-9A-F]{4} [0-9A-F]+:[0-9A-F]{4} ([0-9A-F]{2}) ", re.M
+)
+
+
+def _count_file_states(path: str, counts: Counter) -> None:
+    with open(path, "rb", buffering=0) as file:
+        remainder = b""
+        while chunk := file.read(READ_SIZE):
+            chunk = remainder + chunk
+            # Lines can be cut in two by the read, keep the last part for the next one
+            end = chunk.rfind(b"\n") + 1
+            remainder = chunk[end:]
+            counts.update(_STATE_PATTERN.findall(chunk, 0, end))
+        counts.update(_STATE_PATTERN.findall(remainder))
+
+
+def count_socket_states(procfs_path: str = PROCFS_PATH) -> dict[str, dict[str, int]]:
+    """Return number of sockets per protocol and state from /proc/net.
+
+    The files are read in large chunks and only the state column is picked
+    out, no object is created per socket.
+    """
+    result = {}
+    for protocol, filenames in SOCKET_FILES.items():
+        counts: Counter = Counter()
+        for filename in filenames:
+            try:
+                _count_file_states(os.path.join(procfs_path, "net", filename), counts)
+            except FileNotFoundError:
+                # No IPv6 support
+                continue
+        result[protocol] = {
+            SOCKET_STATES.get(state, state.decode()): count
+            for state, count in counts.items()
+        }
+    return result
+
+
+def count_socket_states_psutil(psutil) -> dict[str, dict[str, int]]:
+    """Return number of sockets per protocol and state with psutil.
+
+    For platforms without /proc/net, much more expensive.
+    """
+    result: dict[str, dict[str, int]] = {protocol: {} for protocol in SOCKET_FILES}
+    for connection in psutil.net_connections("inet"):
+        protocol = "tcp" if connection.type == socket.SOCK_STREAM else "udp"
+        states = result[protocol]
+        states[connection.status] = states.get(connection.status, 0) + 1
+    return result
+
+
+class SocketCounter:
+    """Counts sockets, the fast way when /proc/net is available."""
+
+    def __init__(self, psutil, procfs_path: str = PROCFS_PATH) -> None:
+        self._psutil = psutil
+        self._procfs_path = procfs_path
+        self._use_procfs = sys.platform == "linux" and os.path.isfile(
+            os.path.join(procfs_path, "net", "tcp")
+        )
+
+    def read(self) -> dict[str, dict[str, int]]:
+        """Return number of sockets per protocol and state."""
+        if self._use_procfs:
+            return count_socket_states(self._procfs_path)
+        try:
+            return count_socket_states_psutil(self._psutil)
+        except self._psutil.AccessDenied:
+            # macOS needs root for all sockets
+            _LOGGER.debug("Not allowed to list sockets")
+            return {}
@@ -0,0 +1,160 @@
+"""Metric sources sampled by the coordinator, built in and from plugins."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from enum import StrEnum
+from importlib.metadata import EntryPoint, entry_points
+import inspect
+import logging
+from typing import Any, ClassVar
+
+from .const import EXECUTOR_POOLS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Entry point group plugins register their MetricSource subclasses in
+ENTRY_POINT_GROUP = "rsm_collector.sources"
+
+
+class Cost(StrEnum):
+    """How long sampling a source can take."""
+
+    # Reads a few kernel counters
+    CHEAP = "cheap"
+    # Can take long, e.g. walks all processes
+    SLOW = "slow"
+    # Can hang, e.g. on network mounts or devices that do not answer
+    BLOCKING = "blocking"
+
+
+# Executor pool per cost, see const.EXECUTOR_POOLS
+COST_POOLS = {Cost.CHEAP: "fast", Cost.SLOW: "slow", Cost.BLOCKING: "blocking"}
+
+
+class MetricSource(ABC):
+    """Source of a metric that is sampled and sent with every update.
+
+    Subclasses set the class attributes and implement `sample`. The serialized
+    sample is sent under `name` in the update data, and clients subscribe on
+    it with `(name, "")` like on the built in probes.
+
+    Plugins register their subclass as entry point in the
+    "rsm_collector.sources" group, e.g. in pyproject.toml:
+
+        [project.entry-points."rsm_collector.sources"]
+        ups = "rsm_ups:UpsSource"
+    """
+
+    # Probe name, key in the update data
+    name: ClassVar[str]
+    cost: ClassVar[Cost] = Cost.CHEAP
+    # Seconds between samples, None to sample on every update. In between the
+    # previous sample is sent.
+    interval: ClassVar[float | None] = None
+    # Executor pool to sample in, one of const.EXECUTOR_POOLS. None for the pool
+    # of the cost
+    pool: ClassVar[str | None] = None
+    # JSON schema of the serialized sample, handed out to clients
+    schema: ClassVar[dict[str, Any] | None] = None
+
+    def __init__(self, psutil) -> None:
+        self.psutil = psutil
+
+    @property
+    def pool_name(self) -> str:
+        """Executor pool the source is sampled in."""
+        return self.pool or COST_POOLS[self.cost]
+
+    @abstractmethod
+    def sample(self) -> Any:
+        """Return a new sample.
+
+        Blocking, runs in an executor of the pool.
+        """
+
+    def serialize(self, sample: Any) -> Any:
+        """Return the sample as JSON compatible value, in the schema."""
+        return sample
+
+    @classmethod
+    def describe(cls) -> dict[str, Any]:
+        """Return the description handed out to clients."""
+        return {"cost": cls.cost, "interval": cls.interval, "schema": cls.schema}
+
+
+class ProbeSource(MetricSource):
+    """Built in probe, a sample function of the coordinator.
+
+    Built in samples are serialized by `SensorData.as_dict`.
+    """
+
+    def __init__(
+        self, name: str, sample: Callable[[], Any], cost: Cost = Cost.CHEAP
+    ) -> None:
+        super().__init__(None)
+        self.name = name  # type: ignore[misc]
+        self.cost = cost  # type: ignore[misc]
+        self._sample = sample
+
+    def sample(self) -> Any:
+        return self._sample()
+
+
+def _load_source_class(entry_point: EntryPoint) -> type[MetricSource]:
+    source_class = entry_point.load()
+    if not (isinstance(source_class, type) and issubclass(source_class, MetricSource)):
+        raise TypeError(f"{entry_point.value} is not a MetricSource")
+    if not isinstance(getattr(source_class, "name", None), str):
+        raise TypeError(f"{entry_point.value} has no name")
+    if inspect.isabstract(source_class):
+        raise TypeError(f"{entry_point.value} does not implement sample")
+    # Checked here, an unknown pool would fail every update
+    pool = source_class.pool or COST_POOLS.get(source_class.cost)
+    if pool not in EXECUTOR_POOLS:
+        raise ValueError(f"{entry_point.value} uses unknown executor pool {pool}")
+    return source_class
+
+
+def load_sources(psutil, reserved: Iterable[str]) -> list[MetricSource]:
+    """Return the sources of the installed plugins.
+
+    Plugins that fail to load or use a reserved or already used name are
+    logged and skipped, they should not stop the collector.
+    """
+    names = set(reserved)
+    sources = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            source_class = _load_source_class(entry_point)
+            if source_class.name in names:
+                raise ValueError(f"Name {source_class.name} is already used")
+            source = source_class(psutil)
+        except Exception:
+            _LOGGER.exception("Loading metric source %s failed", entry_point.value)
+            continue
+        names.add(source.name)
+        sources.append(source)
+        _LOGGER.info("Loaded metric source %s from %s", source.name, entry_point.value)
+    return sources
+
+
+def describe_sources(reserved: Iterable[str]) -> dict[str, dict[str, Any]]:
+    """Return the descriptions of the sources of the installed plugins.
+
+    Only loads the classes, the same ones `load_sources` would use.
+    """
+    names = set(reserved)
+    descriptions = {}
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            source_class = _load_source_class(entry_point)
+        except Exception as err:  # noqa: BLE001
+            # The sampling worker logs the details
+            _LOGGER.debug("Metric source %s not loaded: %s", entry_point.value, err)
+            continue
+        if source_class.name not in names:
+            names.add(source_class.name)
+            descriptions[source_class.name] = source_class.describe()
+    return descriptions
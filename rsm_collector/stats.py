@@ -0,0 +1,99 @@
+"""Statistics of the collector itself, to see what it costs and if it keeps up."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between loop lag measurements
+LOOP_LAG_INTERVAL = 0.5
+# Number of measurements the maximum lag is taken over, one minute
+LOOP_LAG_WINDOW = 120
+
+
+class LoopLagMonitor:
+    """Measures how much later than asked the event loop wakes up a task.
+
+    A busy loop, e.g. blocked by a slow handler, delays all connections by
+    that much.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL) -> None:
+        self._interval = interval
+        self._lags: deque[float] = deque(maxlen=LOOP_LAG_WINDOW)
+        self._task: asyncio.Task | None = None
+
+    @property
+    def lag(self) -> float:
+        """Seconds of the last measurement."""
+        return self._lags[-1] if self._lags else 0.0
+
+    @property
+    def max_lag(self) -> float:
+        """Seconds of the largest measurement in the last minute."""
+        return max(self._lags, default=0.0)
+
+    def start(self) -> None:
+        """Start measuring."""
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            self._lags.append(max(0.0, loop.time() - start - self._interval))
+
+
+class ProcessStats:
+    """Reads memory and CPU usage of a process."""
+
+    def __init__(self, psutil, pid: int | None = None) -> None:
+        self._psutil = psutil
+        self._process = psutil.Process(pid)
+
+    @property
+    def pid(self) -> int:
+        """Pid of the process."""
+        return self._process.pid
+
+    def read(self) -> dict[str, float] | None:
+        """Return pid, RSS and CPU usage since the previous read.
+
+        None when the process is gone.
+        """
+        try:
+            with self._process.oneshot():
+                return {
+                    "pid": self._process.pid,
+                    "rss": self._process.memory_info().rss,
+                    # Of a single CPU, like `top`
+                    "cpu_percent": self._process.cpu_percent(),
+                }
+        except self._psutil.Error as err:
+            _LOGGER.debug("Can not read stats of process %s: %s", self.pid, err)
+            return None
+
+
+class SendCounter:
+    """Counts messages and bytes sent to the clients."""
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.bytes = 0
+
+    def count(self, message: str | bytes, connections: int = 1) -> None:
+        """Count a message sent to a number of connections."""
+        self.messages += connections
+        # Text is sent as UTF-8, the codecs do not escape non-ASCII characters
+        size = len(message.encode()) if isinstance(message, str) else len(message)
+        self.bytes += size * connections
@@ -78,6 +78,19 @@ def get_all_running_processes(hass: HomeAssistant) -> set[str]:
     return processes
 
 
+def is_cpu_sensor(name: str, label: str, number: int) -> bool:
+    """Return True if the temperature sensor is the CPU / processor sensor.
+
+    Number is the 1 based position of the sensor in the list for that name.
+    """
+    # In case the label is empty (e.g. on Raspberry PI 4),
+    # construct it ourself here based on the sensor key name.
+    _label = f"{name} {number}" if not label else label
+    # check both name and label because some systems embed cpu# in the
+    # name, which makes label not match because label adds cpu# at end.
+    return _label in CPU_SENSOR_PREFIXES or name in CPU_SENSOR_PREFIXES
+
+
 def read_cpu_temperature(temps: dict[str, list[shwtemp]]) -> float | None:
     """Attempt to read CPU / processor temperature."""
     entry: shwtemp
@@ -85,12 +98,7 @@ def read_cpu_temperature(temps: dict[str, list[shwtemp]]) -> float | None:
     _LOGGER.debug("CPU Temperatures: %s", temps)
     for name, entries in temps.items():
         for i, entry in enumerate(entries, start=1):
-            # In case the label is empty (e.g. on Raspberry PI 4),
-            # construct it ourself here based on the sensor key name.
-            _label = f"{name} {i}" if not entry.label else entry.label
-            # check both name and label because some systems embed cpu# in the
-            # name, which makes label not match because label adds cpu# at end.
-            if _label in CPU_SENSOR_PREFIXES or name in CPU_SENSOR_PREFIXES:
+            if is_cpu_sensor(name, entry.label, i):
                 return round(entry.current, 1)
 
     return None
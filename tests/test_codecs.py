@@ -0,0 +1,93 @@
+from typing import NamedTuple
+
+import pytest
+
+from myjsonrpc.codecs import CODECS, MsgspecCodec, available_codecs, get_codec
+
+
+class Stall(NamedTuple):
+    avg10: float
+    total: int
+
+
+@pytest.fixture(params=CODECS, ids=lambda codec_class: codec_class.name)
+def codec(request):
+    try:
+        return request.param()
+    except ImportError:
+        pytest.skip(f"{request.param.name} is not installed")
+
+
+def test_response_round_trip(codec):
+    response = {
+        "jsonrpc": "2.0",
+        "result": {
+            "hostname": "pi-ünïcode ☃",
+            "uptime": 12345.5,
+            "disks": [{"mountpoint": "/", "used": 1 << 40, "percent": 12.3}],
+            "temperature": None,
+            "online": True,
+        },
+        "id": 1,
+    }
+    encoded = codec.encode(response)
+    assert isinstance(encoded, bytes)
+    assert codec.decode(encoded) == response
+    assert codec.decode(encoded.decode()) == response
+
+
+def test_encode_compact(codec):
+    assert codec.encode({"a": [1, 2]}) == b'{"a":[1,2]}'
+
+
+def test_encode_tuples(codec):
+    assert codec.decode(codec.encode({"stall": Stall(1.5, 10), "pair": (1, 2)})) == {
+        "stall": [1.5, 10],
+        "pair": [1, 2],
+    }
+
+
+def test_encode_non_str_keys(codec):
+    assert codec.decode(codec.encode({1: "a", 2: {3: "b"}})) == {
+        "1": "a",
+        "2": {"3": "b"},
+    }
+
+
+def test_encode_unsupported_type(codec):
+    with pytest.raises(TypeError):
+        codec.encode({"value": object()})
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"{", b'{"a":}', b"[1,2", b"nope", b'{"a":1}x', "\xff", b"\xff"],
+)
+def test_decode_invalid(codec, data):
+    with pytest.raises(ValueError):
+        codec.decode(data)
+
+
+def test_msgspec_decode_error():
+    msgspec = pytest.importorskip("msgspec")
+    with pytest.raises(ValueError) as err:
+        MsgspecCodec().decode(b"{")
+    assert type(err.value) is ValueError
+    assert isinstance(err.value.__cause__, msgspec.DecodeError)
+
+
+def test_available_codecs():
+    codecs = available_codecs()
+    assert codecs[-1].name == "json"
+    # In order of preference
+    names = [codec_class.name for codec_class in CODECS]
+    assert [codec.name for codec in codecs] == sorted(
+        (codec.name for codec in codecs), key=names.index
+    )
+
+
+def test_get_codec():
+    assert get_codec().name == available_codecs()[0].name
+    assert get_codec("json").name == "json"
+    with pytest.raises(ValueError, match="not available"):
+        get_codec("yaml")
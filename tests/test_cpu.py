@@ -0,0 +1,126 @@
+from collections import namedtuple
+
+import pytest
+
+from rsm_collector import cpu
+from rsm_collector.cpu import CpuUsage, CpuUsageReader
+
+# Like psutil on Linux
+scputimes = namedtuple(
+    "scputimes",
+    "user nice system idle iowait irq softirq steal guest guest_nice",
+)
+# Like psutil on macOS, without iowait and steal
+scputimes_macos = namedtuple("scputimes", "user nice system idle")
+
+
+def times(user=0.0, system=0.0, idle=0.0, iowait=0.0, steal=0.0, guest=0.0):
+    # Guest time is counted in user time as well
+    return scputimes(
+        user + guest, 0.0, system, idle, iowait, 0.0, 0.0, steal, guest, 0.0
+    )
+
+
+class FakePsutil:
+    """Returns the scripted CPU times, the last ones again when they run out."""
+
+    def __init__(self, *cpu_times):
+        self.cpu_times_list = list(cpu_times)
+
+    def cpu_times(self, percpu):
+        assert percpu
+        if len(self.cpu_times_list) > 1:
+            return self.cpu_times_list.pop(0)
+        return self.cpu_times_list[0]
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(cpu.time, "sleep", lambda seconds: None)
+
+
+def test_first_read():
+    reader = CpuUsageReader(
+        FakePsutil(
+            [times(idle=10), times(idle=10)],
+            [times(user=5, idle=15), times(system=1, idle=19, iowait=10)],
+        )
+    )
+    assert reader.read() == CpuUsage(
+        total=20.0, per_core=[50.0, 5.0], times_percent=[16.7, 3.3, 33.3, 0.0]
+    )
+
+
+def test_usage_since_previous_read():
+    reader = CpuUsageReader(
+        FakePsutil(
+            [times(idle=10)],
+            [times(user=5, idle=15)],
+            [times(user=5, idle=20, steal=5)],
+        )
+    )
+    assert reader.read().total == 50.0
+    assert reader.read() == CpuUsage(
+        total=50.0, per_core=[50.0], times_percent=[0.0, 0.0, 0.0, 50.0]
+    )
+
+
+def test_guest_time_not_counted_twice():
+    reader = CpuUsageReader(
+        FakePsutil([times(idle=10)], [times(user=2, idle=15, guest=3)])
+    )
+    assert reader.read() == CpuUsage(
+        total=50.0, per_core=[50.0], times_percent=[50.0, 0.0, 0.0, 0.0]
+    )
+
+
+def test_keeps_last_usage_when_read_too_quickly():
+    psutil = FakePsutil(
+        [times(idle=10)],
+        [times(user=5, idle=15)],
+        # No clock tick since the previous read
+        [times(user=5, idle=15)],
+        [times(user=5, idle=15)],
+        [times(user=6, idle=24)],
+    )
+    reader = CpuUsageReader(psutil)
+    usage = reader.read()
+    assert usage.total == 50.0
+    assert reader.read() is usage
+    assert reader.read() is usage
+    # Measured from the last read with a change
+    assert reader.read().total == 10.0
+
+
+def test_no_usage_before_any_time_passed():
+    reader = CpuUsageReader(FakePsutil([times(idle=10)]))
+    assert reader.read() is None
+
+
+def test_cpu_went_offline():
+    reader = CpuUsageReader(
+        FakePsutil(
+            [times(idle=10), times(idle=10)],
+            [times(user=5, idle=15), times(user=5, idle=15)],
+            [times(user=10, idle=20)],
+            [times(user=10, idle=30)],
+        )
+    )
+    assert reader.read().per_core == [50.0, 50.0]
+    assert reader.read() is None
+    # Measured from the times with the new number of CPUs
+    assert reader.read() == CpuUsage(
+        total=0.0, per_core=[0.0], times_percent=[0.0, 0.0, 0.0, 0.0]
+    )
+
+
+def test_times_not_on_platform():
+    reader = CpuUsageReader(
+        FakePsutil(
+            [scputimes_macos(0.0, 0.0, 0.0, 10.0)],
+            [scputimes_macos(3.0, 0.0, 2.0, 15.0)],
+        )
+    )
+    assert reader.read() == CpuUsage(
+        total=50.0, per_core=[50.0], times_percent=[30.0, 20.0, None, None]
+    )
@@ -0,0 +1,97 @@
+from collections import namedtuple
+
+from psutil._common import sdiskio, sdiskpart
+import pytest
+
+from rsm_collector import diskio
+from rsm_collector.diskio import DiskIo, DiskIoRates, _rates
+
+# Like psutil on Linux, with the busy time in milliseconds
+sdiskio_linux = namedtuple("sdiskio_linux", sdiskio._fields + ("busy_time",))
+
+
+def counters(read_count, write_count, read_bytes, write_bytes, busy_time=0):
+    return sdiskio_linux(read_count, write_count, read_bytes, write_bytes, 0, 0, busy_time)
+
+
+def test_rates():
+    assert _rates(
+        counters(10, 20, 1000, 2000, busy_time=100),
+        counters(30, 60, 5000, 10000, busy_time=600),
+        2,
+    ) == DiskIo(2000, 4000, 10, 20, 25.0)
+
+
+def test_rates_without_busy_time():
+    assert _rates(sdiskio(1, 1, 1, 1, 0, 0), sdiskio(3, 3, 3, 3, 0, 0), 1) == DiskIo(
+        2, 2, 2, 2, None
+    )
+
+
+def test_rates_after_reset():
+    # Device removed and added again
+    assert _rates(counters(10, 20, 1000, 2000), counters(1, 2, 100, 200), 1) is None
+
+
+class FakePsutil:
+    def __init__(self):
+        self.counters = {"sda": counters(0, 0, 0, 0)}
+
+    def disk_partitions(self, all):
+        return [sdiskpart("/dev/sda", "/", "ext4", "rw")]
+
+    def disk_io_counters(self, perdisk):
+        return self.counters
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(diskio.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(diskio.time, "sleep", sleep)
+    monkeypatch.setattr(diskio.os.path, "realpath", lambda path: path)
+    return now
+
+
+def test_first_read_measures_over_an_interval(clock, monkeypatch):
+    psutil = FakePsutil()
+    rates = DiskIoRates(psutil, ["/"])
+
+    def sleep(seconds):
+        clock[0] += seconds
+        psutil.counters = {"sda": counters(1, 2, 100, 200)}
+
+    monkeypatch.setattr(diskio.time, "sleep", sleep)
+    interval = diskio.FIRST_READ_INTERVAL
+    assert rates.read()["sda"] == pytest.approx(
+        DiskIo(100 / interval, 200 / interval, 1 / interval, 2 / interval, 0)
+    )
+
+
+def test_read_without_elapsed_time(clock):
+    psutil = FakePsutil()
+    rates = DiskIoRates(psutil, ["/"])
+    assert rates.read()["sda"] == DiskIo(0, 0, 0, 0, 0)
+
+    # No time passed, no rates instead of a division by zero
+    psutil.counters = {"sda": counters(1, 1, 1, 1)}
+    assert rates.read() == {}
+
+    clock[0] += 1
+    psutil.counters = {"sda": counters(2, 2, 2, 2)}
+    assert rates.read() == {"sda": DiskIo(1, 1, 1, 1, 0)}
+
+
+def test_read_after_reset(clock):
+    psutil = FakePsutil()
+    psutil.counters = {"sda": counters(10, 10, 10, 10)}
+    rates = DiskIoRates(psutil, ["/"])
+    rates.read()
+
+    clock[0] += 1
+    psutil.counters = {"sda": counters(1, 1, 1, 1)}
+    assert rates.read() == {}
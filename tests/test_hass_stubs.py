@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import pytest
+
+from rsm_collector.hass_stubs import ExecutorPoolFullError, HomeAssistant
+
+
+async def test_executor_pool_rejects_when_full():
+    hass = HomeAssistant()
+    pool = hass.async_create_executor_pool("slow", max_workers=1, max_queued=1)
+    release = threading.Event()
+
+    try:
+        jobs = [
+            hass.async_add_pool_executor_job("slow", release.wait) for _ in range(2)
+        ]
+        with pytest.raises(ExecutorPoolFullError):
+            hass.async_add_pool_executor_job("slow", release.wait)
+
+        stats = pool.stats()
+        assert stats["active"] == 1
+        assert stats["queued"] == 1
+        assert stats["rejected"] == 1
+        assert stats["peak_pending"] == 2
+
+        release.set()
+        await asyncio.gather(*jobs)
+        # Room again once the jobs are done
+        await hass.async_add_pool_executor_job("slow", release.wait)
+        stats = pool.stats()
+        assert stats["active"] == 0
+        assert stats["completed"] == 3
+        assert stats["rejected"] == 1
+        assert stats["peak_pending"] == 2
+    finally:
+        release.set()
+        pool.shutdown()
@@ -1,9 +1,19 @@
+import asyncio
 import json
 import logging
 from unittest.mock import Mock
 import pytest
 
-from myjsonrpc import JsonRpc
+from myjsonrpc import (
+    JsonRpc,
+    JsonRpcConnectionError,
+    JsonRpcError,
+    JsonRpcMetrics,
+    JsonRpcRawResult,
+    JsonRpcTimeoutError,
+    Publisher,
+)
+from myjsonrpc.transports.coalescing_transport import CoalescingTransport
 from myjsonrpc.transports.dummy_transport import JsonRpcDummyTransport
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,6 +52,7 @@ async def test_rpc_call_with_positional_parameters(
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": "subtract", "params": [42, 23], "id": 1}'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "result": 19, "id": 1}',
@@ -50,6 +61,7 @@ async def test_rpc_call_with_positional_parameters(
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": "subtract", "params": [23, 42], "id": 2}'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "result": -19, "id": 2}',
@@ -64,6 +76,7 @@ async def test_rpc_call_with_named_parameters(
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": "subtract", "params": {"subtrahend": 23, "minuend": 42}, "id": 3}'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "result": 19, "id": 3}',
@@ -72,12 +85,33 @@ async def test_rpc_call_with_named_parameters(
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": "subtract", "params": {"minuend": 42, "subtrahend": 23}, "id": 4}'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "result": 19, "id": 4}',
     )
 
 
+async def test_rpc_call_with_raw_result(
+    dummy_transport, jsonrpc_with_dummy_transport
+):
+    raw_result = JsonRpcRawResult.from_result({"hostname": "foo", "cores": [1, 2]})
+
+    async def get_info():
+        return raw_result
+
+    jsonrpc_with_dummy_transport.register_request_handler("get_info", get_info)
+
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "get_info", "id": "5"}'
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "result": {"hostname": "foo", "cores": [1, 2]}, "id": "5"}',
+    )
+
+
 async def test_a_notification(dummy_transport, jsonrpc_with_dummy_transport):
 
     update_params = None
@@ -97,10 +131,12 @@ async def test_a_notification(dummy_transport, jsonrpc_with_dummy_transport):
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": "update", "params": [1,2,3,4,5]}'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert dummy_transport.last_sent_message() is None
     assert update_params == "1,2,3,4,5"
 
     await dummy_transport.call_receive('{"jsonrpc": "2.0", "method": "foobar"}')
+    await jsonrpc_with_dummy_transport.drain()
     assert dummy_transport.last_sent_message() is None
     assert foobar_called
 
@@ -111,6 +147,7 @@ async def test_rpc_call_of_non_existent_method(
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": "foobar", "id": "1"}'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "error": {"code": -32601, "message": "Method not found"}, "id": "1"}',
@@ -122,6 +159,7 @@ async def test_rpc_call_with_invalid_json(
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": "foobar, "params": "bar", "baz]'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": null}',
@@ -133,6 +171,7 @@ async def test_rpc_call_with_invalid_request_object(
     await dummy_transport.call_receive(
         '{"jsonrpc": "2.0", "method": 1, "params": "bar"}'
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}, "id": null}',
@@ -148,36 +187,37 @@ async def test_rpc_call_batch_invalid_json(
   ]
   '''
     )
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": null}',
     )
 
-@pytest.mark.skip(reason="Batch not implemented yet")
 async def test_rpc_call_with_empty_array(
     dummy_transport, jsonrpc_with_dummy_transport
 ):
     await dummy_transport.call_receive('[]')
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '{"jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}, "id": null}',
     )
 
-@pytest.mark.skip(reason="Batch not implemented yet")
 async def test_rpc_call_with_invalid_batch_but_not_empty(
     dummy_transport, jsonrpc_with_dummy_transport
 ):
     await dummy_transport.call_receive('[1]')
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '[{"jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}, "id": null}]',
     )
 
-@pytest.mark.skip(reason="Batch not implemented yet")
 async def test_rpc_call_with_invalid_batch(
     dummy_transport, jsonrpc_with_dummy_transport
 ):
     await dummy_transport.call_receive('[1,2,3]')
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '''[
@@ -187,10 +227,25 @@ async def test_rpc_call_with_invalid_batch(
 ]'''
     )
 
-@pytest.mark.skip(reason="Batch not implemented yet")
 async def test_rpc_call_batch(
     dummy_transport, jsonrpc_with_dummy_transport
 ):
+    async def sum_(*numbers):
+        return sum(numbers)
+
+    async def notify_hello(number):
+        pass
+
+    async def get_data():
+        return ["hello", 5]
+
+    jsonrpc_with_dummy_transport.register_request_handler("sum", sum_)
+    jsonrpc_with_dummy_transport.register_notification_handler(
+        "notify_hello", notify_hello
+    )
+    jsonrpc_with_dummy_transport.register_request_handler("subtract", subtract)
+    jsonrpc_with_dummy_transport.register_request_handler("get_data", get_data)
+
     await dummy_transport.call_receive('''[
         {"jsonrpc": "2.0", "method": "sum", "params": [1,2,4], "id": "1"},
         {"jsonrpc": "2.0", "method": "notify_hello", "params": [7]},
@@ -199,6 +254,7 @@ async def test_rpc_call_batch(
         {"jsonrpc": "2.0", "method": "foo.get", "params": {"name": "myself"}, "id": "5"},
         {"jsonrpc": "2.0", "method": "get_data", "id": "9"} 
     ]''')
+    await jsonrpc_with_dummy_transport.drain()
     assert_json_strings(
         dummy_transport.last_sent_message(),
         '''[
@@ -210,7 +266,6 @@ async def test_rpc_call_batch(
     ]'''
     )
 
-@pytest.mark.skip(reason="Batch not implemented yet")
 async def test_rpc_call_batch_all_notifications(
     dummy_transport, jsonrpc_with_dummy_transport
 ):
@@ -218,4 +273,581 @@ async def test_rpc_call_batch_all_notifications(
         {"jsonrpc": "2.0", "method": "notify_sum", "params": [1,2,4]},
         {"jsonrpc": "2.0", "method": "notify_hello", "params": [7]}
     ]''')
-    assert jsonrpc_with_dummy_transport.last_sent_message() is None
+    await jsonrpc_with_dummy_transport.drain()
+    assert dummy_transport.last_sent_message() is None
+
+
+async def test_call_batch(dummy_transport, jsonrpc_with_dummy_transport):
+    call = asyncio.create_task(
+        jsonrpc_with_dummy_transport.call_batch(
+            [("subtract", [42, 23]), ("get_data", None)]
+        )
+    )
+    await asyncio.sleep(0)
+
+    requests = json.loads(dummy_transport.last_sent_message())
+    assert [request["method"] for request in requests] == ["subtract", "get_data"]
+    assert requests[0]["params"] == [42, 23]
+    assert "params" not in requests[1]
+
+    # Responses can come in any order
+    await dummy_transport.call_receive(
+        json.dumps(
+            [
+                {"jsonrpc": "2.0", "result": ["hello", 5], "id": requests[1]["id"]},
+                {"jsonrpc": "2.0", "result": 19, "id": requests[0]["id"]},
+            ]
+        )
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    responses = await call
+    assert [response.result for response in responses] == [19, ["hello", 5]]
+    assert jsonrpc_with_dummy_transport._pending_method_calls == {}
+
+
+async def test_slow_request_does_not_block_later_messages(
+    dummy_transport, jsonrpc_with_dummy_transport
+):
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "slow"
+
+    jsonrpc_with_dummy_transport.register_request_handler("slow", slow)
+    jsonrpc_with_dummy_transport.register_request_handler("subtract", subtract)
+
+    await dummy_transport.call_receive('{"jsonrpc": "2.0", "method": "slow", "id": 1}')
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "subtract", "params": [42, 23], "id": 2}'
+    )
+    await asyncio.sleep(0)
+
+    # Responses are sent in order of completion
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "result": 19, "id": 2}',
+    )
+
+    release.set()
+    await jsonrpc_with_dummy_transport.drain()
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "result": "slow", "id": 1}',
+    )
+
+
+async def test_request_handler_exception_and_close(
+    dummy_transport, jsonrpc_with_dummy_transport
+):
+    async def broken():
+        raise ValueError("broken")
+
+    async def hanging():
+        await asyncio.Event().wait()
+
+    jsonrpc_with_dummy_transport.register_request_handler("broken", broken)
+    jsonrpc_with_dummy_transport.register_request_handler("hanging", hanging)
+
+    await dummy_transport.call_receive('{"jsonrpc": "2.0", "method": "broken", "id": 1}')
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "hanging", "id": 2}'
+    )
+    await asyncio.sleep(0)
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "error": {"code": -32603, "message": "Internal JSON-RPC error"}, "id": 1}',
+    )
+
+    # Cancelled handlers do not respond
+    await jsonrpc_with_dummy_transport.close()
+    assert len(dummy_transport.sent_messages) == 1
+
+
+async def test_serial_and_concurrent_notifications(
+    dummy_transport, jsonrpc_with_dummy_transport
+):
+    calls = []
+
+    async def handler(name, delay):
+        calls.append(f"start {name}")
+        await asyncio.sleep(delay)
+        calls.append(f"end {name}")
+
+    jsonrpc_with_dummy_transport.register_notification_handler("serial", handler)
+    jsonrpc_with_dummy_transport.register_notification_handler(
+        "concurrent", handler, concurrent=True
+    )
+
+    for method in ("serial", "concurrent"):
+        await dummy_transport.call_receive(
+            f'{{"jsonrpc": "2.0", "method": "{method}", "params": ["{method}1", 0.02]}}'
+        )
+        await dummy_transport.call_receive(
+            f'{{"jsonrpc": "2.0", "method": "{method}", "params": ["{method}2", 0]}}'
+        )
+        await jsonrpc_with_dummy_transport.drain()
+
+    assert calls == [
+        "start serial1",
+        "end serial1",
+        "start serial2",
+        "end serial2",
+        "start concurrent1",
+        "start concurrent2",
+        "end concurrent2",
+        "end concurrent1",
+    ]
+
+
+async def test_handlers_calling_back_over_a_saturated_connection():
+    client_transport = LoopbackTransport()
+    server_transport = LoopbackTransport()
+    client_transport.peer = server_transport
+    server_transport.peer = client_transport
+    client = JsonRpc(client_transport)
+    server = JsonRpc(server_transport, max_concurrent_handlers=2)
+
+    async def ping():
+        return "pong"
+
+    async def work():
+        # Needs the receiver of the server to read the response
+        return (await server.call_method("ping", timeout=1)).result
+
+    client.register_request_handler("ping", ping)
+    server.register_request_handler("work", work)
+
+    responses = await asyncio.gather(
+        *(client.call_method("work", timeout=2) for _ in range(5))
+    )
+    assert [response.result for response in responses] == ["pong"] * 5
+    assert not server._queued_messages
+
+
+async def test_rejected_when_too_many_messages_queued(dummy_transport):
+    jsonrpc = JsonRpc(dummy_transport, max_concurrent_handlers=1, max_queued_messages=1)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "slow"
+
+    jsonrpc.register_request_handler("slow", slow)
+
+    for id in (1, 2, 3):
+        await dummy_transport.call_receive(
+            f'{{"jsonrpc": "2.0", "method": "slow", "id": {id}}}'
+        )
+    # The receiver does not wait, the third one gets an error right away
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "error": {"code": -32000, "message": "Server busy"}, "id": 3}',
+    )
+
+    release.set()
+    await jsonrpc.drain()
+    assert sorted(
+        json.loads(message)["id"] for message in dummy_transport.sent_messages
+    ) == [1, 2, 3]
+
+
+async def test_call_method_timeout(dummy_transport):
+    jsonrpc = JsonRpc(dummy_transport, default_timeout=0.01)
+
+    with pytest.raises(JsonRpcTimeoutError):
+        await jsonrpc.call_method("subtract", [42, 23])
+    with pytest.raises(TimeoutError):
+        await jsonrpc.call_batch([("subtract", [42, 23])], timeout=0.01)
+    assert jsonrpc._pending_method_calls == {}
+
+
+async def test_call_method_cancelled(dummy_transport, jsonrpc_with_dummy_transport):
+    call = asyncio.create_task(jsonrpc_with_dummy_transport.call_method("subtract"))
+    await asyncio.sleep(0)
+    assert len(jsonrpc_with_dummy_transport._pending_method_calls) == 1
+
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    assert jsonrpc_with_dummy_transport._pending_method_calls == {}
+
+
+async def test_pending_calls_fail_on_close(
+    dummy_transport, jsonrpc_with_dummy_transport
+):
+    calls = [
+        asyncio.create_task(jsonrpc_with_dummy_transport.call_method("subtract")),
+        asyncio.create_task(
+            jsonrpc_with_dummy_transport.call_batch([("subtract", None)])
+        ),
+    ]
+    await asyncio.sleep(0)
+
+    dummy_transport.call_close()
+
+    for call in calls:
+        with pytest.raises(JsonRpcConnectionError):
+            await call
+    assert jsonrpc_with_dummy_transport._pending_method_calls == {}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        "[42]",
+        "[42, 23, 1]",
+        '{"minuend": 42}',
+        '{"minuend": 42, "subtrahend": 23, "foo": 1}',
+        '"bar"',
+    ],
+)
+async def test_rpc_call_with_invalid_params(
+    dummy_transport, jsonrpc_with_dummy_transport, params
+):
+    called = False
+
+    async def checked_subtract(minuend, subtrahend):
+        nonlocal called
+        called = True
+        return minuend - subtrahend
+
+    jsonrpc_with_dummy_transport.register_request_handler("subtract", checked_subtract)
+
+    await dummy_transport.call_receive(
+        f'{{"jsonrpc": "2.0", "method": "subtract", "params": {params}, "id": 1}}'
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    response = json.loads(dummy_transport.last_sent_message())
+    assert response["error"]["code"] == -32602
+    assert not called
+
+
+async def test_rpc_call_with_optional_and_variable_params(
+    dummy_transport, jsonrpc_with_dummy_transport
+):
+    async def join(first, *others, separator=","):
+        return separator.join([first, *others])
+
+    jsonrpc_with_dummy_transport.register_request_handler("join", join)
+
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "join", "params": ["a", "b", "c"], "id": 1}'
+    )
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "join", "params": {"first": "a", "separator": "-"}, "id": 2}'
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    assert [json.loads(message)["result"] for message in dummy_transport.sent_messages] == [
+        "a,b,c",
+        "a",
+    ]
+
+
+async def test_publisher(dummy_transport, jsonrpc_with_dummy_transport):
+    other_transport = JsonRpcDummyTransport()
+    other_jsonrpc = JsonRpc(other_transport)
+
+    publisher = Publisher(["update", "stats"])
+    publisher.attach(jsonrpc_with_dummy_transport)
+    publisher.attach(other_jsonrpc, topics=["update"])
+
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "rpc.subscribe", "params": {"topic": "stats"}, "id": 1}'
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "result": {"topics": ["stats"]}, "id": 1}',
+    )
+
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "rpc.subscribe", "params": {"topic": "foo"}, "id": 2}'
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    assert json.loads(dummy_transport.last_sent_message())["error"]["code"] == -32602
+
+    assert publisher.publish("update", {"cpu": 1}) == 1
+    assert publisher.publish("stats", [1, 2]) == 1
+    await asyncio.sleep(0)
+    assert_json_strings(
+        other_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "method": "update", "params": {"cpu": 1}}',
+    )
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        '{"jsonrpc": "2.0", "method": "stats", "params": [1, 2]}',
+    )
+
+    publisher.detach(other_jsonrpc)
+    assert publisher.publish("update", {"cpu": 2}) == 0
+
+
+async def test_subscribe(dummy_transport, jsonrpc_with_dummy_transport):
+    updates = []
+
+    async def on_update(cpu):
+        updates.append(cpu)
+
+    async def respond(result):
+        request = json.loads(dummy_transport.last_sent_message())
+        await dummy_transport.call_receive(
+            json.dumps({"jsonrpc": "2.0", "result": result, "id": request["id"]})
+        )
+        return request
+
+    subscribe = asyncio.create_task(
+        jsonrpc_with_dummy_transport.subscribe("update", on_update)
+    )
+    await asyncio.sleep(0)
+    request = await respond({"topics": ["update"]})
+    assert request["method"] == "rpc.subscribe"
+    assert request["params"] == {"topic": "update"}
+    subscription = await subscribe
+
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "update", "params": {"cpu": 5}}'
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    assert updates == [5]
+
+    unsubscribe = asyncio.create_task(subscription.unsubscribe())
+    await asyncio.sleep(0)
+    request = await respond({"topics": []})
+    assert request["method"] == "rpc.unsubscribe"
+    await unsubscribe
+
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "update", "params": {"cpu": 6}}'
+    )
+    await jsonrpc_with_dummy_transport.drain()
+    assert updates == [5]
+
+
+class LoopbackTransport(JsonRpcDummyTransport):
+    """Delivers the sent messages to the transport of the other side."""
+
+    peer: JsonRpcDummyTransport
+
+    async def send(self, message: str):
+        await super().send(message)
+        await self.peer.call_receive(message)
+
+
+@pytest.fixture
+def connected_jsonrpcs():
+    client_transport = LoopbackTransport()
+    server_transport = LoopbackTransport()
+    client_transport.peer = server_transport
+    server_transport.peer = client_transport
+    return JsonRpc(client_transport), JsonRpc(server_transport), server_transport
+
+
+async def test_streaming_result(connected_jsonrpcs):
+    client, server, server_transport = connected_jsonrpcs
+
+    async def get_processes(count):
+        for pid in range(count):
+            yield {"pid": pid}
+
+    server.register_request_handler("get_processes", get_processes)
+
+    chunks = [chunk async for chunk in client.call_method_stream("get_processes", [3])]
+    assert chunks == [{"pid": 0}, {"pid": 1}, {"pid": 2}]
+    # Every chunk is a message of its own
+    assert [json.loads(message)["method"] for message in server_transport.sent_messages[:3]] == [
+        "rpc.chunk"
+    ] * 3
+    assert json.loads(server_transport.sent_messages[3])["result"] == {"chunks": 3}
+
+    response = await client.call_method("get_processes", [2])
+    assert response.result == [{"pid": 0}, {"pid": 1}]
+    assert client._pending_method_calls == {}
+    assert client._chunk_queues == {}
+    assert client._chunks == {}
+
+
+async def test_streaming_result_error(connected_jsonrpcs):
+    client, server, _ = connected_jsonrpcs
+
+    async def broken():
+        yield 1
+        raise ValueError("broken")
+
+    server.register_request_handler("broken", broken)
+
+    chunks = []
+    with pytest.raises(JsonRpcError):
+        async for chunk in client.call_method_stream("broken"):
+            chunks.append(chunk)
+    assert chunks == [1]
+
+
+async def test_streaming_result_empty(connected_jsonrpcs):
+    client, server, _ = connected_jsonrpcs
+
+    async def get_processes():
+        return
+        yield
+
+    server.register_request_handler("get_processes", get_processes)
+
+    assert [chunk async for chunk in client.call_method_stream("get_processes")] == []
+    assert (await client.call_method("get_processes")).result == []
+    assert client._chunks == {}
+
+
+async def test_streaming_call_of_plain_handler(connected_jsonrpcs):
+    client, server, _ = connected_jsonrpcs
+
+    async def get_processes():
+        return [1, 2]
+
+    server.register_request_handler("get_processes", get_processes)
+
+    with pytest.raises(JsonRpcError, match="not a streaming method"):
+        async for _ in client.call_method_stream("get_processes"):
+            pass
+    assert (await client.call_method("get_processes")).result == [1, 2]
+
+
+async def test_binary_frames(dummy_transport):
+    jsonrpc = JsonRpc(dummy_transport, binary_frames=True)
+    jsonrpc.register_request_handler("subtract", subtract)
+
+    await dummy_transport.call_receive(
+        b'{"jsonrpc": "2.0", "method": "subtract", "params": [42, 23], "id": 1}'
+    )
+    await jsonrpc.drain()
+    response = dummy_transport.last_sent_message()
+    assert isinstance(response, bytes)
+    assert_json_strings(response, '{"jsonrpc": "2.0", "result": 19, "id": 1}')
+
+
+async def test_coalescing_transport(dummy_transport):
+    transport = CoalescingTransport(dummy_transport, window=0.01)
+    jsonrpc = JsonRpc(transport)
+    jsonrpc.register_request_handler("subtract", subtract)
+
+    await asyncio.gather(
+        jsonrpc.send_notification("update", {"cpu": 1}),
+        jsonrpc.send_notification("update", {"cpu": 2}),
+    )
+    assert_json_strings(
+        dummy_transport.last_sent_message(),
+        """[
+        {"jsonrpc": "2.0", "method": "update", "params": {"cpu": 1}},
+        {"jsonrpc": "2.0", "method": "update", "params": {"cpu": 2}}
+    ]""",
+    )
+
+    # Batch responses are merged into the combined message
+    await dummy_transport.call_receive(
+        """[
+        {"jsonrpc": "2.0", "method": "subtract", "params": [42, 23], "id": 1},
+        {"jsonrpc": "2.0", "method": "subtract", "params": [23, 42], "id": 2}
+    ]"""
+    )
+    await dummy_transport.call_receive(
+        '{"jsonrpc": "2.0", "method": "subtract", "params": [5, 3], "id": 3}'
+    )
+    await jsonrpc.drain()
+    assert len(dummy_transport.sent_messages) == 2
+    assert sorted(
+        response["result"]
+        for response in json.loads(dummy_transport.last_sent_message())
+    ) == [-19, 2, 19]
+
+
+async def test_coalescing_transport_cancelled(dummy_transport):
+    transport = CoalescingTransport(dummy_transport, window=10)
+
+    # Before and after the flush task started
+    for delay in (0, 0.01):
+        sends = [
+            asyncio.create_task(transport.send_encoded_text(b"{}")) for _ in range(2)
+        ]
+        await asyncio.sleep(delay)
+        transport._flush_task.cancel()
+
+        for send in sends:
+            with pytest.raises(ConnectionError):
+                await send
+        assert transport._flush_task is None
+    assert dummy_transport.sent_messages == []
+
+
+async def test_coalesced_responses_and_notifications(dummy_transport):
+    updates = []
+
+    async def update(cpu):
+        updates.append(cpu)
+
+    jsonrpc = JsonRpc(dummy_transport)
+    jsonrpc.register_notification_handler("update", update)
+
+    call = asyncio.create_task(jsonrpc.call_method("subtract", [42, 23]))
+    await asyncio.sleep(0)
+    request = json.loads(dummy_transport.last_sent_message())
+
+    await dummy_transport.call_receive(
+        json.dumps(
+            [
+                {"jsonrpc": "2.0", "method": "update", "params": {"cpu": 1}},
+                {"jsonrpc": "2.0", "result": 19, "id": request["id"]},
+            ]
+        )
+    )
+    await jsonrpc.drain()
+    assert (await call).result == 19
+    assert updates == [1]
+    # Nothing to respond to
+    assert len(dummy_transport.sent_messages) == 1
+
+
+async def test_metrics(connected_jsonrpcs):
+    client, server, server_transport = connected_jsonrpcs
+    client_metrics = JsonRpcMetrics()
+    server_metrics = JsonRpcMetrics()
+    client.add_observer(client_metrics)
+    server.add_observer(server_metrics)
+
+    async def update(cpu):
+        pass
+
+    server.register_request_handler("subtract", subtract)
+    server.register_notification_handler("update", update)
+
+    assert (await client.call_method("subtract", [42, 23])).result == 19
+    assert (await client.call_method("subtract", [42])).error is not None
+    await client.call_method("unknown")
+    await client.send_notification("update", {"cpu": 1})
+    await server.drain()
+
+    assert client_metrics.messages_sent == 4
+    assert client_metrics.messages_received == 3
+    assert client_metrics.bytes_sent == server_metrics.bytes_received
+    assert client_metrics.calls_in_flight == 0
+    assert client_metrics.calls["subtract"].latency.count == 2
+    assert client_metrics.calls["subtract"].errors == 1
+    assert client_metrics.calls["unknown"].errors == 1
+
+    # Unknown methods are not handled, so not timed
+    assert server_metrics.as_dict()["requests"].keys() == {"subtract"}
+    assert server_metrics.requests_in_flight == 0
+    assert server_metrics.requests["subtract"].errors == 1
+    latency = server_metrics.notifications["update"].latency.as_dict()
+    assert latency["count"] == 1
+    assert latency["buckets"]["+Inf"] == 1
+
+    # Sizes are in bytes, also of text with non-ASCII characters
+    message = '{"jsonrpc": "2.0", "method": "update", "params": ["caf\u00e9"]}'
+    bytes_received = server_metrics.bytes_received
+    await server_transport.call_receive(message)
+    await server.drain()
+    assert server_metrics.bytes_received - bytes_received == len(message.encode())
+
+    # Without observers messages are sent straight to the transport again
+    client.remove_observer(client_metrics)
+    await client.call_method("subtract", [2, 1])
+    assert client_metrics.messages_sent == 4
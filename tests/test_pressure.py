@@ -0,0 +1,83 @@
+import pytest
+
+from rsm_collector.pressure import (
+    PressureReader,
+    PressureStall,
+    PressureTrigger,
+    _parse_pressure,
+)
+
+# CPU pressure before Linux 5.13 has no "full" line
+CPU_PRESSURE = "some avg10=1.38 avg60=1.51 avg300=1.76 total=124081739\n"
+MEMORY_PRESSURE = (
+    "some avg10=0.00 avg60=0.05 avg300=0.10 total=2530123\n"
+    "full avg10=0.00 avg60=0.02 avg300=0.04 total=1203342\n"
+)
+
+
+def test_parse_pressure():
+    assert _parse_pressure(MEMORY_PRESSURE) == {
+        "some": PressureStall(0.0, 0.05, 0.1, 2530123),
+        "full": PressureStall(0.0, 0.02, 0.04, 1203342),
+    }
+
+
+def test_parse_pressure_only_some():
+    assert _parse_pressure(CPU_PRESSURE) == {
+        "some": PressureStall(1.38, 1.51, 1.76, 124081739)
+    }
+
+
+def test_reader(tmp_path):
+    (tmp_path / "cpu").write_text(CPU_PRESSURE)
+    (tmp_path / "memory").write_text(MEMORY_PRESSURE)
+    # No io file, like with a cgroup without the io controller
+    reader = PressureReader(str(tmp_path))
+    try:
+        pressure = reader.read()
+        assert pressure == reader.read()
+    finally:
+        reader.close()
+    assert pressure.keys() == {"cpu", "memory"}
+    assert pressure["cpu"].keys() == {"some"}
+    assert pressure["memory"]["full"].total == 1203342
+
+
+@pytest.mark.parametrize(
+    ("trigger", "expected"),
+    [
+        ("memory some 150ms in 2s", PressureTrigger("memory", "some", 150000, 2000000)),
+        ("cpu full 500us in 1000ms", PressureTrigger("cpu", "full", 500, 1000000)),
+        ("  io some 1s in 10s ", PressureTrigger("io", "some", 1000000, 10000000)),
+        ("io some 20 ms in 2 s", PressureTrigger("io", "some", 20000, 2000000)),
+    ],
+)
+def test_parse_trigger(trigger, expected):
+    assert PressureTrigger.parse(trigger) == expected
+
+
+@pytest.mark.parametrize(
+    "trigger",
+    [
+        "",
+        "memory",
+        "memory some 150ms",
+        "memory some 150 in 2s",
+        "memory some 150ms in 2min",
+        "memory avg 150ms in 2s",
+        "swap some 150ms in 2s",
+        "memory some -150ms in 2s",
+        "memory some 1.5s in 2s",
+        "Memory some 150ms in 2s",
+        "memory some 150ms in 2s extra",
+    ],
+)
+def test_parse_invalid_trigger(trigger):
+    with pytest.raises(ValueError, match="Invalid pressure trigger"):
+        PressureTrigger.parse(trigger)
+
+
+def test_trigger_str_is_in_microseconds():
+    assert str(PressureTrigger.parse("memory some 150ms in 2s")) == (
+        "memory some 150000us in 2000000us"
+    )
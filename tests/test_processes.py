@@ -0,0 +1,82 @@
+import pytest
+
+from rsm_collector.processes import COMM_LENGTH, RENAME_UPDATES, ProcessWatcher
+
+
+class FakeProcesses:
+    """Process table for the watcher, pid: (name, start time)."""
+
+    def __init__(self):
+        self.processes: dict[int, tuple[str, float]] = {}
+        self.name_reads = 0
+
+    def pids(self):
+        return list(self.processes)
+
+    def read_name(self, pid):
+        self.name_reads += 1
+        return self.processes[pid][0] if pid in self.processes else None
+
+    def read_start_time(self, pid):
+        return self.processes[pid][1] if pid in self.processes else None
+
+
+@pytest.fixture
+def processes():
+    return FakeProcesses()
+
+
+@pytest.fixture
+def watcher(processes, monkeypatch):
+    watcher = ProcessWatcher(processes)
+    monkeypatch.setattr(watcher, "_read_name", processes.read_name)
+    monkeypatch.setattr(watcher, "_read_start_time", processes.read_start_time)
+    watcher.set_watched(["sshd", "home-assistant-core"])
+    return watcher
+
+
+def test_new_and_gone_pids(processes, watcher):
+    assert watcher.update() == {"sshd": False, "home-assistant-core": False}
+
+    processes.processes[10] = ("sshd", 1.0)
+    processes.processes[11] = ("bash", 1.0)
+    assert watcher.update() == {"sshd": True, "home-assistant-core": False}
+    assert watcher.watched_pids == {10}
+
+    del processes.processes[10]
+    assert watcher.update() == {"sshd": False, "home-assistant-core": False}
+    assert watcher.watched_pids == frozenset()
+
+
+def test_truncated_names(processes, watcher):
+    processes.processes[10] = ("home-assistant-core"[:COMM_LENGTH], 1.0)
+    assert watcher.update()["home-assistant-core"] is True
+
+
+def test_names_of_cached_pids_are_not_read_again(processes, watcher):
+    processes.processes[10] = ("sshd", 1.0)
+    for _ in range(RENAME_UPDATES + 3):
+        watcher.update()
+    assert processes.name_reads == RENAME_UPDATES
+
+
+def test_name_changed_by_exec(processes, watcher):
+    processes.processes[10] = ("wrapper.sh", 1.0)
+    assert watcher.update()["sshd"] is False
+
+    # The wrapper execs the real binary
+    processes.processes[10] = ("sshd", 1.0)
+    assert watcher.update()["sshd"] is True
+
+
+def test_exited_process_and_reused_pid(processes, watcher):
+    processes.processes[10] = ("sshd", 1.0)
+    assert watcher.update()["sshd"] is True
+
+    # Zombie that is still listed
+    watcher.process_exited(10)
+    assert watcher.update()["sshd"] is False
+
+    # Pid used again by a new process
+    processes.processes[10] = ("sshd", 2.0)
+    assert watcher.update()["sshd"] is True
@@ -0,0 +1,83 @@
+import pytest
+
+from myjsonrpc.codecs import get_codec
+from rsm_collector import sampler
+from rsm_collector.sampler import SnapshotBuffer, encode_snapshot, snapshot_params
+
+
+@pytest.fixture
+def buffer():
+    buffer = SnapshotBuffer.create(slot_size=64)
+    yield buffer
+    buffer.close()
+    buffer.unlink()
+
+
+def test_read_before_first_write(buffer):
+    assert buffer.read() is None
+    assert buffer.generation == 0
+
+
+def test_read_latest_after_writes(buffer):
+    for generation, snapshot in enumerate((b"first", b"second", b"third!"), start=1):
+        assert buffer.write(snapshot) == generation
+    assert buffer.read() == b"third!"
+    assert buffer.generation == 3
+
+
+def test_snapshot_too_large(buffer):
+    with pytest.raises(ValueError):
+        buffer.write(b"x" * 65)
+
+
+def test_read_retries_torn_read(buffer, monkeypatch):
+    buffer.write(b"old")
+    slot_header = sampler._SLOT_HEADER
+
+    class LappingSlotHeader:
+        """Lets the writer complete a write between copying and checking the slot."""
+
+        size = slot_header.size
+        pack_into = slot_header.pack_into
+
+        def __init__(self):
+            self.reads = 0
+
+        def unpack_from(self, buf, offset):
+            self.reads += 1
+            if self.reads == 2:
+                sequence, _ = slot_header.unpack_from(buf, offset)
+                data_offset = offset + slot_header.size
+                buf[data_offset : data_offset + 3] = b"new"
+                slot_header.pack_into(buf, offset, sequence + 2, 3)
+            return slot_header.unpack_from(buf, offset)
+
+    lapping = LappingSlotHeader()
+    monkeypatch.setattr(sampler, "_SLOT_HEADER", lapping)
+    assert buffer.read() == b"new"
+    # Copied and checked twice
+    assert lapping.reads == 4
+
+
+def test_attach_by_name(buffer):
+    buffer.write(b"snapshot")
+    attached = SnapshotBuffer.attach(buffer.name, slot_size=64)
+    try:
+        assert attached.read() == b"snapshot"
+        buffer.write(b"next")
+        assert attached.read() == b"next"
+        assert attached.generation == 2
+    finally:
+        attached.close()
+
+
+def test_snapshot_params():
+    codec = get_codec()
+    params = codec.encode({"data": {"cpu_percent": 1.5}})
+    snapshot = encode_snapshot(params)
+    assert codec.decode(snapshot) == {
+        "jsonrpc": "2.0",
+        "method": "update_data",
+        "params": {"data": {"cpu_percent": 1.5}},
+    }
+    assert snapshot_params(snapshot) == params
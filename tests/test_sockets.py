@@ -0,0 +1,48 @@
+import random
+
+import psutil
+import pytest
+
+from benchmarks.socket_states import build_procfs
+from rsm_collector import sockets
+from rsm_collector.sockets import count_socket_states, count_socket_states_psutil
+
+
+@pytest.fixture
+def procfs(tmp_path, monkeypatch):
+    random.seed(1)
+    build_procfs(str(tmp_path), 500)
+    monkeypatch.setattr(psutil, "PROCFS_PATH", str(tmp_path))
+    return str(tmp_path)
+
+
+def test_counts_match_psutil(procfs):
+    counts = count_socket_states(procfs)
+    expected = count_socket_states_psutil(psutil)
+
+    assert counts["tcp"] == expected["tcp"]
+    # psutil has no states for UDP sockets
+    assert sum(counts["udp"].values()) == sum(expected["udp"].values())
+
+
+# Lines are 131 bytes for IPv4 and 179 for IPv6, reads end at all kinds of spots
+@pytest.mark.parametrize("read_size", [1, 97, 130, 131, 132, 179, 4096])
+def test_lines_cut_by_reads(procfs, monkeypatch, read_size):
+    expected = count_socket_states(procfs)
+
+    monkeypatch.setattr(sockets, "READ_SIZE", read_size)
+    assert count_socket_states(procfs) == expected
+
+
+def test_last_line_without_newline(tmp_path):
+    net = tmp_path / "net"
+    net.mkdir()
+    (net / "tcp").write_bytes(
+        b"  sl  local_address rem_address   st\n"
+        b"   0: 0100007F:0016 00000000:0000 0A 00000000:00000000\n"
+        b"   1: 0100007F:0016 0200007F:C350 01 00000000:00000000"
+    )
+    assert count_socket_states(str(tmp_path)) == {
+        "tcp": {"LISTEN": 1, "ESTABLISHED": 1},
+        "udp": {},
+    }